@@ -0,0 +1,4 @@
+import time
+
+# Startup milestones are measured from the first import of the package
+STARTED = time.perf_counter()
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+from app.core.instrumentation import LATENCY_BUCKETS, CounterMetric, Histogram
+
+_pending_tasks: set[asyncio.Task] = set()
+
+
+class CacheBackend(ABC):
+    """Key-value store with per-entry TTL.
+
+    Values are JSON-compatible so a backend shared between workers can
+    serialize them.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float): ...
+
+    @abstractmethod
+    async def delete(self, *keys: str): ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Atomically increment a counter that never expires."""
+
+
+class InMemoryCache(CacheBackend):
+    """Per-process backend, also used as the fake in tests."""
+
+    def __init__(self, max_entries: int = 10_000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: dict[str, tuple[float, Any]] = {}
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries.pop(key, None)
+        self._entries[key] = (self.clock() + ttl, value)
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        _, value = self._entries.pop(key, (None, 0))
+        self._entries[key] = (float("inf"), value + 1)
+        return value + 1
+
+    def clear(self):
+        self._entries.clear()
+
+
+class CacheMetrics:
+    """Hit/miss counts and lookup latency, a miss includes loading the value."""
+
+    def __init__(self):
+        self.requests = CounterMetric(
+            "cache_requests_total", "Cache lookups by result.", ("cache", "result")
+        )
+        self.latency = Histogram(
+            "cache_lookup_seconds",
+            "Time to return a value, from the cache or the loader.",
+            ("cache", "result"),
+            LATENCY_BUCKETS,
+        )
+        self._lookups: dict[str, list[int]] = {}
+
+    def observe(self, cache: str, hit: bool, seconds: float):
+        result = "hit" if hit else "miss"
+        self.requests.inc((cache, result))
+        self.latency.observe((cache, result), seconds)
+        lookups = self._lookups.setdefault(cache, [0, 0])
+        lookups[0] += hit
+        lookups[1] += 1
+
+    def render(self) -> str:
+        lines = self.requests.render()
+        lines.append("# HELP cache_hit_ratio Share of lookups served from the cache.")
+        lines.append("# TYPE cache_hit_ratio gauge")
+        for cache, (hits, total) in self._lookups.items():
+            lines.append(f'cache_hit_ratio{{cache="{cache}"}} {hits / total}')
+        lines.extend(self.latency.render())
+        return "\n".join(lines) + "\n"
+
+
+def make_etag(value: Any) -> str:
+    """Strong ETag of a JSON-compatible value."""
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return f'"{hashlib.blake2b(encoded, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header value covers etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        candidate.removeprefix("W/") for candidate in candidates
+    )
+
+
+def run_in_background(coroutine):
+    """Schedule coroutine on the running loop from synchronous code."""
+    task = asyncio.get_running_loop().create_task(coroutine)
+    _pending_tasks.add(task)
+    task.add_done_callback(_pending_tasks.discard)
+
+
+cache_metrics = CacheMetrics()
+table_cache = InMemoryCache()
@@ -8,6 +8,64 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "db"
     POSTGRES_PORT: str = "5432"
 
+    # Connection pool, per worker process. Keep
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres max_connections.
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Logging. LOG_LEVELS overrides levels per logger, e.g.
+    # "sqlalchemy.engine=INFO,app.access=WARNING". Log files rotate by size
+    # when LOG_MAX_BYTES is set, otherwise at LOG_ROTATE_WHEN.
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_FILE: str = "app.log"
+    LOG_ROTATE_WHEN: str = "midnight"
+    LOG_MAX_BYTES: int = 0
+    LOG_BACKUP_COUNT: int = 14
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0
+
+    # Seconds a cached table row or table list page stays valid
+    TABLE_CACHE_TTL: float = 60
+
+    # Seconds a table's occupied-slot bitset of a day is served before it is
+    # rebuilt, writes in other workers show up in the occupancy grid after it
+    OCCUPANCY_TTL: float = 30
+
+    # GET responses of the cached routes, per worker. Writes in the same
+    # worker invalidate them at once, writes in other workers after the TTL.
+    RESPONSE_CACHE_TTL: float = 5
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Seconds a response stays replayable for its Idempotency-Key, and
+    # seconds a duplicate waits for the request holding the key
+    IDEMPOTENCY_TTL: float = 86_400
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 30
+
+    # Change feed events a subscriber may fall behind before it is dropped,
+    # and seconds between keep-alive comments on idle event streams
+    FEED_MAX_PENDING: int = 1024
+    FEED_HEARTBEAT: float = 15
+
+    # Seconds between passes expiring waitlist entries whose window is over
+    # and booking the waiting ones into whatever slots are free
+    WAITLIST_EXPIRE_INTERVAL: float = 60
+
+    # Reservations that started more than ARCHIVE_AFTER_DAYS days ago move to
+    # reservations_history every ARCHIVE_INTERVAL seconds. Monthly history
+    # partitions older than HISTORY_RETENTION_MONTHS are detached, 0 keeps all.
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_INTERVAL: float = 3600
+    HISTORY_RETENTION_MONTHS: int = 0
+
+    # OpenAPI schema written at build time by `python -m app.core.openapi`,
+    # served instead of generating it in every worker. Empty generates it.
+    OPENAPI_FILE: str = ""
+
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
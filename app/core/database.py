@@ -1,29 +1,96 @@
-from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel, create_engine
+from functools import cache
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import Config
+from app.core.instrumentation import request_metrics
+from app.core.pool_metrics import TimedQueuePool, pool_metrics
+
+
+@cache
+def get_engine() -> AsyncEngine:
+    """The application engine, created and instrumented on first use.
+
+    Creating it loads the database driver and dialect, deferring that keeps
+    importing the app cheap for tools and workers that never connect.
+    """
+    engine = create_async_engine(
+        Config.DATABASE_URL,
+        echo=Config.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_pre_ping=Config.DB_POOL_PRE_PING,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        connect_args={"prepared_statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE},
+    )
+    pool_metrics.instrument(engine)
+    request_metrics.instrument(engine)
+    return engine
 
-async_engine = AsyncEngine(create_engine(url=Config.DATABASE_URL, echo=True))
+
+@cache
+def get_sessionmaker() -> sessionmaker:
+    """Session factory bound to the application engine."""
+    return sessionmaker(bind=get_engine(), class_=AsyncSession, expire_on_commit=False)
+
+
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+_AFTER_ROLLBACK_KEY = "after_rollback_callbacks"
 
 
 async def initdb():
     """Initialize database tables"""
-    async with async_engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
 async def get_session() -> AsyncSession:
     """Dependency to provide the session object"""
-    async_session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
-
-    async with async_session() as session:
+    async with get_sessionmaker()() as session:
         try:
             yield session
             await session.commit()
         except Exception:
             await session.rollback()
             raise
+
+
+def is_postgres(session: AsyncSession) -> bool:
+    """Whether the session is bound to a PostgreSQL database."""
+    return session.bind.dialect.name == "postgresql"
+
+
+def run_after_commit(session: AsyncSession, callback):
+    """Run callback once the session's current transaction commits."""
+    session.sync_session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+def run_after_rollback(session: AsyncSession, callback):
+    """Run callback if the session's current transaction ends without a commit."""
+    session.sync_session.info.setdefault(_AFTER_ROLLBACK_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_callbacks(session: Session):
+    # Also dispatched when a savepoint is released, the outer transaction
+    # can still roll back
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_AFTER_ROLLBACK_KEY, None)
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _run_rollback_callbacks(session: Session, transaction):
+    if transaction.parent is not None:
+        return
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+    for callback in reversed(session.info.pop(_AFTER_ROLLBACK_KEY, [])):
+        callback()
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from uuid import uuid4
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the workers exchange change events on
+FEED_CHANNEL = "reservation_events"
+# NOTIFY payloads must stay below 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7_500
+# Seconds before reconnecting a lost LISTEN connection, doubled per failure
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+
+
+@dataclass(frozen=True, slots=True)
+class FeedEvent:
+    """A reservation change, with its JSON encoded once for every subscriber."""
+
+    type: str
+    table_id: int
+    data: str
+    # False for events published by another worker and received over the bridge
+    local: bool = True
+
+
+class Subscription:
+    """Events of the chosen tables, or of every table, for one consumer.
+
+    The queue holds at most max_pending events. A consumer falling further
+    behind is dropped and receives None instead of the next event.
+    """
+
+    __slots__ = ("table_ids", "max_pending", "dropped", "_queue")
+
+    def __init__(self, table_ids: set[int] | None, max_pending: int):
+        self.table_ids = table_ids
+        self.max_pending = max_pending
+        self.dropped = False
+        # One slot on top of max_pending for the None that ends a dropped feed
+        self._queue: asyncio.Queue[FeedEvent | None] = asyncio.Queue(max_pending + 1)
+
+    def wants(self, event: FeedEvent) -> bool:
+        return self.table_ids is None or event.table_id in self.table_ids
+
+    def put(self, event: FeedEvent) -> bool:
+        """Queue event, returns False once the consumer is dropped."""
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped = True
+            self._queue.put_nowait(None)
+            return False
+        self._queue.put_nowait(event)
+        return True
+
+    async def get(self, timeout: float | None = None) -> FeedEvent | None:
+        """Next event, None if dropped. Raises TimeoutError after timeout."""
+        async with asyncio.timeout(timeout):
+            return await self._queue.get()
+
+
+class ChangeFeed:
+    """In-process pub/sub of reservation changes.
+
+    Publishing never waits for consumers. With a bridge attached, published
+    events also reach the subscribers of the other worker processes.
+    """
+
+    def __init__(self, max_pending: int | None = None):
+        self.max_pending = max_pending or Config.FEED_MAX_PENDING
+        self.bridge: "PostgresNotifyBridge | None" = None
+        self._subscribers: set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone, here or in another worker, may receive events."""
+        return bool(self._subscribers) or self.bridge is not None
+
+    def subscribe(self, table_ids: set[int] | None = None) -> Subscription:
+        subscription = Subscription(table_ids, self.max_pending)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, type: str, table_id: int, payload: dict):
+        event = FeedEvent(type, table_id, json.dumps(payload))
+        self.deliver(event)
+        if self.bridge is not None:
+            self.bridge.send(event)
+
+    def deliver(self, event: FeedEvent):
+        """Hand event to local subscribers, dropping those that fell behind."""
+        for subscription in list(self._subscribers):
+            if subscription.wants(event) and not subscription.put(event):
+                self._subscribers.discard(subscription)
+                logger.warning(
+                    f"Dropped a change feed subscriber {subscription.max_pending} "
+                    f"events behind"
+                )
+
+
+class PostgresNotifyBridge:
+    """Fans change feed events out to every worker with LISTEN/NOTIFY.
+
+    Events published in this process are sent from a background task on a
+    dedicated connection, several per NOTIFY when they fit. Notifications
+    from the other processes are delivered to the local subscribers, the
+    process's own are skipped as they were delivered when published.
+
+    A lost connection is re-established with exponential backoff. Events
+    published meanwhile wait in the outbox, at most feed.max_pending of
+    them, notifications sent by the other workers meanwhile are missed.
+    """
+
+    def __init__(
+        self, feed: ChangeFeed, engine: AsyncEngine, channel: str = FEED_CHANNEL
+    ):
+        self.feed = feed
+        self.engine = engine
+        self.channel = channel
+        self.origin = uuid4().hex
+        self._connection: AsyncConnection | None = None
+        self._driver_connection = None
+        self._outbox: asyncio.Queue[FeedEvent] = asyncio.Queue(feed.max_pending)
+        self._task: asyncio.Task | None = None
+        self._lost = asyncio.Event()
+
+    async def start(self):
+        await self._connect()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        self.feed.bridge = self
+        logger.info(f"Change feed bridged over the {self.channel} channel")
+
+    async def stop(self):
+        self.feed.bridge = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._disconnect()
+
+    def send(self, event: FeedEvent):
+        try:
+            self._outbox.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Dropped a change feed event for other workers, "
+                f"{self._outbox.maxsize} are waiting to be sent"
+            )
+
+    async def _connect(self):
+        self._connection = await self.engine.connect()
+        raw_connection = await self._connection.get_raw_connection()
+        self._driver_connection = raw_connection.driver_connection
+        lost = self._lost = asyncio.Event()
+        self._driver_connection.add_termination_listener(lambda _: lost.set())
+        await self._driver_connection.add_listener(self.channel, self._on_notify)
+
+    async def _disconnect(self):
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            if self._driver_connection.is_closed():
+                # Lost, the pool must not hand it out again
+                await connection.invalidate()
+            else:
+                await self._driver_connection.remove_listener(
+                    self.channel, self._on_notify
+                )
+            await connection.close()
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning(f"Failed to close the change feed connection: {str(e)}")
+
+    async def _run(self):
+        while True:
+            await self._serve()
+            logger.warning(
+                f"Lost the {self.channel} connection, events of other workers "
+                f"are missed until it is back"
+            )
+            await self._disconnect()
+            await self._reconnect()
+
+    async def _serve(self):
+        """Send events until the connection is lost."""
+        loop = asyncio.get_running_loop()
+        sender = loop.create_task(self._send_events())
+        watcher = loop.create_task(self._lost.wait())
+        try:
+            await asyncio.wait((sender, watcher), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            watcher.cancel()
+            results = await asyncio.gather(sender, watcher, return_exceptions=True)
+        if isinstance(results[0], Exception):
+            logger.error(f"Failed to notify other workers: {str(results[0])}")
+
+    async def _reconnect(self):
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except (SQLAlchemyError, OSError) as e:
+                await self._disconnect()
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                logger.error(
+                    f"Failed to reconnect the change feed, retrying in {delay}s: "
+                    f"{str(e)}"
+                )
+                continue
+            logger.info(f"Change feed bridged over the {self.channel} channel again")
+            return
+
+    async def _send_events(self):
+        # Imported with the bridge, importing the app does not load the driver
+        import asyncpg
+
+        while True:
+            events = [await self._outbox.get()]
+            while not self._outbox.empty():
+                events.append(self._outbox.get_nowait())
+            for payload in self.payloads(events):
+                # Connection errors end the loop, the connection is replaced
+                try:
+                    await self._driver_connection.execute(
+                        "SELECT pg_notify($1, $2)", self.channel, payload
+                    )
+                except asyncpg.PostgresError as e:
+                    logger.error(f"Failed to notify other workers: {str(e)}")
+
+    def payloads(self, events: list[FeedEvent]):
+        """Pack events into as few NOTIFY payloads as fit the size limit."""
+        batch = []
+        size = 0
+        for event in events:
+            encoded = json.dumps([event.type, event.table_id, event.data])
+            if batch and size + len(encoded) > MAX_NOTIFY_PAYLOAD:
+                yield self._payload(batch)
+                batch = []
+                size = 0
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            yield self._payload(batch)
+
+    def _payload(self, batch: list[str]) -> str:
+        return f'{{"origin": "{self.origin}", "events": [{",".join(batch)}]}}'
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+            if message["origin"] == self.origin:
+                return
+            events = [
+                FeedEvent(type, table_id, data, local=False)
+                for type, table_id, data in message["events"]
+            ]
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Skipped a malformed {channel} notification: {str(e)}")
+            return
+        for event in events:
+            self.feed.deliver(event)
+
+
+async def sse_stream(
+    feed: ChangeFeed, table_ids: set[int] | None = None, heartbeat: float | None = None
+):
+    """Server-Sent Events of a new subscription to feed.
+
+    Idle streams get a comment every heartbeat seconds so proxies keep them
+    open. A dropped subscriber gets an overflow event and the stream ends,
+    the client should reload what it shows and reconnect.
+    """
+    subscription = feed.subscribe(table_ids)
+    try:
+        yield b": subscribed\n\n"
+        while True:
+            try:
+                event = await subscription.get(heartbeat or Config.FEED_HEARTBEAT)
+            except TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if event is None:
+                yield b"event: overflow\ndata: {}\n\n"
+                return
+            yield f"event: {event.type}\ndata: {event.data}\n\n".encode()
+    finally:
+        feed.unsubscribe(subscription)
+
+
+change_feed = ChangeFeed()
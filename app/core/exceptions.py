@@ -20,3 +20,9 @@ class TableDoesntExistException(Exception):
     """Raised when a table doesn't exist"""
 
     pass
+
+
+class WaitlistEntryNotFoundException(Exception):
+    """Raised when a waitlist entry is not found"""
+
+    pass
@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+
+from app.core.config import Config
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different payload."""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """The request holding the key did not finish within the wait timeout."""
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+    headers: list[tuple[str, str]]
+    fingerprint: str
+    expires_at: float = 0.0
+
+
+@dataclass
+class _InFlight:
+    fingerprint: str
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    return hashlib.sha256(
+        b"\0".join((method.encode(), path.encode(), body))
+    ).hexdigest()
+
+
+class IdempotencyStore:
+    """Responses of completed requests per idempotency key, with TTL eviction.
+
+    The first request for a key claims it with begin() and must finish with
+    complete() or release(). Concurrent duplicates wait for it and receive
+    the stored response, or claim the key themselves if it was released.
+    They give up after wait_timeout seconds, so a hung request does not hold
+    its retries forever.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86_400,
+        max_entries: int = 10_000,
+        clock=time.monotonic,
+        wait_timeout: float = 30,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.wait_timeout = wait_timeout
+        self._entries: dict[str, StoredResponse | _InFlight] = {}
+
+    async def begin(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """Return the stored response to replay, or None once key is claimed.
+
+        Raises IdempotencyKeyInProgress if the key stays claimed by another
+        request for wait_timeout seconds.
+        """
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        while True:
+            self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _InFlight(fingerprint)
+                return None
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyReused(
+                    f"{IDEMPOTENCY_KEY_HEADER} was already used with another request"
+                )
+            if isinstance(entry, StoredResponse):
+                return entry
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await entry.done.wait()
+            except TimeoutError:
+                raise IdempotencyKeyInProgress(
+                    f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress"
+                )
+
+    def complete(self, key: str, response: StoredResponse):
+        """Store the response of a claimed key and wake up waiting duplicates."""
+        in_flight = self._entries.pop(key, None)
+        response.expires_at = self.clock() + self.ttl
+        self._entries[key] = response
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            if isinstance(self._entries[oldest], _InFlight):
+                break
+            del self._entries[oldest]
+        if isinstance(in_flight, _InFlight):
+            in_flight.done.set()
+
+    def release(self, key: str):
+        """Give up a claimed key without storing, a waiting duplicate takes over."""
+        in_flight = self._entries.pop(key, None)
+        if isinstance(in_flight, _InFlight):
+            in_flight.done.set()
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict_expired(self):
+        # Stored entries are appended in completion order with the same TTL,
+        # so expired ones sit at the front
+        now = self.clock()
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if isinstance(entry, _InFlight):
+                continue
+            if entry.expires_at > now:
+                break
+            del self._entries[key]
+
+
+idempotency_store = IdempotencyStore(
+    ttl=Config.IDEMPOTENCY_TTL, wait_timeout=Config.IDEMPOTENCY_WAIT_TIMEOUT
+)
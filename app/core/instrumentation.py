@@ -0,0 +1,300 @@
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import STARTED
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# The same statement executed this many times in one request is flagged
+N_PLUS_ONE_THRESHOLD = 5
+
+_QUERY_STARTED_KEY = "instrumentation_query_started"
+
+
+class RequestStats:
+    """Time and queries attributed to the request being handled."""
+
+    __slots__ = ("started", "db_seconds", "pool_wait_seconds", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.statements = Counter()
+
+    @property
+    def queries(self) -> int:
+        return sum(self.statements.values())
+
+    def repeated_statements(self) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.statements.items()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing header value splitting the request time."""
+        app_seconds = total_seconds - self.db_seconds - self.pool_wait_seconds
+        return (
+            f"pool;dur={self.pool_wait_seconds * 1000:.2f}, "
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries", '
+            f"app;dur={max(app_seconds, 0) * 1000:.2f}"
+        )
+
+
+_current_request: ContextVar[RequestStats | None] = ContextVar(
+    "current_request", default=None
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set, rendered in Prometheus format."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, label_values: tuple, value: float):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in self._series.items():
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{{{labels}{',' if labels else ''}"
+                    f'le="{bound}"}} {cumulative}'
+                )
+            cumulative += counts[-1]
+            lines.append(
+                f"{self.name}_bucket{{{labels}{',' if labels else ''}"
+                f'le="+Inf"}} {cumulative}'
+            )
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+    def clear(self):
+        self._series.clear()
+
+
+class CounterMetric:
+    """Monotonic counter per label set, rendered in Prometheus format."""
+
+    def __init__(self, name: str, help: str, labels: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Counter = Counter()
+
+    def inc(self, label_values: tuple, amount: int = 1):
+        self._values[label_values] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in self._values.items():
+            lines.append(
+                f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}"
+            )
+        return lines
+
+    def clear(self):
+        self._values.clear()
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    return ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    """Per-route latency, DB time and query count histograms.
+
+    The HTTP middleware opens a RequestStats for every request, cursor
+    events on instrumented engines and the session dependency add to it.
+    """
+
+    def __init__(self):
+        route = ("method", "route")
+        self.duration = Histogram(
+            "http_request_duration_seconds",
+            "Time to produce the response headers.",
+            route + ("status",),
+            LATENCY_BUCKETS,
+        )
+        self.db_time = Histogram(
+            "http_request_db_seconds",
+            "Time spent executing SQL statements per request.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.pool_wait = Histogram(
+            "http_request_pool_wait_seconds",
+            "Time spent waiting for a pooled connection per request.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.queries = Histogram(
+            "http_request_queries",
+            "SQL statements executed per request.",
+            route,
+            QUERY_COUNT_BUCKETS,
+        )
+        self.n_plus_one = CounterMetric(
+            "http_request_n_plus_one_total",
+            f"Requests running one statement {N_PLUS_ONE_THRESHOLD}+ times.",
+            route,
+        )
+        self._metrics = (
+            self.duration,
+            self.db_time,
+            self.pool_wait,
+            self.queries,
+            self.n_plus_one,
+        )
+
+    def instrument(self, engine: AsyncEngine):
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+    def start_request(self) -> RequestStats:
+        stats = RequestStats()
+        _current_request.set(stats)
+        return stats
+
+    def finish_request(
+        self, method: str, route: str, status: int, stats: RequestStats
+    ) -> float:
+        """Record a finished request, returns its duration in seconds."""
+        elapsed = time.perf_counter() - stats.started
+        self.duration.observe((method, route, status), elapsed)
+        self.db_time.observe((method, route), stats.db_seconds)
+        self.pool_wait.observe((method, route), stats.pool_wait_seconds)
+        self.queries.observe((method, route), stats.queries)
+        repeated = stats.repeated_statements()
+        if repeated:
+            self.n_plus_one.inc((method, route))
+            for statement, count in repeated:
+                logger.warning(
+                    "Possible N+1 query in %s %s: %d executions of %s",
+                    method,
+                    route,
+                    count,
+                    " ".join(statement.split()),
+                    extra={"route": route, "executions": count},
+                )
+        return elapsed
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+
+class StartupMetrics:
+    """Seconds from the first import of the app to each startup milestone.
+
+    imported: app.main finished importing, ready: the lifespan startup ran,
+    first_request: the first response was produced. Interpreter and server
+    startup before the import are not included, benchmarks.bench_startup
+    measures the whole cold start from outside the process.
+    """
+
+    def __init__(self, started: float = STARTED, clock=time.perf_counter):
+        self.started = started
+        self.clock = clock
+        self.milestones: dict[str, float] = {}
+
+    def mark(self, milestone: str) -> float:
+        """Record milestone unless reached before, returns its time."""
+        if milestone not in self.milestones:
+            self.milestones[milestone] = self.clock() - self.started
+        return self.milestones[milestone]
+
+    def render(self) -> str:
+        lines = [
+            "# HELP app_startup_seconds Seconds from the first import of the app to "
+            "each startup milestone.",
+            "# TYPE app_startup_seconds gauge",
+        ]
+        for milestone, seconds in self.milestones.items():
+            lines.append(f'app_startup_seconds{{milestone="{milestone}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+
+def record_pool_wait(seconds: float):
+    """Attribute connection acquisition time to the current request."""
+    stats = _current_request.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_QUERY_STARTED_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info[_QUERY_STARTED_KEY].pop()
+    stats = _current_request.get()
+    if stats is not None:
+        stats.db_seconds += time.perf_counter() - started
+        stats.statements[statement] += 1
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(_QUERY_STARTED_KEY):
+        _after_cursor_execute(
+            connection, None, exception_context.statement, None, None, False
+        )
+
+
+request_metrics = RequestMetrics()
+startup_metrics = StartupMetrics()
@@ -0,0 +1,164 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+
+
+class TableIntervals:
+    """Sorted [start, end) intervals of a single table.
+
+    ``max_ends[i]`` holds the latest end among the first ``i + 1`` intervals,
+    so an overlap query is a single bisect followed by one comparison.
+    """
+
+    __slots__ = ("starts", "ends", "max_ends", "ids")
+
+    def __init__(self):
+        self.starts: list[datetime] = []
+        self.ends: list[datetime] = []
+        self.max_ends: list[datetime] = []
+        self.ids: list[int] = []
+
+    @classmethod
+    def from_sorted(cls, rows) -> "TableIntervals":
+        """Build from (id, start, end) rows already ordered by start."""
+        intervals = cls()
+        for id, start, end in rows:
+            intervals.ids.append(id)
+            intervals.starts.append(start)
+            intervals.ends.append(end)
+        intervals.max_ends = list(accumulate(intervals.ends, max))
+        return intervals
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, id: int, start: datetime, end: datetime):
+        """Insert an interval keeping the lists ordered by start."""
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.ids.insert(position, id)
+        if position > 0 and self.max_ends[position - 1] > end:
+            self.max_ends.insert(position, self.max_ends[position - 1])
+        else:
+            self.max_ends.insert(position, end)
+        self._refresh_max_ends(position + 1)
+
+    def remove(self, id: int, start: datetime) -> bool:
+        """Remove the interval with the given id, returns False if absent."""
+        low = bisect_left(self.starts, start)
+        high = bisect_right(self.starts, start)
+        for position in range(low, high):
+            if self.ids[position] == id:
+                del self.starts[position]
+                del self.ends[position]
+                del self.ids[position]
+                del self.max_ends[position]
+                self._refresh_max_ends(position)
+                return True
+        return False
+
+    def find_overlap(
+        self, start: datetime, end: datetime
+    ) -> tuple[datetime, datetime] | None:
+        """Return an interval overlapping [start, end), if there is one."""
+        position = bisect_left(self.starts, end) - 1
+        while position >= 0 and self.max_ends[position] > start:
+            if self.ends[position] > start:
+                return self.starts[position], self.ends[position]
+            position -= 1
+        return None
+
+    def neighbours(
+        self, start: datetime, end: datetime
+    ) -> tuple[datetime | None, datetime | None]:
+        """Latest end before start and earliest start at or after end.
+
+        Meant for a free [start, end), None where there is no such interval.
+        """
+        position = bisect_left(self.starts, start)
+        previous_end = self.max_ends[position - 1] if position else None
+        position = bisect_left(self.starts, end)
+        next_start = self.starts[position] if position < len(self.starts) else None
+        return previous_end, next_start
+
+    def _refresh_max_ends(self, position: int):
+        """Recompute running maxima from position until they stop changing."""
+        while position < len(self.ends):
+            value = self.ends[position]
+            if position > 0 and self.max_ends[position - 1] > value:
+                value = self.max_ends[position - 1]
+            if self.max_ends[position] == value:
+                break
+            self.max_ends[position] = value
+            position += 1
+
+
+class ReservationIntervalIndex:
+    """Per-table interval index answering "is [start, end) free?" in O(log n).
+
+    Tables are filled through ``load``, either selectively or all at once.
+    The index is a snapshot of the rows it was loaded from, the database
+    stays the source of truth.
+    """
+
+    def __init__(self):
+        self._tables: dict[int, TableIntervals] = {}
+        self._complete = False
+
+    def is_loaded(self, table_id: int) -> bool:
+        return self._complete or table_id in self._tables
+
+    def load(self, rows, table_ids=None):
+        """Load (id, table_id, start, end) rows.
+
+        When table_ids is None the rows are treated as the whole data set and
+        every table is considered loaded afterwards.
+        """
+        grouped: dict[int, list] = {table_id: [] for table_id in table_ids or ()}
+        for id, table_id, start, end in rows:
+            grouped.setdefault(table_id, []).append((id, start, end))
+        tables = {
+            table_id: TableIntervals.from_sorted(
+                sorted(table_rows, key=lambda row: row[1])
+            )
+            for table_id, table_rows in grouped.items()
+        }
+
+        if table_ids is None:
+            self._tables = tables
+            self._complete = True
+        else:
+            self._tables.update(tables)
+
+    def add(self, table_id: int, id: int, start: datetime, end: datetime):
+        intervals = self._tables.get(table_id)
+        if intervals is None:
+            if not self._complete:
+                return
+            intervals = self._tables[table_id] = TableIntervals()
+        intervals.add(id, start, end)
+
+    def remove(self, table_id: int, id: int, start: datetime) -> bool:
+        intervals = self._tables.get(table_id)
+        return intervals is not None and intervals.remove(id, start)
+
+    def find_overlap(
+        self, table_id: int, start: datetime, end: datetime
+    ) -> tuple[datetime, datetime] | None:
+        intervals = self._tables.get(table_id)
+        if intervals is None:
+            return None
+        return intervals.find_overlap(start, end)
+
+    def neighbours(
+        self, table_id: int, start: datetime, end: datetime
+    ) -> tuple[datetime | None, datetime | None]:
+        intervals = self._tables.get(table_id)
+        if intervals is None:
+            return None, None
+        return intervals.neighbours(start, end)
+
+    def clear(self):
+        self._tables.clear()
+        self._complete = False
@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Iterable
+from contextlib import asynccontextmanager
+from functools import partial
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import is_postgres, run_after_commit, run_after_rollback
+
+# First key of the two-key advisory locks, keeps table ids from colliding
+# with advisory locks taken by other code on the same database
+TABLE_LOCK_NAMESPACE = 7301
+
+# Session info key of the tables a session holds local locks on
+_HELD_KEY = "table_locks_held"
+
+
+class TableLocks:
+    """Serialize writes to the same restaurant table.
+
+    On PostgreSQL a transaction-level advisory lock is taken per table, so
+    writers in every worker queue per table and the lock is released on
+    commit or rollback. Other backends use an asyncio lock per table, also
+    held until the session's transaction ends, so they only serialize
+    writers of one process. Either way a session holding a table takes it
+    again without waiting. Writers to different tables never wait for each
+    other.
+    """
+
+    def __init__(self):
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._users: dict[int, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, session: AsyncSession, table_ids: Iterable[int]):
+        """Lock every table in table_ids, always in ascending id order."""
+        ids = sorted(set(table_ids))
+        if is_postgres(session):
+            for table_id in ids:
+                await session.exec(
+                    select(func.pg_advisory_xact_lock(TABLE_LOCK_NAMESPACE, table_id))
+                )
+            yield
+            return
+
+        info = session.sync_session.info
+        held = info.get(_HELD_KEY)
+        if held is None:
+            held = info[_HELD_KEY] = set()
+            release = partial(self._release_held, info)
+            run_after_commit(session, release)
+            run_after_rollback(session, release)
+        try:
+            for table_id in ids:
+                if table_id not in held:
+                    await self._acquire(table_id)
+                    held.add(table_id)
+            yield
+        finally:
+            # Nothing was written, no transaction end will release them
+            if not session.in_transaction():
+                self._release_held(info)
+
+    async def _acquire(self, table_id: int):
+        lock = self._locks.setdefault(table_id, asyncio.Lock())
+        self._users[table_id] = self._users.get(table_id, 0) + 1
+        try:
+            await lock.acquire()
+        except BaseException:
+            self._forget(table_id)
+            raise
+
+    def _release_held(self, info: dict):
+        for table_id in info.pop(_HELD_KEY, ()):
+            self._locks[table_id].release()
+            self._forget(table_id)
+
+    def _forget(self, table_id: int):
+        # Drop the lock once nobody holds or waits for it
+        self._users[table_id] -= 1
+        if not self._users[table_id]:
+            del self._users[table_id]
+            del self._locks[table_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+table_locks = TableLocks()
@@ -1,26 +1,153 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 
+from app.core.config import Config
 
-def setup_logger():
-    # Don't create file handler if we're running tests
-    handlers = [logging.StreamHandler()]
+ACCESS_LOGGER = "app.access"
 
-    # Only add file handler if not in test environment
-    if "pytest" not in sys.modules:
-        handlers.append(
-            logging.FileHandler(f'app_{datetime.now().strftime("%Y-%m-%d")}.log')
+# Attributes every LogRecord has, anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line, `extra` fields included."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a `rate` share of records below `level`, all others pass."""
+
+    def __init__(self, rate: float, level: int = logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.level or random.random() < self.rate
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps records structured for the listener.
+
+    The stock handler flattens the record into a preformatted string, here
+    only the message arguments are merged and the traceback rendered, so
+    `extra` fields still reach the JSON formatter.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(levels: str) -> dict[str, str]:
+    """Parse "module=LEVEL,other.module=LEVEL" into a mapping."""
+    parsed = {}
+    for item in filter(None, (part.strip() for part in levels.split(","))):
+        name, _, level = item.partition("=")
+        parsed[name.strip()] = level.strip().upper()
+    return parsed
+
+
+def _file_handler(filename: str) -> logging.Handler:
+    if Config.LOG_MAX_BYTES > 0:
+        return logging.handlers.RotatingFileHandler(
+            filename,
+            maxBytes=Config.LOG_MAX_BYTES,
+            backupCount=Config.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True,
         )
+    return logging.handlers.TimedRotatingFileHandler(
+        filename,
+        when=Config.LOG_ROTATE_WHEN,
+        backupCount=Config.LOG_BACKUP_COUNT,
+        encoding="utf-8",
+        delay=True,
+    )
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logger(handlers: list[logging.Handler] | None = None):
+    """Route all records through a queue to handlers on a background thread.
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=handlers,
-        force=True,
+    Request handlers only pay for putting a record on the queue, formatting
+    and disk I/O happen on the listener thread. `handlers` replaces the
+    configured console and file handlers.
+    """
+    stop_logging()
+
+    formatter = JsonFormatter()
+    if handlers is None:
+        handlers = [logging.StreamHandler()]
+        # Don't create file handler if we're running tests
+        if Config.LOG_FILE and "pytest" not in sys.modules:
+            handlers.append(_file_handler(Config.LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(StructuredQueueHandler(log_queue))
+    root.setLevel(Config.LOG_LEVEL.upper())
+
+    for name, level in parse_levels(Config.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    access_logger = logging.getLogger(ACCESS_LOGGER)
+    access_logger.filters.clear()
+    if Config.LOG_ACCESS_SAMPLE_RATE < 1:
+        access_logger.addFilter(SamplingFilter(Config.LOG_ACCESS_SAMPLE_RATE))
+
+    global _listener
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
     )
+    _listener.start()
+
+    return logging.getLogger("app")
 
-    return logging.getLogger()
 
+atexit.register(stop_logging)
 
 logger = setup_logger()
@@ -0,0 +1,121 @@
+from datetime import date, datetime, time, timedelta
+from time import monotonic
+
+from app.core.config import Config
+
+SLOT_MINUTES = 15
+SLOT = timedelta(minutes=SLOT_MINUTES)
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+DAY = timedelta(days=1)
+
+
+def slot_masks(start: datetime, end: datetime) -> dict[date, int]:
+    """Bitmasks of the slots touched by [start, end), keyed by day.
+
+    Bit i of a day's mask stands for the slot starting i * SLOT_MINUTES
+    minutes after midnight.
+    """
+    masks = {}
+    day = start.date()
+    while True:
+        day_start = datetime.combine(day, time())
+        first = max(start, day_start) - day_start
+        last = min(end, day_start + DAY) - day_start
+        if last > first:
+            first_slot = first // SLOT
+            last_slot = -(-last // SLOT)
+            masks[day] = ((1 << (last_slot - first_slot)) - 1) << first_slot
+        if end <= day_start + DAY:
+            return masks
+        day += DAY
+
+
+def busy_runs(bits: int) -> list[tuple[int, int]]:
+    """Run-length encode set bits as (first slot, number of slots) pairs."""
+    runs = []
+    slot = 0
+    while bits:
+        skip = (bits & -bits).bit_length() - 1
+        slot += skip
+        bits >>= skip
+        length = (bits ^ (bits + 1)).bit_length() - 1
+        runs.append((slot, length))
+        slot += length
+        bits >>= length
+    return runs
+
+
+def pack(bits: int) -> bytes:
+    """Pack a day's bitset into SLOTS_PER_DAY // 8 little-endian bytes."""
+    return bits.to_bytes(SLOTS_PER_DAY // 8, "little")
+
+
+class OccupancyStore:
+    """Occupied-slot bitsets per (table_id, day).
+
+    Days are filled from the database on first read, new reservations are
+    OR-ed into days already present and deletions drop the affected days so
+    they are rebuilt on the next read. Both also bump the day's generation,
+    a day read from the database is only stored if its generation did not
+    change meanwhile. Writes in other workers and archival are not seen
+    here, a day is read again once older than ttl seconds, OCCUPANCY_TTL by
+    default.
+    """
+
+    def __init__(
+        self, max_days: int = 100_000, ttl: float | None = None, clock=monotonic
+    ):
+        self.max_days = max_days
+        self.ttl = ttl or Config.OCCUPANCY_TTL
+        self.clock = clock
+        # (bits, expires_at) per (table_id, day)
+        self._days: dict[tuple[int, date], tuple[int, float]] = {}
+        self._generations: dict[tuple[int, date], int] = {}
+
+    def get(self, table_id: int, day: date) -> int | None:
+        """The bitset of a day, None unless stored less than ttl seconds ago."""
+        key = (table_id, day)
+        entry = self._days.get(key)
+        if entry is None:
+            return None
+        bits, expires_at = entry
+        if expires_at <= self.clock():
+            del self._days[key]
+            return None
+        return bits
+
+    def generation(self, table_id: int, day: date) -> int:
+        return self._generations.get((table_id, day), 0)
+
+    def set(self, table_id: int, day: date, bits: int, generation: int | None = None):
+        """Store the bitset of a day, unless generation is given and stale."""
+        if generation is not None and generation != self.generation(table_id, day):
+            return
+        self._days[(table_id, day)] = (bits, self.clock() + self.ttl)
+        while len(self._days) > self.max_days:
+            del self._days[next(iter(self._days))]
+
+    def mark(self, table_id: int, start: datetime, end: datetime):
+        for day, mask in slot_masks(start, end).items():
+            self._bump(table_id, day)
+            entry = self._days.get((table_id, day))
+            if entry is not None:
+                bits, expires_at = entry
+                self._days[(table_id, day)] = (bits | mask, expires_at)
+
+    def invalidate(self, table_id: int, start: datetime, end: datetime):
+        for day in slot_masks(start, end):
+            self._bump(table_id, day)
+            self._days.pop((table_id, day), None)
+
+    def clear(self):
+        self._days.clear()
+
+    def _bump(self, table_id: int, day: date):
+        key = (table_id, day)
+        self._generations[key] = self._generations.pop(key, 0) + 1
+        while len(self._generations) > self.max_days:
+            del self._generations[next(iter(self._generations))]
+
+
+occupancy_store = OccupancyStore()
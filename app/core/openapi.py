@@ -0,0 +1,46 @@
+"""OpenAPI schema generated at build time and served from a file.
+
+FastAPI builds the schema from every route and model on the first
+/openapi.json request of each worker. The image runs
+
+    python -m app.core.openapi openapi.json
+
+once at build time and sets OPENAPI_FILE, workers then load the file
+instead. Without the file the schema is generated as before.
+"""
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+def export_openapi(app: FastAPI, path: str | Path):
+    """Generate the schema of app and write it to path."""
+    schema = FastAPI.openapi(app)
+    Path(path).write_text(json.dumps(schema, ensure_ascii=False), encoding="utf-8")
+
+
+def serve_openapi_file(app: FastAPI, path: str | Path):
+    """Make app load its OpenAPI schema from path, generating it if missing."""
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            try:
+                app.openapi_schema = json.loads(Path(path).read_bytes())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Generating the OpenAPI schema: {str(e)}")
+                app.openapi_schema = FastAPI.openapi(app)
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+if __name__ == "__main__":
+    from app.main import app
+
+    export_openapi(app, sys.argv[1])
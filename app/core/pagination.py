@@ -0,0 +1,54 @@
+import base64
+import binascii
+from collections.abc import Mapping
+
+from fastapi import HTTPException, Query, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the id of the last row of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor, raises ValueError if invalid."""
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        prefix, last_id = decoded.decode().split(":", 1)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if prefix != "id" or not last_id.isdigit():
+        raise ValueError("Invalid cursor")
+    return int(last_id)
+
+
+class PageParams:
+    """Keyset pagination query parameters shared by the list endpoints."""
+
+    def __init__(
+        self,
+        after_id: int | None = Query(None, ge=0),
+        cursor: str | None = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    ):
+        if cursor is not None:
+            try:
+                after_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+        self.after_id = after_id
+        self.limit = limit
+
+    def set_next_cursor(self, response: Response, rows):
+        """Advertise the next page when this one came back full.
+
+        rows are objects with an id attribute or mappings with an "id" key.
+        """
+        if len(rows) == self.limit:
+            last = rows[-1]
+            last_id = last["id"] if isinstance(last, Mapping) else last.id
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_id)
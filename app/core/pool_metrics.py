@@ -0,0 +1,98 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.instrumentation import record_pool_wait
+
+
+class PoolMetrics:
+    """Connection pool counters collected from SQLAlchemy pool events."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.connections_invalidated = 0
+        self.acquire_count = 0
+        self.acquire_seconds = 0.0
+        self.acquire_max_seconds = 0.0
+
+    def instrument(self, engine: AsyncEngine):
+        pool = engine.sync_engine.pool
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "close", self._on_close)
+        event.listen(pool, "close_detached", self._on_close)
+        event.listen(pool, "invalidate", self._on_invalidate)
+        event.listen(pool, "checkout", self._on_checkout)
+
+    def observe_acquire(self, seconds: float):
+        """Record how long a checkout waited for a pooled connection."""
+        self.acquire_count += 1
+        self.acquire_seconds += seconds
+        if seconds > self.acquire_max_seconds:
+            self.acquire_max_seconds = seconds
+
+    def snapshot(self, engine: AsyncEngine) -> dict:
+        pool = engine.sync_engine.pool
+        stats = {
+            "pool_class": type(pool).__name__,
+            "checkouts_total": self.checkouts,
+            "connections_opened_total": self.connections_opened,
+            "connections_closed_total": self.connections_closed,
+            "connections_invalidated_total": self.connections_invalidated,
+            "acquire_count": self.acquire_count,
+            "acquire_seconds_total": self.acquire_seconds,
+            "acquire_seconds_max": self.acquire_max_seconds,
+        }
+        # Only queue pools have a fixed size and overflow
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if method is not None:
+                stats[name] = method()
+        return stats
+
+    def render(self, engine: AsyncEngine) -> str:
+        """Numeric snapshot values in Prometheus text format."""
+        lines = []
+        for key, value in self.snapshot(engine).items():
+            if isinstance(value, str):
+                continue
+            name = f"db_pool_{key}"
+            kind = "counter" if key.endswith("_total") else "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connections_opened += 1
+
+    def _on_close(self, dbapi_connection, *args):
+        self.connections_closed += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.connections_invalidated += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool timing every checkout, opening a new connection included.
+
+    Pool events only fire once a connection is handed out, the wait is
+    measured around connect() instead. Sessions still check out lazily, on
+    their first statement.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        waited = time.perf_counter() - started
+        pool_metrics.observe_acquire(waited)
+        record_pool_wait(waited)
+        return connection
+
+
+pool_metrics = PoolMetrics()
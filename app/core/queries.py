@@ -0,0 +1,19 @@
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import Row
+from sqlmodel import SQLModel, select
+
+
+def select_columns(model: type[SQLModel], columns: Iterable[str]):
+    """select() of the named columns of model, for read-only queries.
+
+    The result holds Row objects (named tuples with attribute access) instead
+    of entities, so nothing is added to the session's identity map, tracked
+    for changes or wired to relationships.
+    """
+    return select(*(getattr(model, column) for column in columns))
+
+
+def row_dicts(rows: Sequence[Row]) -> list[dict]:
+    """Rows as plain dicts keyed by column name, e.g. for JSON encoding."""
+    return [row._asdict() for row in rows]
@@ -0,0 +1,52 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+
+# Distance between occurrences for an interval of 1
+FREQUENCIES = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+
+def occurrence_count(
+    start: datetime, step: timedelta, count: int | None, until: datetime | None
+) -> int:
+    """Number of occurrences of a series, without expanding it.
+
+    The series ends after count occurrences or with the last one starting on
+    or before until, whichever comes first.
+    """
+    if until is not None:
+        if until < start:
+            return 0
+        until_count = (until - start) // step + 1
+        count = until_count if count is None else min(count, until_count)
+    return count
+
+
+def occurrences(start: datetime, step: timedelta, count: int) -> Iterator[datetime]:
+    """Yield the start of each occurrence, one at a time."""
+    for n in range(count):
+        yield start + n * step
+
+
+def find_conflict(
+    existing: Iterable[tuple[datetime, datetime]],
+    starts: Iterable[datetime],
+    duration: timedelta,
+) -> tuple[datetime, datetime, datetime] | None:
+    """Merge-sweep occurrences against the existing intervals of one table.
+
+    Both inputs are ordered by start, so every existing interval is looked at
+    once. Returns (occurrence start, existing start, existing end) of the
+    first overlap found.
+    """
+    existing = iter(existing)
+    current = next(existing, None)
+    for start in starts:
+        end = start + duration
+        # Intervals ending before this occurrence also end before later ones
+        while current is not None and current[1] <= start:
+            current = next(existing, None)
+        if current is None:
+            return None
+        if current[0] < end:
+            return start, current[0], current[1]
+    return None
@@ -0,0 +1,225 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.core.cache import cache_metrics, etag_matches
+from app.core.config import Config
+
+# Tags of cached responses, invalidated by the services on every write
+TABLES_TAG = "tables"
+RESERVATIONS_TAG = "reservations"
+
+_POLICY_ATTRIBUTE = "__response_cache__"
+
+
+def table_tag(table_id: int) -> str:
+    """Tag of responses that depend on the reservations of one table."""
+    return f"table:{table_id}"
+
+
+def cache_key(request: Request) -> str:
+    """Path and query of request, query parameters in a stable order."""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    raw_headers: list[tuple[bytes, bytes]]
+    etag: str | None
+    tags: tuple[str, ...]
+    expires_at: float
+    size: int
+
+    def to_response(self, request: Request) -> Response:
+        if self.etag is not None and etag_matches(
+            request.headers.get("if-none-match"), self.etag
+        ):
+            response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+            response.raw_headers = [
+                (name, value)
+                for name, value in self.raw_headers
+                if name in (b"etag", b"cache-control")
+            ]
+            return response
+        response = Response(self.body)
+        response.raw_headers = list(self.raw_headers)
+        return response
+
+
+class ResponseCache:
+    """Encoded GET responses keyed by path and query.
+
+    Entries expire after ttl seconds, the least recently used ones are
+    evicted once the bodies and headers exceed max_bytes. Concurrent misses
+    of a key wait for the first one instead of running the endpoint again.
+    Every entry carries tags, invalidate() drops the entries of a tag and
+    keeps responses loaded before the invalidation from being stored.
+
+    The cache is per worker. Writes in other workers reach it through the
+    TTL only, keep it short.
+    """
+
+    def __init__(
+        self,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        clock=time.monotonic,
+    ):
+        self.ttl = Config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = (
+            Config.RESPONSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.clock = clock
+        self.size = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+        self._versions: dict[str, int] = {}
+        self._inflight: dict[str, tuple[asyncio.Future, tuple[str, ...]]] = {}
+
+    def cached(self, tags: Callable[[Request], Iterable[str]]):
+        """Mark an endpoint of a CachedRoute router as cached in this cache.
+
+        tags(request) names what the response depends on.
+        """
+
+        def decorate(endpoint):
+            setattr(endpoint, _POLICY_ATTRIBUTE, (self, tags))
+            return endpoint
+
+        return decorate
+
+    async def serve(self, request: Request, handler, tags: tuple[str, ...], name: str):
+        """Response of handler for request, from the cache when possible."""
+        started = time.perf_counter()
+        key = cache_key(request)
+        entry = self.get(key)
+        if entry is None:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                # None when the first request got no cacheable response
+                entry = await asyncio.shield(inflight[0])
+        if entry is not None:
+            cache_metrics.observe(name, True, time.perf_counter() - started)
+            return entry.to_response(request)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (future, tags)
+        versions = [self._versions.get(tag, 0) for tag in tags]
+        try:
+            response = await handler(request)
+            entry = self._entry_of(response, tags)
+            if entry is not None and versions == [
+                self._versions.get(tag, 0) for tag in tags
+            ]:
+                self._store(key, entry)
+        finally:
+            if self._inflight.get(key, (None,))[0] is future:
+                del self._inflight[key]
+            future.set_result(entry)
+        cache_metrics.observe(name, False, time.perf_counter() - started)
+        return response
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self.clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def invalidate(self, *tags: str):
+        """Drop the responses of tags, including ones still being loaded."""
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key)
+        for key, (_, key_tags) in list(self._inflight.items()):
+            if not set(tags).isdisjoint(key_tags):
+                del self._inflight[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_tag.clear()
+        self._inflight.clear()
+        self.size = 0
+
+    def _entry_of(
+        self, response: Response, tags: tuple[str, ...]
+    ) -> CachedResponse | None:
+        """Cacheable copy of a complete 200 response."""
+        if response.status_code != status.HTTP_200_OK or response.background:
+            return None
+        body = getattr(response, "body", None)
+        if body is None:
+            # Streamed
+            return None
+        size = len(body) + sum(
+            len(name) + len(value) for name, value in response.raw_headers
+        )
+        return CachedResponse(
+            body=body,
+            raw_headers=list(response.raw_headers),
+            etag=response.headers.get("etag"),
+            tags=tags,
+            expires_at=self.clock() + self.ttl,
+            size=size,
+        )
+
+    def _store(self, key: str, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self.size += entry.size
+        for tag in entry.tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class CachedRoute(APIRoute):
+    """Route class serving endpoints marked with ResponseCache.cached from it.
+
+    The cache is consulted before the dependencies are solved, a hit opens
+    no database session.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        policy = getattr(self.endpoint, _POLICY_ATTRIBUTE, None)
+        if policy is None:
+            return handler
+        cache, tags = policy
+        name = f"response:{self.path_format}"
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+            return await cache.serve(request, handler, tuple(tags(request)), name)
+
+        return cached_handler
+
+
+response_cache = ResponseCache()
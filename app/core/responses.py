@@ -0,0 +1,12 @@
+from fastapi import Response
+
+
+class JSONBytesResponse(Response):
+    """JSON response for a body that was already encoded to bytes.
+
+    List endpoints encode their rows with a pydantic TypeAdapter and return
+    this class directly, which skips FastAPI's response_model validation and
+    jsonable_encoder pass. response_model stays on the route for the docs.
+    """
+
+    media_type = "application/json"
@@ -0,0 +1,52 @@
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+
+from app.core.config import Config
+
+
+class SeatIndex:
+    """Tables bucketed by seat count, for best-fit table assignment.
+
+    Buckets are walked from the smallest seat count that fits a party, so
+    larger tables are only considered once every smaller bucket was. The
+    index is local to the process and reloaded once older than ttl seconds,
+    TABLE_CACHE_TTL by default, like the cached table rows.
+    """
+
+    def __init__(self, ttl: float | None = None, clock=time.monotonic):
+        self.ttl = ttl or Config.TABLE_CACHE_TTL
+        self.clock = clock
+        self._seats: list[int] = []
+        self._buckets: dict[int, list[tuple[int, str]]] = {}
+        self._expires_at: float | None = None
+
+    def is_loaded(self) -> bool:
+        return self._expires_at is not None and self._expires_at > self.clock()
+
+    def load(self, rows):
+        """Load (id, seats, location) rows of every table."""
+        buckets: dict[int, list[tuple[int, str]]] = {}
+        for id, seats, location in rows:
+            buckets.setdefault(seats, []).append((id, location))
+        for tables in buckets.values():
+            tables.sort()
+        self._buckets = buckets
+        self._seats = sorted(buckets)
+        self._expires_at = self.clock() + self.ttl
+
+    def buckets(self, min_seats: int) -> Iterator[tuple[int, list[tuple[int, str]]]]:
+        """Yield (seats, [(id, location), ...]) of every bucket fitting min_seats.
+
+        Buckets come smallest first, tables of a bucket by id.
+        """
+        for seats in self._seats[bisect_left(self._seats, min_seats) :]:
+            yield seats, self._buckets[seats]
+
+    def clear(self):
+        self._buckets = {}
+        self._seats = []
+        self._expires_at = None
+
+
+seat_index = SeatIndex()
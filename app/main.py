@@ -1,27 +1,177 @@
+import logging
 import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.core.logger import logger
+from app.core.config import Config
+from app.core.database import get_engine
+from app.core.events import PostgresNotifyBridge, change_feed
+from app.core.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    MAX_KEY_LENGTH,
+    REPLAYED_HEADER,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    StoredResponse,
+    idempotency_store,
+    request_fingerprint,
+)
+from app.core.instrumentation import request_metrics, startup_metrics
+from app.core.logger import ACCESS_LOGGER, logger
+from app.core.openapi import serve_openapi_file
+from app.routers.metrics_router import metrics_router
 from app.routers.reservation_router import reservation_router
 from app.routers.table_router import table_router
+from app.routers.waitlist_router import waitlist_router
+from app.services.archive_service import reservation_archiver
+from app.services.waitlist_service import waitlist_matcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Bridge the change feed and start the background tasks."""
+    bridge = None
+    engine = get_engine()
+    if engine.dialect.name == "postgresql":
+        bridge = PostgresNotifyBridge(change_feed, engine)
+        try:
+            await bridge.start()
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning(f"Change feed stays local to this worker: {str(e)}")
+            bridge = None
+    waitlist_matcher.start()
+    reservation_archiver.start()
+    logger.info(f"Ready {startup_metrics.mark('ready'):.3f}s after import")
+    yield
+    await reservation_archiver.stop()
+    await waitlist_matcher.stop()
+    if bridge is not None:
+        await bridge.stop()
+
+
+access_logger = logging.getLogger(ACCESS_LOGGER)
 
 app = FastAPI(
     title="Restaurant Booking",
     description="API-сервис бронирования столиков в ресторане",
+    lifespan=lifespan,
 )
 
 app.include_router(table_router, prefix="/tables", tags=["tables"])
 app.include_router(reservation_router, prefix="/reservations", tags=["reservations"])
+app.include_router(waitlist_router, prefix="/waitlist", tags=["waitlist"])
+app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
+if Config.OPENAPI_FILE:
+    serve_openapi_file(app, Config.OPENAPI_FILE)
+
+
+@app.middleware("http")
+async def idempotent_posts(request: Request, call_next):
+    key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    if request.method != "POST" or key is None:
+        return await call_next(request)
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return JSONResponse(
+            status_code=400,
+            content={"detail": f"{IDEMPOTENCY_KEY_HEADER} is too long or empty"},
+        )
+
+    body = await request.body()
+    scoped_key = f"{request.method} {request.url.path} {key}"
+    fingerprint = request_fingerprint(request.method, request.url.path, body)
+    try:
+        stored = await idempotency_store.begin(scoped_key, fingerprint)
+    except IdempotencyKeyReused as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    except IdempotencyKeyInProgress as e:
+        return JSONResponse(status_code=409, content={"detail": str(e)})
+    if stored is not None:
+        replay = Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            headers=dict(stored.headers),
+        )
+        replay.headers[REPLAYED_HEADER] = "true"
+        return replay
+
+    try:
+        response = await call_next(request)
+        content = b"".join([chunk async for chunk in response.body_iterator])
+    except BaseException:
+        idempotency_store.release(scoped_key)
+        raise
+
+    # Server errors are not final, a retry with the same key runs again
+    if response.status_code >= 500:
+        idempotency_store.release(scoped_key)
+    else:
+        idempotency_store.complete(
+            scoped_key,
+            StoredResponse(
+                status_code=response.status_code,
+                body=content,
+                headers=[
+                    (name, value)
+                    for name, value in response.headers.items()
+                    if name != "content-length"
+                ],
+                fingerprint=fingerprint,
+            ),
+        )
+    return Response(
+        content=content,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        background=response.background,
+    )
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    stats = request_metrics.start_request()
+    response = await call_next(request)
+
+    route = request.scope.get("route")
+    elapsed = request_metrics.finish_request(
+        request.method,
+        route.path if route is not None else "<unmatched>",
+        response.status_code,
+        stats,
+    )
+    response.headers["Server-Timing"] = stats.server_timing(elapsed)
+    if "first_request" not in startup_metrics.milestones:
+        logger.info(
+            f"Served the first request {startup_metrics.mark('first_request'):.3f}s "
+            f"after import"
+        )
+    return response
 
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
     response = await call_next(request)
-    process_time = (time.time() - start_time) * 1000
+    process_time = (time.perf_counter() - start_time) * 1000
 
-    logger.info(
-        f"[{request.method}] {request.url.path} - {response.status_code} - {process_time:.2f}ms"
+    # Server errors are logged above INFO so access log sampling keeps them
+    access_logger.log(
+        logging.ERROR if response.status_code >= 500 else logging.INFO,
+        "%s %s - %s - %.2fms",
+        request.method,
+        request.url.path,
+        response.status_code,
+        process_time,
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round(process_time, 2),
+        },
     )
     return response
+
+
+startup_metrics.mark("imported")
@@ -1,8 +1,13 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List
+from uuid import UUID
 
+from sqlalchemy import Index, and_, func, literal_column, text
 from sqlmodel import Field, Relationship, SQLModel
 
+# Longest reservation accepted by the API
+MAX_DURATION_MINUTES = 240
+
 
 class Table(SQLModel, table=True):
     __tablename__ = "tables"
@@ -15,13 +20,126 @@ class Table(SQLModel, table=True):
     reservations: List["Reservation"] = Relationship(back_populates="table")
 
 
+def reservation_end_default(context) -> datetime:
+    """Column default deriving end_time from the inserted row's start and duration."""
+    parameters = context.get_current_parameters()
+    return parameters["reservation_time"] + timedelta(
+        minutes=parameters["duration_minutes"]
+    )
+
+
 class Reservation(SQLModel, table=True):
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_table_id_id", "table_id", "id"),
+        Index(
+            "ix_reservations_table_id_reservation_time_end_time",
+            "table_id",
+            "reservation_time",
+            "end_time",
+        ),
+        Index("ix_reservations_reservation_time_id", "reservation_time", "id"),
+        Index(
+            "ix_reservations_customer_name_id",
+            "customer_name",
+            "id",
+            postgresql_ops={"customer_name": "varchar_pattern_ops"},
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     customer_name: str
     table_id: int = Field(foreign_key="tables.id")
     reservation_time: datetime
     duration_minutes: int
+    # Denormalized reservation_time + duration_minutes, so that both bounds of
+    # an overlap test can be compared in SQL
+    end_time: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={"default": reservation_end_default},
+    )
+    # Shared by the occurrences and tables of one recurring or block booking
+    series_id: UUID | None = Field(default=None, index=True)
 
     table: Table = Relationship(back_populates="reservations")
+
+
+class ReservationHistory(SQLModel, table=True):
+    """A past reservation moved out of reservations by the archiver.
+
+    On PostgreSQL the table is range partitioned by month of
+    reservation_time, which is why the primary key includes it. Rows keep
+    the id they had in reservations.
+    """
+
+    __tablename__ = "reservations_history"
+    __table_args__ = (
+        Index("ix_reservations_history_table_id_id", "table_id", "id"),
+        {"postgresql_partition_by": "RANGE (reservation_time)"},
+    )
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    customer_name: str
+    # No foreign key, the history outlives deleted tables
+    table_id: int
+    reservation_time: datetime = Field(primary_key=True)
+    duration_minutes: int
+    end_time: datetime
+    series_id: UUID | None = None
+
+
+class WaitlistEntry(SQLModel, table=True):
+    """A booking request waiting for a slot to free up.
+
+    The reservation may start anywhere in [earliest, latest], on table_id or
+    on any table with at least min_seats seats when no table is given.
+    """
+
+    __tablename__ = "waitlist"
+    __table_args__ = (
+        # Freed slots look up waiting entries by their window
+        Index(
+            "ix_waitlist_waiting_earliest_latest",
+            "earliest",
+            "latest",
+            postgresql_where=text("status = 'waiting'"),
+            sqlite_where=text("status = 'waiting'"),
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    customer_name: str
+    table_id: int | None = Field(
+        default=None, foreign_key="tables.id", ondelete="CASCADE"
+    )
+    min_seats: int = 1
+    earliest: datetime
+    latest: datetime
+    duration_minutes: int
+    priority: int = 0
+    status: str = "waiting"
+    reservation_id: int | None = Field(
+        default=None, foreign_key="reservations.id", ondelete="SET NULL"
+    )
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+def reservation_overlaps(start: datetime, end: datetime, postgres: bool):
+    """SQL condition matching reservations that overlap [start, end).
+
+    PostgreSQL compares the generated period column, which is covered by the
+    GiST index behind the reservations_no_overlap constraint. Elsewhere both
+    bounds are compared against (table_id, reservation_time, end_time), with
+    the start also bounded by the longest reservation so the index range only
+    spans rows that can overlap.
+    """
+    if postgres:
+        return literal_column("reservations.period").op("&&")(
+            func.tsrange(start, end, "[)")
+        )
+    return and_(
+        Reservation.reservation_time < end,
+        Reservation.reservation_time > start - timedelta(minutes=MAX_DURATION_MINUTES),
+        Reservation.end_time > start,
+    )
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import cache_metrics
+from app.core.database import get_engine
+from app.core.instrumentation import request_metrics, startup_metrics
+from app.core.pool_metrics import pool_metrics
+
+# Prometheus text exposition format
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(
+        request_metrics.render()
+        + cache_metrics.render()
+        + pool_metrics.render(get_engine())
+        + startup_metrics.render(),
+        media_type=PROMETHEUS_MEDIA_TYPE,
+    )
+
+
+@metrics_router.get("/db")
+async def get_db_metrics():
+    return pool_metrics.snapshot(get_engine())
@@ -1,28 +1,155 @@
-from typing import List
+from datetime import datetime
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
+from app.core.events import change_feed, sse_stream
 from app.core.exceptions import (
     DatabaseOperationException,
     ReservationNotFoundException,
     TableDoesntExistException,
 )
-from app.schemas.reservation import ReservationCreate, ReservationRead
+from app.core.pagination import PageParams
+from app.core.response_cache import (
+    RESERVATIONS_TAG,
+    CachedRoute,
+    response_cache,
+    table_tag,
+)
+from app.core.responses import JSONBytesResponse
+from app.schemas.reservation import (
+    MAX_BULK_SIZE,
+    ReservationAutoCreate,
+    ReservationBulkResult,
+    ReservationCreate,
+    ReservationRead,
+    ReservationSeriesCreate,
+    ReservationSeriesRead,
+    reservation_rows,
+)
+from app.services.allocation_service import AllocationService
+from app.services.archive_service import ArchiveService
 from app.services.reservation_service import ReservationService
 
-reservation_router = APIRouter()
+reservation_router = APIRouter(route_class=CachedRoute)
 reservation_service = ReservationService()
+allocation_service = AllocationService(reservation_service)
+archive_service = ArchiveService()
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def reservation_list_tags(request: Request) -> tuple[str, ...]:
+    """A list filtered by table only changes with that table's reservations."""
+    table_id = request.query_params.get("table_id")
+    if table_id is not None and table_id.isdigit():
+        return (table_tag(int(table_id)),)
+    return (RESERVATIONS_TAG,)
 
 
 @reservation_router.get("/", response_model=List[ReservationRead])
-async def get_all_reservations(session: AsyncSession = Depends(get_session)):
+@response_cache.cached(tags=reservation_list_tags)
+async def get_all_reservations(
+    page: PageParams = Depends(),
+    table_id: int | None = None,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    customer_name: str | None = Query(None, min_length=1),
+    session: AsyncSession = Depends(get_session),
+):
+    """List reservations page by page.
+
+    The next page is requested with the cursor from the X-Next-Cursor header.
+    """
+    try:
+        reservations = await reservation_service.get_reservation_rows(
+            session,
+            after_id=page.after_id,
+            limit=page.limit,
+            table_id=table_id,
+            starts_from=from_,
+            starts_before=to,
+            customer_name=customer_name,
+        )
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    response = JSONBytesResponse(reservation_rows.dump_json(reservations))
+    page.set_next_cursor(response, reservations)
+    return response
+
+
+@reservation_router.get("/history", response_model=List[ReservationRead])
+async def get_reservation_history(
+    page: PageParams = Depends(),
+    table_id: int | None = None,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    customer_name: str | None = Query(None, min_length=1),
+    session: AsyncSession = Depends(get_session),
+):
+    """List archived past reservations page by page.
+
+    Takes the filters of the reservation list, a from/to range only reads
+    the archive partitions of those months.
+    """
     try:
-        reservations = await reservation_service.get_all_reservations(session)
+        reservations = await archive_service.get_history_rows(
+            session,
+            after_id=page.after_id,
+            limit=page.limit,
+            table_id=table_id,
+            starts_from=from_,
+            starts_before=to,
+            customer_name=customer_name,
+        )
     except DatabaseOperationException as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return reservations
+    response = JSONBytesResponse(reservation_rows.dump_json(reservations))
+    page.set_next_cursor(response, reservations)
+    return response
+
+
+@reservation_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}
+    },
+)
+async def export_reservations(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session: AsyncSession = Depends(get_session),
+):
+    """Stream every reservation as NDJSON or CSV"""
+    return StreamingResponse(
+        reservation_service.export_reservations(session.bind, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="reservations.{format}"'
+        },
+    )
+
+
+@reservation_router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def reservation_events(table_id: List[int] | None = Query(None)):
+    """Push reservation changes as Server-Sent Events.
+
+    Events are named reservation.created and reservation.deleted and carry
+    the reservation with the table window that became busy or free. Repeat
+    table_id to follow only some tables.
+    """
+    return StreamingResponse(
+        sse_stream(change_feed, set(table_id) if table_id else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @reservation_router.post("/", response_model=ReservationRead)
@@ -43,6 +170,68 @@ async def create_reservation(
     return new_reservation
 
 
+@reservation_router.post("/auto", response_model=ReservationRead)
+async def create_reservation_auto(
+    reservation_data: ReservationAutoCreate,
+    session: AsyncSession = Depends(get_session),
+):
+    """Book the best-fit free table for a party.
+
+    The smallest free table seating party_size is picked, preferring tables
+    in location when given and, among equal tables, the one leaving the
+    fewest unusable gaps in its day.
+    """
+    try:
+        new_reservation = await allocation_service.allocate(reservation_data, session)
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return new_reservation
+
+
+@reservation_router.post("/bulk", response_model=List[ReservationBulkResult])
+async def create_reservations(
+    reservations_data: List[ReservationCreate] = Body(
+        min_length=1, max_length=MAX_BULK_SIZE
+    ),
+    session: AsyncSession = Depends(get_session),
+):
+    """Create several reservations at once.
+
+    Each item is reported as created, conflict or table_not_found. Items
+    conflicting with an earlier item of the same batch are rejected.
+    """
+    try:
+        results = await reservation_service.create_reservations(
+            reservations_data, session
+        )
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return results
+
+
+@reservation_router.post("/series", response_model=ReservationSeriesRead)
+async def create_series(
+    series: ReservationSeriesCreate, session: AsyncSession = Depends(get_session)
+):
+    """Book a recurring reservation or a block of tables in one request.
+
+    Every occurrence on every table is created, or none if any conflicts.
+    """
+    try:
+        result = await reservation_service.create_series(series, session)
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except TableDoesntExistException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return result
+
+
 @reservation_router.delete("/{id}", status_code=status.HTTP_200_OK)
 async def delete_reservation(id: int, session: AsyncSession = Depends(get_session)):
     """Delete a reservation by id"""
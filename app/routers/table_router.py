@@ -1,25 +1,134 @@
-from typing import List
+from datetime import date, datetime
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import etag_matches
 from app.core.database import get_session
 from app.core.exceptions import DatabaseOperationException, TableNotFoundException
-from app.schemas.table import TableCreate, TableRead
+from app.core.occupancy import SLOT_MINUTES, busy_runs, pack
+from app.core.pagination import PageParams
+from app.core.queries import row_dicts
+from app.core.response_cache import (
+    RESERVATIONS_TAG,
+    TABLES_TAG,
+    CachedRoute,
+    response_cache,
+)
+from app.core.responses import JSONBytesResponse
+from app.models.models import MAX_DURATION_MINUTES
+from app.schemas.reservation import MAX_BULK_SIZE
+from app.schemas.table import (
+    TableCreate,
+    TableOccupancy,
+    TableOccupancyDay,
+    TableRead,
+    table_rows,
+)
 from app.services.table_service import TableService
 
-table_router = APIRouter()
+table_router = APIRouter(route_class=CachedRoute)
 table_service = TableService()
 
+MAX_OCCUPANCY_DAYS = 62
 
-@table_router.get("/", response_model=List[TableRead])
-async def get_all_tables(session: AsyncSession = Depends(get_session)):
-    """List all tables"""
+
+@table_router.get(
+    "/",
+    response_model=List[TableRead],
+    responses={304: {"description": "Not Modified"}},
+)
+@response_cache.cached(tags=lambda request: (TABLES_TAG,))
+async def get_all_tables(
+    page: PageParams = Depends(),
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_session),
+):
+    """List tables page by page, answers 304 when If-None-Match is current"""
+    try:
+        tables, etag = await table_service.get_table_rows_page(
+            session, after_id=page.after_id, limit=page.limit
+        )
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response = JSONBytesResponse(table_rows.dump_json(tables), headers=headers)
+    page.set_next_cursor(response, tables)
+    return response
+
+
+@table_router.get("/available", response_model=List[TableRead])
+@response_cache.cached(tags=lambda request: (TABLES_TAG, RESERVATIONS_TAG))
+async def get_available_tables(
+    start: datetime,
+    duration_minutes: int = Query(gt=0, le=MAX_DURATION_MINUTES),
+    min_seats: int = Query(1, gt=0),
+    location: str | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """List tables that are free for the whole window, smallest first"""
+    try:
+        tables = await table_service.get_available_tables(
+            session, start, duration_minutes, min_seats, location
+        )
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return JSONBytesResponse(table_rows.dump_json(row_dicts(tables)))
+
+
+@table_router.get(
+    "/{id}/occupancy",
+    response_model=TableOccupancy,
+    responses={200: {"content": {"application/octet-stream": {}}}},
+)
+async def get_table_occupancy(
+    id: int,
+    from_: date = Query(alias="from"),
+    to: date = Query(),
+    format: Literal["json", "bytes"] = "json",
+    session: AsyncSession = Depends(get_session),
+):
+    """Occupied 15-minute slots of a table per day.
+
+    json returns the busy runs of each day as [first slot, slot count] pairs,
+    bytes returns 12 little-endian bytes (one bit per slot) per day.
+    """
+    if to < from_ or (to - from_).days >= MAX_OCCUPANCY_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"to must be within {MAX_OCCUPANCY_DAYS} days after from",
+        )
     try:
-        tables = await table_service.get_all_tables(session)
+        days = await table_service.get_table_occupancy(id, from_, to, session)
+    except TableNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except DatabaseOperationException as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return tables
+
+    if format == "bytes":
+        return Response(
+            content=b"".join(pack(bits) for _, bits in days),
+            media_type="application/octet-stream",
+            headers={"X-Slot-Minutes": str(SLOT_MINUTES)},
+        )
+    return TableOccupancy(
+        table_id=id,
+        slot_minutes=SLOT_MINUTES,
+        days=[TableOccupancyDay(date=day, busy=busy_runs(bits)) for day, bits in days],
+    )
 
 
 @table_router.post("/", response_model=TableRead)
@@ -35,6 +144,20 @@ async def create_table(
     return new_table
 
 
+@table_router.post("/bulk", response_model=List[TableRead])
+async def create_tables(
+    tables_data: List[TableCreate] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+    session: AsyncSession = Depends(get_session),
+):
+    """Create several tables at once"""
+    try:
+        new_tables = await table_service.create_tables(tables_data, session)
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return new_tables
+
+
 @table_router.delete("/{id}", status_code=status.HTTP_200_OK)
 async def delete_table(id: int, session: AsyncSession = Depends(get_session)):
     """Delete a table by id"""
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.exceptions import (
+    DatabaseOperationException,
+    TableDoesntExistException,
+    WaitlistEntryNotFoundException,
+)
+from app.schemas.waitlist import WaitlistCreate, WaitlistRead
+from app.services.waitlist_service import WaitlistService
+
+waitlist_router = APIRouter()
+waitlist_service = WaitlistService()
+
+
+@waitlist_router.post("/", response_model=WaitlistRead)
+async def add_waitlist_entry(
+    entry_data: WaitlistCreate, session: AsyncSession = Depends(get_session)
+):
+    """Wait for a table when the requested time is taken.
+
+    The entry is booked automatically once a matching slot is freed, its
+    status becomes assigned and reservation_id points to the booking.
+    """
+    try:
+        entry = await waitlist_service.add_entry(entry_data, session)
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except TableDoesntExistException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return entry
+
+
+@waitlist_router.get("/{id}", response_model=WaitlistRead)
+async def get_waitlist_entry(id: int, session: AsyncSession = Depends(get_session)):
+    """Get a waitlist entry by id"""
+    try:
+        entry = await waitlist_service.get_entry(id, session)
+    except WaitlistEntryNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return entry
+
+
+@waitlist_router.delete("/{id}", response_model=WaitlistRead)
+async def cancel_waitlist_entry(id: int, session: AsyncSession = Depends(get_session)):
+    """Leave the waitlist"""
+    try:
+        entry = await waitlist_service.cancel_entry(id, session)
+    except WaitlistEntryNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except DatabaseOperationException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return entry
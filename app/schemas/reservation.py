@@ -1,6 +1,42 @@
 from datetime import datetime, timedelta
+from typing import Literal
+from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    PositiveInt,
+    TypeAdapter,
+    field_validator,
+    model_validator,
+)
+from typing_extensions import TypedDict
+
+from app.core.recurrence import FREQUENCIES, occurrence_count
+from app.models.models import MAX_DURATION_MINUTES
+
+# Largest batch accepted by the bulk endpoints
+MAX_BULK_SIZE = 1000
+# Longest recurring series, a year of weekly bookings
+MAX_SERIES_OCCURRENCES = 52
+# Most tables booked together as one block
+MAX_BLOCK_TABLES = 10
+# How far ahead a booking may start
+BOOKING_HORIZON = timedelta(days=30)
+
+
+def in_booking_window(value: datetime) -> datetime:
+    """Check that a requested start is in the future and within BOOKING_HORIZON.
+
+    Compared with the current time on every call, Field(gt=...) bounds would
+    be fixed when the module is imported.
+    """
+    now = datetime.now(value.tzinfo)
+    if not now < value < now + BOOKING_HORIZON:
+        raise ValueError(
+            f"must be in the future and at most {BOOKING_HORIZON.days} days ahead"
+        )
+    return value
 
 
 class ReservationCreate(BaseModel):
@@ -17,8 +53,34 @@ class ReservationCreate(BaseModel):
     )
     duration_minutes: int = Field(
         gt=10,
-        le=240,  # 4 hours maximum
+        le=MAX_DURATION_MINUTES,  # 4 hours maximum
+    )
+
+
+class ReservationAutoCreate(BaseModel):
+    """A booking for a party, the table is picked by the allocator."""
+
+    customer_name: str = Field(
+        min_length=2,
+        max_length=50,
+    )
+    party_size: int = Field(
+        gt=0,
+    )
+    reservation_time: datetime
+    duration_minutes: int = Field(
+        gt=10,
+        le=MAX_DURATION_MINUTES,
     )
+    location: str | None = Field(
+        default=None,
+        min_length=1,
+    )
+
+    @field_validator("reservation_time")
+    @classmethod
+    def check_reservation_time(cls, value: datetime) -> datetime:
+        return in_booking_window(value)
 
 
 class ReservationRead(BaseModel):
@@ -27,6 +89,113 @@ class ReservationRead(BaseModel):
     table_id: int
     reservation_time: datetime
     duration_minutes: int
+    end_time: datetime
+    series_id: UUID | None = None
 
     class Config:
         from_attributes = True
+
+
+class ReservationRow(TypedDict):
+    """ReservationRead fields of a selected row, encoded without a model."""
+
+    id: int
+    customer_name: str
+    table_id: int
+    reservation_time: datetime
+    duration_minutes: int
+    end_time: datetime
+    series_id: UUID | None
+
+
+RESERVATION_COLUMNS = tuple(ReservationRow.__annotations__)
+# Encodes list pages straight to JSON bytes, rows from the database are
+# trusted and not validated again
+reservation_rows = TypeAdapter(list[ReservationRow])
+
+
+class ReservationBulkResult(BaseModel):
+    index: int
+    status: Literal["created", "conflict", "table_not_found"]
+    reservation: ReservationRead | None = None
+    detail: str | None = None
+
+
+class RecurrenceRule(BaseModel):
+    """Repeat a booking every interval days or weeks.
+
+    The series ends after count occurrences, the first one included, or with
+    the last occurrence starting on or before until, whichever comes first.
+    """
+
+    frequency: Literal["daily", "weekly"] = "weekly"
+    interval: int = Field(default=1, ge=1, le=52)
+    count: int | None = Field(default=None, ge=1, le=MAX_SERIES_OCCURRENCES)
+    until: datetime | None = None
+
+    @model_validator(mode="after")
+    def check_end(self):
+        if self.count is None and self.until is None:
+            raise ValueError("A recurrence needs count or until")
+        return self
+
+    @property
+    def step(self) -> timedelta:
+        return FREQUENCIES[self.frequency] * self.interval
+
+
+class ReservationSeriesCreate(BaseModel):
+    """A recurring reservation, a block of tables booked together, or both."""
+
+    customer_name: str = Field(
+        min_length=2,
+        max_length=50,
+    )
+    table_ids: list[PositiveInt] = Field(
+        min_length=1,
+        max_length=MAX_BLOCK_TABLES,
+    )
+    reservation_time: datetime
+    duration_minutes: int = Field(
+        gt=10,
+        le=MAX_DURATION_MINUTES,
+    )
+    recurrence: RecurrenceRule | None = None
+
+    @field_validator("reservation_time")
+    @classmethod
+    def check_reservation_time(cls, value: datetime) -> datetime:
+        return in_booking_window(value)
+
+    @model_validator(mode="after")
+    def check_series(self):
+        if len(set(self.table_ids)) != len(self.table_ids):
+            raise ValueError("table_ids must not repeat")
+        if self.recurrence is not None:
+            count = self.occurrence_count()
+            if count == 0:
+                raise ValueError("until is before the first occurrence")
+            if count > MAX_SERIES_OCCURRENCES:
+                raise ValueError(
+                    f"A series has at most {MAX_SERIES_OCCURRENCES} occurrences"
+                )
+        return self
+
+    def occurrence_count(self) -> int:
+        if self.recurrence is None:
+            return 1
+        until = self.recurrence.until
+        if until is not None:
+            # Compared like reservation_time, both are stored naive
+            until = until.replace(tzinfo=None)
+        return occurrence_count(
+            self.reservation_time.replace(tzinfo=None),
+            self.recurrence.step,
+            self.recurrence.count,
+            until,
+        )
+
+
+class ReservationSeriesRead(BaseModel):
+    series_id: UUID
+    reservations: list[ReservationRead]
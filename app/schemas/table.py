@@ -1,4 +1,7 @@
-from pydantic import BaseModel, Field
+from datetime import date
+
+from pydantic import BaseModel, Field, TypeAdapter
+from typing_extensions import TypedDict
 
 
 class TableCreate(BaseModel):
@@ -14,3 +17,27 @@ class TableRead(BaseModel):
     location: str
 
     model_config = {"from_attributes": True}
+
+
+class TableRow(TypedDict):
+    """TableRead fields of a selected or cached row, encoded without a model."""
+
+    id: int
+    name: str
+    seats: int
+    location: str
+
+
+TABLE_COLUMNS = tuple(TableRow.__annotations__)
+table_rows = TypeAdapter(list[TableRow])
+
+
+class TableOccupancyDay(BaseModel):
+    date: date
+    busy: list[tuple[int, int]]
+
+
+class TableOccupancy(BaseModel):
+    table_id: int
+    slot_minutes: int
+    days: list[TableOccupancyDay]
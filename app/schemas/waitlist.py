@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.models.models import MAX_DURATION_MINUTES
+from app.schemas.reservation import in_booking_window
+
+# Widest window between the earliest and the latest accepted start
+MAX_WAITLIST_WINDOW = timedelta(days=7)
+
+WaitlistStatus = Literal["waiting", "assigned", "cancelled", "expired"]
+
+
+class WaitlistCreate(BaseModel):
+    customer_name: str = Field(
+        min_length=2,
+        max_length=50,
+    )
+    table_id: int | None = Field(
+        default=None,
+        gt=0,
+    )
+    min_seats: int = Field(
+        default=1,
+        gt=0,
+    )
+    earliest: datetime
+    latest: datetime
+    duration_minutes: int = Field(
+        gt=10,
+        le=MAX_DURATION_MINUTES,
+    )
+    priority: int = Field(
+        default=0,
+        ge=0,
+        le=100,
+    )
+
+    @field_validator("earliest")
+    @classmethod
+    def check_earliest(cls, value: datetime) -> datetime:
+        return in_booking_window(value)
+
+    @model_validator(mode="after")
+    def check_window(self):
+        if self.latest < self.earliest:
+            raise ValueError("latest must not be before earliest")
+        if self.latest - self.earliest > MAX_WAITLIST_WINDOW:
+            raise ValueError(
+                f"The window spans at most {MAX_WAITLIST_WINDOW.days} days"
+            )
+        return self
+
+
+class WaitlistRead(BaseModel):
+    id: int
+    customer_name: str
+    table_id: int | None
+    min_seats: int
+    earliest: datetime
+    latest: datetime
+    duration_minutes: int
+    priority: int
+    status: WaitlistStatus
+    reservation_id: int | None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
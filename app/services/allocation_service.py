@@ -0,0 +1,182 @@
+import logging
+from contextlib import nullcontext
+from datetime import datetime, time, timedelta
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import is_postgres
+from app.core.exceptions import DatabaseOperationException, TableDoesntExistException
+from app.core.interval_index import ReservationIntervalIndex
+from app.core.occupancy import DAY
+from app.core.queries import select_columns
+from app.core.seat_index import SeatIndex, seat_index
+from app.models.models import Reservation, Table, reservation_overlaps
+from app.schemas.reservation import ReservationAutoCreate, ReservationCreate
+from app.services.reservation_service import INDEX_COLUMNS, ReservationService
+
+logger = logging.getLogger(__name__)
+
+# Columns of the seat index entries, in SeatIndex.load order
+SEAT_INDEX_COLUMNS = ("id", "seats", "location")
+
+# Free time left next to a booking that is shorter than this is unlikely to
+# be booked again and counts as wasted
+MIN_USEFUL_GAP = timedelta(minutes=60)
+
+# Ranked tables tried in turn when concurrent bookings take the best ones
+MAX_ALLOCATION_ATTEMPTS = 5
+
+
+class AllocationService:
+    """Pick the table for a party instead of the client.
+
+    Tables come from the seat index. Their reservations around the requested
+    day are read with one query into an interval index built for the
+    request, so every table is ranked on current data without a query of
+    its own. The booking itself goes through create_reservation and its
+    conflict checks.
+    """
+
+    def __init__(
+        self,
+        reservations: ReservationService | None = None,
+        seats: SeatIndex | None = None,
+    ):
+        self.reservations = reservations or ReservationService()
+        self.seats = seat_index if seats is None else seats
+
+    async def allocate(
+        self, request: ReservationAutoCreate, session: AsyncSession
+    ) -> Reservation:
+        """Book the best-fit free table for the party.
+
+        Raises ValueError when no table fitting the party is free.
+        """
+        start = request.reservation_time.replace(tzinfo=None)
+        end = start + timedelta(minutes=request.duration_minutes)
+        await self._load_seats(session)
+        index = await self._load_intervals(request.party_size, start, end, session)
+
+        for table_id in self.rank_tables(
+            index, request.party_size, start, end, request.location
+        ):
+            reservation_data = ReservationCreate(
+                customer_name=request.customer_name,
+                table_id=table_id,
+                reservation_time=request.reservation_time,
+                duration_minutes=request.duration_minutes,
+            )
+            # A lost race on PostgreSQL fails on the exclusion constraint,
+            # the savepoint keeps the transaction usable for the next table
+            attempt = session.begin_nested() if is_postgres(session) else nullcontext()
+            try:
+                async with attempt:
+                    reservation = await self.reservations.create_reservation(
+                        reservation_data, session
+                    )
+            except (ValueError, TableDoesntExistException):
+                # Booked or deleted by another request since the query
+                continue
+            logger.info(
+                f"Allocated table {table_id} to a party of {request.party_size}"
+            )
+            return reservation
+
+        logger.warning(
+            f"No table free for a party of {request.party_size} "
+            f"from {start} to {end}"
+        )
+        raise ValueError(
+            f"No table for {request.party_size} guests is free from {start} to {end}."
+        )
+
+    def rank_tables(
+        self,
+        index: ReservationIntervalIndex,
+        party_size: int,
+        start: datetime,
+        end: datetime,
+        location: str | None = None,
+        limit: int = MAX_ALLOCATION_ATTEMPTS,
+    ) -> list[int]:
+        """Ids of up to limit tables free for [start, end) in index, best fit first.
+
+        Tables in the preferred location come first, then the ones with the
+        fewest seats, then the ones where the booking wastes the least time
+        in short gaps and splits the fewest free windows of the day. Seat
+        buckets are walked smallest first and the walk stops once limit
+        preferred tables were found, larger tables cannot rank before them.
+        """
+        day_start = datetime.combine(start.date(), time())
+        day_end = day_start + DAY
+
+        ranked = []
+        preferred = 0
+        for seats, tables in self.seats.buckets(party_size):
+            if preferred >= limit:
+                break
+            for table_id, table_location in tables:
+                if index.find_overlap(table_id, start, end):
+                    continue
+                previous_end, next_start = index.neighbours(table_id, start, end)
+                gaps = (
+                    start - max(previous_end or day_start, day_start),
+                    max(min(next_start or day_end, day_end) - end, timedelta(0)),
+                )
+                wasted = sum(
+                    (gap for gap in gaps if gap < MIN_USEFUL_GAP), timedelta(0)
+                )
+                fragments = sum(1 for gap in gaps if gap)
+                elsewhere = location is not None and table_location != location
+                preferred += not elsewhere
+                ranked.append((elsewhere, seats, wasted, fragments, table_id))
+
+        ranked.sort()
+        return [rank[-1] for rank in ranked[:limit]]
+
+    async def _load_intervals(
+        self, party_size: int, start: datetime, end: datetime, session: AsyncSession
+    ) -> ReservationIntervalIndex:
+        """Reservations of the fitting tables overlapping the day of start.
+
+        The whole day is read, rank_tables measures the gaps a booking leaves
+        up to midnight. A booking running past midnight extends the window.
+        """
+        table_ids = [
+            table_id
+            for _, tables in self.seats.buckets(party_size)
+            for table_id, _ in tables
+        ]
+        index = ReservationIntervalIndex()
+        if not table_ids:
+            return index
+        day_start = datetime.combine(start.date(), time())
+        window_end = max(day_start + DAY, end)
+        try:
+            result = await session.exec(
+                select_columns(Reservation, INDEX_COLUMNS).where(
+                    Reservation.table_id.in_(table_ids),
+                    reservation_overlaps(day_start, window_end, is_postgres(session)),
+                )
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading reservations to rank: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error loading reservations to rank: {str(e)}"
+            )
+        index.load(result.all(), table_ids=table_ids)
+        return index
+
+    async def _load_seats(self, session: AsyncSession):
+        """Fill the seat index unless it is loaded."""
+        if self.seats.is_loaded():
+            return
+        try:
+            result = await session.exec(select_columns(Table, SEAT_INDEX_COLUMNS))
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading the seat index: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error loading the seat index: {str(e)}"
+            )
+        self.seats.load(result.all())
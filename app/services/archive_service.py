@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import re
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, insert, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import Config
+from app.core.database import get_session, is_postgres, run_after_commit
+from app.core.exceptions import DatabaseOperationException
+from app.core.queries import row_dicts, select_columns
+from app.core.response_cache import (
+    RESERVATIONS_TAG,
+    ResponseCache,
+    response_cache,
+    table_tag,
+)
+from app.models.models import Reservation, ReservationHistory
+from app.schemas.reservation import RESERVATION_COLUMNS, ReservationRow
+from app.services.reservation_service import ReservationService
+
+logger = logging.getLogger(__name__)
+
+# Reservations moved per archival transaction
+ARCHIVE_BATCH_SIZE = 1000
+
+# First key of the advisory lock letting one worker archive at a time
+ARCHIVE_LOCK_NAMESPACE = 7302
+
+HISTORY_TABLE = ReservationHistory.__tablename__
+PARTITION_NAME = re.compile(rf"{HISTORY_TABLE}_y(\d{{4}})m(\d{{2}})")
+
+
+def shift_months(month: date, months: int) -> date:
+    """First day of the month months after the month of the given day."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the history partition holding the month of the given day."""
+    return f"{HISTORY_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+class ArchiveService:
+    def __init__(
+        self,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        responses: ResponseCache | None = None,
+    ):
+        self.batch_size = batch_size
+        self.responses = response_cache if responses is None else responses
+
+    async def archive_batch(self, cutoff: datetime, session: AsyncSession) -> int:
+        """Move the oldest reservations starting before cutoff to the history.
+
+        Moves at most batch_size rows, returns how many moved. On PostgreSQL
+        the monthly partitions the rows fall in are created first, and
+        nothing moves while another worker holds the archive lock.
+        """
+        try:
+            if not await self._try_lock(session):
+                return 0
+            result = await session.exec(
+                select(
+                    Reservation.id, Reservation.table_id, Reservation.reservation_time
+                )
+                .where(Reservation.reservation_time < cutoff)
+                .order_by(Reservation.reservation_time, Reservation.id)
+                .limit(self.batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                return 0
+
+            if is_postgres(session):
+                months = {shift_months(row.reservation_time, 0) for row in rows}
+                for month in sorted(months):
+                    await self._create_partition(month, session)
+            ids = [row.id for row in rows]
+            await session.exec(
+                insert(ReservationHistory).from_select(
+                    RESERVATION_COLUMNS,
+                    select_columns(Reservation, RESERVATION_COLUMNS).where(
+                        Reservation.id.in_(ids)
+                    ),
+                )
+            )
+            await session.exec(delete(Reservation).where(Reservation.id.in_(ids)))
+            tags = {RESERVATIONS_TAG, *(table_tag(row.table_id) for row in rows)}
+            run_after_commit(session, lambda: self.responses.invalidate(*tags))
+        except SQLAlchemyError as e:
+            logger.error(f"Database error archiving reservations: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error archiving reservations: {str(e)}"
+            )
+
+        logger.info(f"Archived {len(ids)} reservations")
+        return len(ids)
+
+    async def detach_partitions(self, before: date, session: AsyncSession) -> list[str]:
+        """Detach the history partitions of months ending on or before before.
+
+        Detached partitions stay in the database as standalone tables, to be
+        dumped or dropped. Only PostgreSQL partitions the history.
+        """
+        if not is_postgres(session):
+            return []
+        try:
+            if not await self._try_lock(session):
+                return []
+            result = await session.exec(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+                ),
+                params={"parent": HISTORY_TABLE},
+            )
+            detached = []
+            for (name,) in result.all():
+                match = PARTITION_NAME.fullmatch(name)
+                if match is None:
+                    continue
+                month = date(int(match[1]), int(match[2]), 1)
+                if shift_months(month, 1) <= before:
+                    await session.exec(
+                        text(f"ALTER TABLE {HISTORY_TABLE} DETACH PARTITION {name}")
+                    )
+                    detached.append(name)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error detaching history partitions: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error detaching history partitions: {str(e)}"
+            )
+
+        if detached:
+            logger.info(f"Detached history partitions {', '.join(sorted(detached))}")
+        return detached
+
+    async def get_history_rows(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int | None = None,
+        table_id: int | None = None,
+        starts_from: datetime | None = None,
+        starts_before: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> list[ReservationRow]:
+        """Get a page of archived reservations, filtered like the live list.
+
+        A starts_from or starts_before bound lets PostgreSQL skip the
+        partitions of other months.
+        """
+        statement = ReservationService._filter_reservations(
+            select_columns(ReservationHistory, RESERVATION_COLUMNS),
+            after_id,
+            limit,
+            table_id,
+            starts_from,
+            starts_before,
+            customer_name,
+            model=ReservationHistory,
+        )
+        try:
+            result = await session.exec(statement)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving reservation history: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error retrieving reservation history: {str(e)}"
+            )
+
+        return row_dicts(result.all())
+
+    async def _try_lock(self, session: AsyncSession) -> bool:
+        """Take the transaction-level archive lock, False if another worker has it."""
+        if not is_postgres(session):
+            return True
+        result = await session.exec(
+            select(func.pg_try_advisory_xact_lock(ARCHIVE_LOCK_NAMESPACE, 0))
+        )
+        return result.one()
+
+    async def _create_partition(self, month: date, session: AsyncSession):
+        await session.exec(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+                f"PARTITION OF {HISTORY_TABLE} "
+                f"FOR VALUES FROM ('{month}') TO ('{shift_months(month, 1)}')"
+            )
+        )
+
+
+class ReservationArchiver:
+    """Background task keeping past reservations out of the live table.
+
+    Every ARCHIVE_INTERVAL seconds it moves reservations that started more
+    than ARCHIVE_AFTER_DAYS days ago to reservations_history, one batch per
+    transaction, then detaches the history partitions older than
+    HISTORY_RETENTION_MONTHS. Every worker runs one, on PostgreSQL they take
+    turns through an advisory lock.
+    """
+
+    def __init__(
+        self,
+        service: ArchiveService | None = None,
+        sessions=get_session,
+        interval: float | None = None,
+        after_days: int | None = None,
+        retention_months: int | None = None,
+    ):
+        self.service = service or ArchiveService()
+        self.sessions = sessions
+        self.interval = interval or Config.ARCHIVE_INTERVAL
+        self.after_days = (
+            Config.ARCHIVE_AFTER_DAYS if after_days is None else after_days
+        )
+        self.retention_months = (
+            Config.HISTORY_RETENTION_MONTHS
+            if retention_months is None
+            else retention_months
+        )
+        self._task: asyncio.Task | None = None
+        self._working = asyncio.Lock()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            async with self._working:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        while True:
+            await self.archive()
+            await asyncio.sleep(self.interval)
+
+    async def archive(self) -> int:
+        """Run one archival pass, returns the number of reservations moved."""
+        cutoff = datetime.now() - timedelta(days=self.after_days)
+        moved = 0
+        while True:
+            batch = await self._in_session(
+                lambda session: self.service.archive_batch(cutoff, session)
+            )
+            moved += batch or 0
+            if batch != self.service.batch_size:
+                break
+
+        if self.retention_months:
+            before = shift_months(date.today(), -self.retention_months)
+            await self._in_session(
+                lambda session: self.service.detach_partitions(before, session)
+            )
+        return moved
+
+    async def _in_session(self, work):
+        """Run work in a session of its own, committed unless it fails.
+
+        Returns the result of work, None if it failed.
+        """
+        result = None
+        try:
+            async with self._working, aclosing(self.sessions()) as sessions:
+                async for session in sessions:
+                    result = await work(session)
+        except (DatabaseOperationException, SQLAlchemyError) as e:
+            logger.error(f"Reservation archiver failed: {str(e)}")
+            return None
+        return result
+
+
+reservation_archiver = ReservationArchiver()
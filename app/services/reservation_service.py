@@ -1,20 +1,76 @@
-from datetime import timedelta
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timedelta
+from uuid import uuid4
 
+from sqlalchemy import insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlmodel import select
 
+from app.core.database import is_postgres, run_after_commit, run_after_rollback
+from app.core.events import ChangeFeed, change_feed
 from app.core.exceptions import (
     DatabaseOperationException,
     ReservationNotFoundException,
     TableDoesntExistException,
 )
-from app.core.logger import logger
-from app.models.models import Reservation
-from app.schemas.reservation import ReservationCreate
+from app.core.interval_index import TableIntervals
+from app.core.locks import TableLocks, table_locks
+from app.core.occupancy import OccupancyStore, occupancy_store
+from app.core.queries import row_dicts, select_columns
+from app.core.recurrence import find_conflict, occurrences
+from app.core.response_cache import (
+    RESERVATIONS_TAG,
+    ResponseCache,
+    response_cache,
+    table_tag,
+)
+from app.models.models import Reservation, Table, reservation_overlaps
+from app.schemas.reservation import (
+    RESERVATION_COLUMNS,
+    ReservationBulkResult,
+    ReservationCreate,
+    ReservationRead,
+    ReservationRow,
+    ReservationSeriesCreate,
+    ReservationSeriesRead,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the server-side cursor and encoded per exported chunk
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = (
+    "id",
+    "customer_name",
+    "table_id",
+    "reservation_time",
+    "duration_minutes",
+)
+
+# Columns of interval index entries, in ReservationIntervalIndex.load order
+INDEX_COLUMNS = ("id", "table_id", "reservation_time", "end_time")
+
+# SQLSTATE raised by the reservations_no_overlap exclusion constraint
+EXCLUSION_VIOLATION = "23P01"
 
 
 class ReservationService:
+    def __init__(
+        self,
+        occupancy: OccupancyStore | None = None,
+        locks: TableLocks | None = None,
+        feed: ChangeFeed | None = None,
+        responses: ResponseCache | None = None,
+    ):
+        self.occupancy = occupancy or occupancy_store
+        # Both are falsy while empty
+        self.locks = table_locks if locks is None else locks
+        self.feed = change_feed if feed is None else feed
+        self.responses = response_cache if responses is None else responses
 
     async def get_reservation(self, id: int, session: AsyncSession):
         """Get a single reservation by ID."""
@@ -37,9 +93,30 @@ class ReservationService:
                 f"Database error retrieving reservation {id}"
             )
 
-    async def get_all_reservations(self, session: AsyncSession):
-        """Get all reservations ordered by ID."""
-        statement = select(Reservation).order_by(Reservation.id)
+    async def get_all_reservations(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int | None = None,
+        table_id: int | None = None,
+        starts_from: datetime | None = None,
+        starts_before: datetime | None = None,
+        customer_name: str | None = None,
+    ):
+        """Get reservations ordered by ID, one keyset page at a time.
+
+        customer_name matches as a prefix, the time range bounds
+        reservation_time as [starts_from, starts_before).
+        """
+        statement = self._filter_reservations(
+            select(Reservation),
+            after_id,
+            limit,
+            table_id,
+            starts_from,
+            starts_before,
+            customer_name,
+        )
         try:
             result = await session.exec(statement)
         except SQLAlchemyError as e:
@@ -50,9 +127,147 @@ class ReservationService:
 
         return result.all()
 
+    async def get_reservation_rows(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int | None = None,
+        table_id: int | None = None,
+        starts_from: datetime | None = None,
+        starts_before: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> list[ReservationRow]:
+        """Get a page like get_all_reservations as plain dicts.
+
+        Only the ReservationRead columns are selected and no ORM objects are
+        built, the list endpoint encodes these rows straight to JSON.
+        """
+        statement = self._filter_reservations(
+            select_columns(Reservation, RESERVATION_COLUMNS),
+            after_id,
+            limit,
+            table_id,
+            starts_from,
+            starts_before,
+            customer_name,
+        )
+        try:
+            result = await session.exec(statement)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving all reservations: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error retrieving all reservations: {str(e)}"
+            )
+
+        return row_dicts(result.all())
+
+    @staticmethod
+    def _filter_reservations(
+        statement,
+        after_id: int | None,
+        limit: int | None,
+        table_id: int | None,
+        starts_from: datetime | None,
+        starts_before: datetime | None,
+        customer_name: str | None,
+        model=Reservation,
+    ):
+        """Apply the list filters to a statement over model.
+
+        model is Reservation or ReservationHistory, which share the columns.
+        """
+        statement = statement.order_by(model.id)
+        if after_id is not None:
+            statement = statement.where(model.id > after_id)
+        if table_id is not None:
+            statement = statement.where(model.table_id == table_id)
+        if starts_from is not None:
+            statement = statement.where(
+                model.reservation_time >= starts_from.replace(tzinfo=None)
+            )
+        if starts_before is not None:
+            statement = statement.where(
+                model.reservation_time < starts_before.replace(tzinfo=None)
+            )
+        if customer_name is not None:
+            statement = statement.where(
+                model.customer_name.startswith(customer_name, autoescape=True)
+            )
+        if limit is not None:
+            statement = statement.limit(limit)
+        return statement
+
+    async def export_reservations(
+        self,
+        engine: AsyncEngine,
+        format: str = "ndjson",
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ):
+        """Yield every reservation encoded as NDJSON or CSV.
+
+        Rows are read through a streaming cursor on a dedicated connection and
+        encoded one batch at a time, so memory use does not grow with the table.
+        """
+        statement = select_columns(Reservation, EXPORT_COLUMNS).order_by(Reservation.id)
+        encode = self._encode_csv if format == "csv" else self._encode_ndjson
+
+        if format == "csv":
+            yield ",".join(EXPORT_COLUMNS).encode() + b"\r\n"
+        exported = 0
+        try:
+            async with engine.connect() as conn:
+                result = await conn.stream(statement)
+                async for rows in result.partitions(batch_size):
+                    exported += len(rows)
+                    yield encode(rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error exporting reservations: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error exporting reservations: {str(e)}"
+            )
+        logger.info(f"Exported {exported} reservations as {format}")
+
+    @staticmethod
+    def _encode_ndjson(rows) -> bytes:
+        lines = []
+        for id, customer_name, table_id, reservation_time, duration_minutes in rows:
+            lines.append(
+                json.dumps(
+                    {
+                        "id": id,
+                        "customer_name": customer_name,
+                        "table_id": table_id,
+                        "reservation_time": reservation_time.isoformat(),
+                        "duration_minutes": duration_minutes,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+        lines.append("")
+        return "\n".join(lines).encode()
+
+    @staticmethod
+    def _encode_csv(rows) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for id, customer_name, table_id, reservation_time, duration_minutes in rows:
+            writer.writerow(
+                (
+                    id,
+                    customer_name,
+                    table_id,
+                    reservation_time.isoformat(),
+                    duration_minutes,
+                )
+            )
+        return buffer.getvalue().encode()
+
     async def delete_reservation(self, id: int, session: AsyncSession):
         """Delete a reservation by ID."""
         reservation_to_delete = await self.get_reservation(id, session)
+        table_id = reservation_to_delete.table_id
+        start = reservation_to_delete.reservation_time
+        end = start + timedelta(minutes=reservation_to_delete.duration_minutes)
 
         try:
             await session.delete(reservation_to_delete)
@@ -63,6 +278,13 @@ class ReservationService:
                 f"Database error deleting reservation {id}: {str(e)}"
             )
 
+        self._publish(session, "reservation.deleted", reservation_to_delete)
+        self._invalidate_responses(session, table_id)
+        self.occupancy.invalidate(table_id, start, end)
+        run_after_rollback(
+            session, lambda: self.occupancy.invalidate(table_id, start, end)
+        )
+
     async def create_reservation(
         self, reservation_data: ReservationCreate, session: AsyncSession
     ):
@@ -71,17 +293,28 @@ class ReservationService:
             # Prepare reservation data
             reservation_data_dict = self._prepare_reservation_data(reservation_data)
 
-            # Check for conflicts
-            await self._check_reservation_conflicts(reservation_data, session)
+            # Bookings of the same table queue here, so the conflict check
+            # and the insert cannot interleave with another booking
+            async with self.locks.hold(session, [reservation_data.table_id]):
+                # Check for conflicts
+                await self._check_reservation_conflicts(reservation_data, session)
 
-            # Create and save the reservation
-            new_reservation = await self._save_reservation(
-                reservation_data_dict, session
-            )
+                # Create and save the reservation
+                new_reservation = await self._save_reservation(
+                    reservation_data_dict, session
+                )
 
             logger.info(f"Created reservation for table {reservation_data.table_id}")
             return new_reservation
         except IntegrityError as e:
+            if getattr(e.orig, "pgcode", None) == EXCLUSION_VIOLATION:
+                logger.warning(
+                    f"Reservation conflict detected for table {reservation_data.table_id} "
+                    f"by the database: {str(e.orig)}"
+                )
+                raise ValueError(
+                    "This table is already reserved during the requested time."
+                )
             logger.error(
                 f"Integrity error creating reservation for table {reservation_data.table_id}: {str(e)}"
             )
@@ -92,6 +325,213 @@ class ReservationService:
             logger.error(f"Failed to create reservation: {str(e)}")
             raise
 
+    async def create_reservations(
+        self, reservations_data: list[ReservationCreate], session: AsyncSession
+    ) -> list[ReservationBulkResult]:
+        """Create a batch of reservations, reporting the outcome of each item.
+
+        Existing reservations of every table in the batch are fetched with a
+        single query, then items are checked in order against them and against
+        the items accepted before them. Accepted items are inserted together.
+        Every table in the batch stays locked from the check to the insert.
+        """
+        items = [self._prepare_reservation_data(data) for data in reservations_data]
+        table_ids = {item["table_id"] for item in items}
+        starts = [item["reservation_time"] for item in items]
+        ends = [
+            start + timedelta(minutes=item["duration_minutes"])
+            for start, item in zip(starts, items)
+        ]
+
+        async with self.locks.hold(session, table_ids):
+            try:
+                result = await session.exec(
+                    select(Table.id).where(Table.id.in_(table_ids))
+                )
+                existing_tables = set(result.all())
+                result = await session.exec(
+                    select(
+                        Reservation.id,
+                        Reservation.table_id,
+                        Reservation.reservation_time,
+                        Reservation.end_time,
+                    )
+                    .where(
+                        Reservation.table_id.in_(existing_tables),
+                        reservation_overlaps(
+                            min(starts), max(ends), is_postgres(session)
+                        ),
+                    )
+                    .order_by(Reservation.reservation_time)
+                )
+                existing_reservations = result.all()
+            except SQLAlchemyError as e:
+                logger.error(f"Database error checking reservation batch: {str(e)}")
+                raise DatabaseOperationException(
+                    f"Database error checking reservation batch: {str(e)}"
+                )
+
+            intervals = {table_id: TableIntervals() for table_id in existing_tables}
+            for id, table_id, reservation_time, end_time in existing_reservations:
+                intervals[table_id].add(id, reservation_time, end_time)
+
+            results = []
+            accepted = []
+            for index, (item, start, end) in enumerate(zip(items, starts, ends)):
+                table_intervals = intervals.get(item["table_id"])
+                if table_intervals is None:
+                    results.append(
+                        ReservationBulkResult(
+                            index=index,
+                            status="table_not_found",
+                            detail=f"Table with id {item['table_id']} not found",
+                        )
+                    )
+                    continue
+                conflict = table_intervals.find_overlap(start, end)
+                if conflict:
+                    results.append(
+                        ReservationBulkResult(
+                            index=index,
+                            status="conflict",
+                            detail=f"This table is already reserved from {conflict[0]} to {conflict[1]}.",
+                        )
+                    )
+                    continue
+                table_intervals.add(-index - 1, start, end)
+                accepted.append((index, item))
+                results.append(ReservationBulkResult(index=index, status="created"))
+
+            if accepted:
+                created = await self._insert_reservations(
+                    [item for _, item in accepted], session
+                )
+                for (index, _), reservation in zip(accepted, created):
+                    results[index].reservation = ReservationRead.model_validate(
+                        reservation
+                    )
+                    self._track_created(session, reservation)
+
+        logger.info(f"Created {len(accepted)} of {len(items)} reservations in a batch")
+        return results
+
+    async def create_series(
+        self, series: ReservationSeriesCreate, session: AsyncSession
+    ) -> ReservationSeriesRead:
+        """Book every occurrence of a series on every table of the block.
+
+        Existing reservations of the block between the first and the last
+        occurrence are fetched with one range query, then each table's
+        occurrences are expanded lazily and merge-swept against them. The
+        series is inserted only if nothing conflicts, all or nothing.
+        """
+        start = series.reservation_time.replace(tzinfo=None)
+        duration = timedelta(minutes=series.duration_minutes)
+        step = series.recurrence.step if series.recurrence else timedelta(0)
+        count = series.occurrence_count()
+        end = start + (count - 1) * step + duration
+        table_ids = sorted(series.table_ids)
+
+        async with self.locks.hold(session, table_ids):
+            try:
+                result = await session.exec(
+                    select(Table.id).where(Table.id.in_(table_ids))
+                )
+                missing = set(table_ids) - set(result.all())
+                result = await session.exec(
+                    select_columns(Reservation, INDEX_COLUMNS)
+                    .where(
+                        Reservation.table_id.in_(table_ids),
+                        reservation_overlaps(start, end, is_postgres(session)),
+                    )
+                    .order_by(Reservation.table_id, Reservation.reservation_time)
+                )
+                existing_reservations = result.all()
+            except SQLAlchemyError as e:
+                logger.error(f"Database error checking reservation series: {str(e)}")
+                raise DatabaseOperationException(
+                    f"Database error checking reservation series: {str(e)}"
+                )
+            if missing:
+                raise TableDoesntExistException(
+                    f"Tables {sorted(missing)} of the series do not exist"
+                )
+
+            existing = {table_id: [] for table_id in table_ids}
+            for _, table_id, reservation_time, end_time in existing_reservations:
+                existing[table_id].append((reservation_time, end_time))
+
+            for table_id in table_ids:
+                conflict = find_conflict(
+                    existing[table_id], occurrences(start, step, count), duration
+                )
+                if conflict:
+                    logger.warning(
+                        f"Reservation series conflict on table {table_id} "
+                        f"at {conflict[0]}"
+                    )
+                    raise ValueError(
+                        f"Table {table_id} is already reserved from {conflict[1]} "
+                        f"to {conflict[2]}, conflicting with the occurrence at "
+                        f"{conflict[0]}."
+                    )
+
+            series_id = uuid4()
+            created = await self._insert_reservations(
+                [
+                    {
+                        "customer_name": series.customer_name,
+                        "table_id": table_id,
+                        "reservation_time": occurrence,
+                        "duration_minutes": series.duration_minutes,
+                        "series_id": series_id,
+                    }
+                    for occurrence in occurrences(start, step, count)
+                    for table_id in table_ids
+                ],
+                session,
+            )
+            for reservation in created:
+                self._track_created(session, reservation)
+
+        logger.info(
+            f"Created series {series_id} of {count} occurrences "
+            f"on {len(table_ids)} tables"
+        )
+        return ReservationSeriesRead(
+            series_id=series_id,
+            reservations=[
+                ReservationRead.model_validate(reservation) for reservation in created
+            ],
+        )
+
+    async def _insert_reservations(self, rows: list[dict], session: AsyncSession):
+        """Insert rows with one multi-row INSERT ... RETURNING."""
+        statement = insert(Reservation).returning(
+            *(getattr(Reservation, column) for column in RESERVATION_COLUMNS),
+            sort_by_parameter_order=True,
+        )
+        try:
+            result = await session.exec(statement, params=rows)
+            return result.all()
+        except IntegrityError as e:
+            if getattr(e.orig, "pgcode", None) == EXCLUSION_VIOLATION:
+                logger.warning(
+                    f"Reservation batch conflicts with a concurrent booking: {str(e.orig)}"
+                )
+                raise ValueError(
+                    "A table in this batch was reserved concurrently, retry the batch."
+                )
+            logger.error(f"Integrity error creating reservation batch: {str(e)}")
+            raise DatabaseOperationException(
+                f"Integrity error creating reservation batch: {str(e)}"
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Database error creating reservation batch: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error creating reservation batch: {str(e)}"
+            )
+
     def _prepare_reservation_data(self, reservation_data: ReservationCreate) -> dict:
         """Prepare reservation data with timezone-naive datetime."""
         reservation_data_dict = reservation_data.model_dump()
@@ -104,7 +544,17 @@ class ReservationService:
     async def _check_reservation_conflicts(
         self, reservation_data: ReservationCreate, session: AsyncSession
     ):
-        """Check for conflicting reservations."""
+        """Check for conflicting reservations.
+
+        On PostgreSQL the reservations_no_overlap exclusion constraint is the
+        arbiter, a conflicting insert fails with EXCLUSION_VIOLATION and is
+        answered as a conflict, so nothing is checked up front. Other
+        backends have no constraint and query the database.
+        """
+        if is_postgres(session):
+            return
+
+        table_id = reservation_data.table_id
         new_start = reservation_data.reservation_time
         new_end = new_start + timedelta(minutes=reservation_data.duration_minutes)
 
@@ -113,29 +563,34 @@ class ReservationService:
             new_start = new_start.replace(tzinfo=None)
             new_end = new_end.replace(tzinfo=None)
 
-        # Query for overlapping reservations
-        statement = select(Reservation).where(
-            Reservation.table_id == reservation_data.table_id,
-            Reservation.reservation_time < new_end,
-        )
-        result = await session.exec(statement)
-        existing_reservations = result.all()
-
-        # Extract raw values for conflict checking
-        for reservation in existing_reservations:
-            existing_start = reservation.reservation_time
-            existing_end = existing_start + timedelta(
-                minutes=reservation.duration_minutes
+        conflict = await self._find_conflict(table_id, new_start, new_end, session)
+        if conflict:
+            existing_start, existing_end = conflict
+            logger.warning(
+                f"Reservation conflict detected for table {table_id} "
+                f"from {existing_start} to {existing_end}"
+            )
+            raise ValueError(
+                f"This table is already reserved from {existing_start} to {existing_end}."
             )
 
-            if new_start < existing_end and new_end > existing_start:
-                logger.warning(
-                    f"Reservation conflict detected for table {reservation_data.table_id} "
-                    f"from {existing_start} to {existing_end}"
-                )
-                raise ValueError(
-                    f"This table is already reserved from {existing_start} to {existing_end}."
-                )
+    async def _find_conflict(
+        self, table_id: int, start: datetime, end: datetime, session: AsyncSession
+    ) -> tuple[datetime, datetime] | None:
+        """First reservation of the table overlapping [start, end) in the database."""
+        result = await session.exec(
+            select(Reservation.reservation_time, Reservation.end_time)
+            .where(
+                Reservation.table_id == table_id,
+                reservation_overlaps(start, end, is_postgres(session)),
+            )
+            .order_by(Reservation.reservation_time)
+            .limit(1)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        return rows[0].reservation_time, rows[0].end_time
 
     async def _save_reservation(
         self, reservation_data_dict: dict, session: AsyncSession
@@ -145,4 +600,52 @@ class ReservationService:
         session.add(new_reservation)
         await session.flush()
         await session.refresh(new_reservation)
+        self._track_created(session, new_reservation)
         return new_reservation
+
+    def _track_created(self, session: AsyncSession, reservation):
+        """Mark a new reservation in the occupancy bitsets until rollback.
+
+        Subscribers of the change feed hear of it once the transaction commits.
+        """
+        table_id = reservation.table_id
+        start = reservation.reservation_time
+        end = start + timedelta(minutes=reservation.duration_minutes)
+        self._publish(session, "reservation.created", reservation)
+        self._invalidate_responses(session, table_id)
+        self.occupancy.mark(table_id, start, end)
+        run_after_rollback(
+            session, lambda: self.occupancy.invalidate(table_id, start, end)
+        )
+
+    def _invalidate_responses(self, session: AsyncSession, table_id: int):
+        """Drop cached responses now and again once the transaction commits.
+
+        Like TableService._invalidate, the second drop removes responses of
+        reads that raced the commit.
+        """
+        tags = (RESERVATIONS_TAG, table_tag(table_id))
+        self.responses.invalidate(*tags)
+        run_after_commit(session, lambda: self.responses.invalidate(*tags))
+
+    def _publish(self, session: AsyncSession, type: str, reservation):
+        """Publish a reservation change to the feed after commit.
+
+        The event carries the reservation and the availability delta of its
+        table: the [start, end) window became busy or free.
+        """
+        if not self.feed.active:
+            return
+        read = ReservationRead.model_validate(reservation).model_dump(mode="json")
+        payload = {
+            "type": type,
+            "table_id": read["table_id"],
+            "start": read["reservation_time"],
+            "end": read["end_time"],
+            "available": type == "reservation.deleted",
+            "reservation": read,
+        }
+        run_after_commit(
+            session,
+            lambda: self.feed.publish(type, read["table_id"], payload),
+        )
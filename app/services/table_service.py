@@ -1,16 +1,66 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.cache import (
+    CacheBackend,
+    cache_metrics,
+    make_etag,
+    run_in_background,
+    table_cache,
+)
+from app.core.config import Config
+from app.core.database import is_postgres, run_after_commit
 from app.core.exceptions import DatabaseOperationException, TableNotFoundException
-from app.core.logger import logger
-from app.models.models import Table
-from app.schemas.table import TableCreate
+from app.core.occupancy import DAY, OccupancyStore, occupancy_store, slot_masks
+from app.core.queries import row_dicts, select_columns
+from app.core.response_cache import (
+    TABLES_TAG,
+    ResponseCache,
+    response_cache,
+    table_tag,
+)
+from app.core.seat_index import SeatIndex, seat_index
+from app.models.models import Reservation, Table, reservation_overlaps
+from app.schemas.table import TABLE_COLUMNS, TableCreate, TableRow
+
+logger = logging.getLogger(__name__)
+
+# Bumped on every write, cached list pages are keyed by the current value
+TABLES_VERSION_KEY = "tables:version"
 
 
 class TableService:
+    def __init__(
+        self,
+        occupancy: OccupancyStore | None = None,
+        cache: CacheBackend | None = None,
+        seats: SeatIndex | None = None,
+        responses: ResponseCache | None = None,
+    ):
+        self.occupancy = occupancy or occupancy_store
+        self.cache = cache or table_cache
+        self.seats = seat_index if seats is None else seats
+        self.responses = response_cache if responses is None else responses
+
     async def get_table(self, id: int, session: AsyncSession):
-        """Get a single table by ID."""
+        """Get a single table by ID, served from the cache when possible."""
+        data = await self._cached(
+            "table", f"table:{id}", lambda: self._load_table(id, session)
+        )
+        return Table(**data)
+
+    async def _load_table(self, id: int, session: AsyncSession) -> dict:
+        table = await self._fetch_table(id, session)
+        return table.model_dump()
+
+    async def _fetch_table(self, id: int, session: AsyncSession):
+        """Get a single table by ID from the database."""
         try:
             statement = select(Table).where(Table.id == id)
             result = await session.exec(statement)
@@ -38,16 +88,89 @@ class TableService:
             session.add(new_table)
             await session.flush()
             await session.refresh(new_table)
+            await self._invalidate(session)
             logger.info(f"Table with id {new_table.id} successfully created.")
             return new_table
         except SQLAlchemyError as e:
             logger.error(f"Database error creating table: {str(e)}")
             raise DatabaseOperationException(f"Database error creating table: {str(e)}")
 
-    async def get_all_tables(self, session: AsyncSession):
-        """Get all tables ordered by ID."""
+    async def create_tables(
+        self, tables_data: list[TableCreate], session: AsyncSession
+    ):
+        """Create a batch of tables with one multi-row INSERT ... RETURNING."""
+        statement = insert(Table).returning(
+            Table.id,
+            Table.name,
+            Table.seats,
+            Table.location,
+            sort_by_parameter_order=True,
+        )
         try:
-            statement = select(Table).order_by(Table.id)
+            result = await session.exec(
+                statement,
+                params=[table_data.model_dump() for table_data in tables_data],
+            )
+            new_tables = result.all()
+            await self._invalidate(session)
+            logger.info(f"{len(new_tables)} tables successfully created.")
+            return new_tables
+        except SQLAlchemyError as e:
+            logger.error(f"Database error creating tables: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error creating tables: {str(e)}"
+            )
+
+    async def get_all_tables(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int | None = None,
+    ):
+        """Get tables ordered by ID, one keyset page at a time."""
+        tables, _ = await self.get_tables_page(session, after_id, limit)
+        return tables
+
+    async def get_tables_page(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[Table], str]:
+        """Get a page of tables and its ETag, served from the cache when possible."""
+        rows, etag = await self.get_table_rows_page(session, after_id, limit)
+        return [Table(**row) for row in rows], etag
+
+    async def get_table_rows_page(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[TableRow], str]:
+        """Like get_tables_page, but returns the cached rows as plain dicts."""
+        version = await self.cache.get(TABLES_VERSION_KEY) or 0
+        page = await self._cached(
+            "tables",
+            f"tables:{version}:{after_id}:{limit}",
+            lambda: self._load_tables_page(session, after_id, limit),
+        )
+        return page["tables"], page["etag"]
+
+    async def _load_tables_page(
+        self, session: AsyncSession, after_id: int | None, limit: int | None
+    ) -> dict:
+        rows = row_dicts(await self._fetch_tables(session, after_id, limit))
+        return {"tables": rows, "etag": make_etag([rows, limit])}
+
+    async def _fetch_tables(
+        self, session: AsyncSession, after_id: int | None, limit: int | None
+    ):
+        try:
+            statement = select_columns(Table, TABLE_COLUMNS).order_by(Table.id)
+            if after_id is not None:
+                statement = statement.where(Table.id > after_id)
+            if limit is not None:
+                statement = statement.limit(limit)
             result = await session.exec(statement)
             return result.all()
         except SQLAlchemyError as e:
@@ -56,15 +179,137 @@ class TableService:
                 f"Database error retrieving all tables: {str(e)}"
             )
 
+    async def get_available_tables(
+        self,
+        session: AsyncSession,
+        start: datetime,
+        duration_minutes: int,
+        min_seats: int = 1,
+        location: str | None = None,
+    ):
+        """Get tables with enough seats that are free for the whole window.
+
+        Returns read-only rows with the TableRead columns, not entities.
+        """
+        if start.tzinfo is not None:
+            start = start.replace(tzinfo=None)
+        end = start + timedelta(minutes=duration_minutes)
+
+        occupied = select(Reservation.id).where(
+            Reservation.table_id == Table.id,
+            reservation_overlaps(start, end, is_postgres(session)),
+        )
+        statement = (
+            select_columns(Table, TABLE_COLUMNS)
+            .where(Table.seats >= min_seats, ~occupied.exists())
+            .order_by(Table.seats, Table.id)
+        )
+        if location is not None:
+            statement = statement.where(Table.location == location)
+
+        try:
+            result = await session.exec(statement)
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving available tables: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error retrieving available tables: {str(e)}"
+            )
+
+    async def get_table_occupancy(
+        self, id: int, first_day: date, last_day: date, session: AsyncSession
+    ) -> list[tuple[date, int]]:
+        """Get the occupied-slot bitset of a table for each day in the range."""
+        await self.get_table(id, session)
+
+        days = [
+            first_day + timedelta(days=offset)
+            for offset in range((last_day - first_day).days + 1)
+        ]
+        occupied = {day: self.occupancy.get(id, day) for day in days}
+        missing = [day for day, bits in occupied.items() if bits is None]
+        if missing:
+            loaded = await self._load_occupancy(id, missing[0], missing[-1], session)
+            for day in missing:
+                occupied[day] = loaded[day]
+
+        return list(occupied.items())
+
+    async def _load_occupancy(
+        self, id: int, first_day: date, last_day: date, session: AsyncSession
+    ) -> dict[date, int]:
+        """Build the bitsets of a range of days from the table's reservations.
+
+        Days changed by a reservation while the query runs are returned but
+        not stored, the bitset read may predate that reservation.
+        """
+        days = [
+            first_day + timedelta(days=offset)
+            for offset in range((last_day - first_day).days + 1)
+        ]
+        generations = {day: self.occupancy.generation(id, day) for day in days}
+        start = datetime.combine(first_day, time())
+        end = datetime.combine(last_day, time()) + DAY
+        statement = select(Reservation.reservation_time, Reservation.end_time).where(
+            Reservation.table_id == id,
+            reservation_overlaps(start, end, is_postgres(session)),
+        )
+        try:
+            result = await session.exec(statement)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving occupancy of table {id}: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error retrieving occupancy of table {id}: {str(e)}"
+            )
+
+        bits = dict.fromkeys(days, 0)
+        for reservation_time, end_time in result.all():
+            for day, mask in slot_masks(reservation_time, end_time).items():
+                if day in bits:
+                    bits[day] |= mask
+        for day, day_bits in bits.items():
+            if self.occupancy.get(id, day) is None:
+                self.occupancy.set(id, day, day_bits, generations[day])
+        return bits
+
     async def delete_table(self, id: int, session: AsyncSession):
         """Delete a table by ID."""
-        table_to_delete = await self.get_table(id, session)
+        table_to_delete = await self._fetch_table(id, session)
 
         try:
             await session.delete(table_to_delete)
             await session.flush()
+            await self._invalidate(session, id)
         except SQLAlchemyError as e:
             logger.error(f"Database error deleting table {id}: {str(e)}")
             raise DatabaseOperationException(
                 f"Database error deleting table {id}: {str(e)}"
             )
+
+    async def _cached(self, name: str, key: str, load):
+        """Return the cached value of key, calling load() to fill it on a miss."""
+        started = perf_counter()
+        value = await self.cache.get(key)
+        hit = value is not None
+        if not hit:
+            value = await load()
+            await self.cache.set(key, value, Config.TABLE_CACHE_TTL)
+        cache_metrics.observe(name, hit, perf_counter() - started)
+        return value
+
+    async def _invalidate(self, session: AsyncSession, id: int | None = None):
+        """Drop cached rows now and again once the transaction commits.
+
+        A read racing the commit can still load the old rows after the first
+        drop, the second one removes them.
+        """
+        await self._drop_cached(id)
+        run_after_commit(session, lambda: run_in_background(self._drop_cached(id)))
+
+    async def _drop_cached(self, id: int | None):
+        self.seats.clear()
+        self.responses.invalidate(TABLES_TAG)
+        if id is not None:
+            self.responses.invalidate(table_tag(id))
+            await self.cache.delete(f"table:{id}")
+        await self.cache.incr(TABLES_VERSION_KEY)
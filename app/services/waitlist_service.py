@@ -0,0 +1,404 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import aclosing, nullcontext
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import Config
+from app.core.database import get_session, is_postgres
+from app.core.events import ChangeFeed, change_feed
+from app.core.exceptions import (
+    DatabaseOperationException,
+    TableDoesntExistException,
+    WaitlistEntryNotFoundException,
+)
+from app.models.models import Reservation, Table, WaitlistEntry, reservation_overlaps
+from app.schemas.reservation import ReservationCreate
+from app.schemas.waitlist import WaitlistCreate
+from app.services.reservation_service import ReservationService
+
+logger = logging.getLogger(__name__)
+
+# Waiting entries tried per freed slot or matching pass, in priority order,
+# and tables tried per entry that accepts any table with enough seats
+MATCH_BATCH_SIZE = 50
+
+
+def earliest_free_start(busy, start: datetime, duration: timedelta) -> datetime:
+    """Earliest start from start on whose duration misses every busy interval.
+
+    busy holds the (start, end) intervals of a table ordered by start.
+    """
+    for busy_start, busy_end in busy:
+        if busy_start >= start + duration:
+            break
+        start = max(start, busy_end)
+    return start
+
+
+class WaitlistService:
+    def __init__(self, reservations: ReservationService | None = None):
+        self.reservations = reservations or ReservationService()
+
+    async def add_entry(
+        self, entry_data: WaitlistCreate, session: AsyncSession
+    ) -> WaitlistEntry:
+        """Put a booking request on the waitlist.
+
+        The entry is booked right away when its window has a free slot, it
+        only waits otherwise.
+        """
+        entry_data_dict = entry_data.model_dump()
+        for field in ("earliest", "latest"):
+            entry_data_dict[field] = entry_data_dict[field].replace(tzinfo=None)
+        entry = WaitlistEntry(**entry_data_dict)
+
+        try:
+            session.add(entry)
+            await session.flush()
+            await session.refresh(entry)
+        except IntegrityError as e:
+            logger.error(
+                f"Integrity error adding waitlist entry for table {entry_data.table_id}: {str(e)}"
+            )
+            raise TableDoesntExistException(
+                f"Integrity error adding waitlist entry for table {entry_data.table_id}"
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Database error adding waitlist entry: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error adding waitlist entry: {str(e)}"
+            )
+
+        logger.info(f"Added waitlist entry {entry.id}")
+        if await self._assign(entry, session):
+            await self._flush_assignments(session)
+        return entry
+
+    async def get_entry(self, id: int, session: AsyncSession) -> WaitlistEntry:
+        """Get a waitlist entry by ID."""
+        try:
+            result = await session.exec(
+                select(WaitlistEntry).where(WaitlistEntry.id == id)
+            )
+            entry = result.first()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving waitlist entry {id}: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error retrieving waitlist entry {id}: {str(e)}"
+            )
+
+        if not entry:
+            logger.warning(f"Waitlist entry with id {id} not found")
+            raise WaitlistEntryNotFoundException(
+                f"Waitlist entry with id {id} not found"
+            )
+        return entry
+
+    async def cancel_entry(self, id: int, session: AsyncSession) -> WaitlistEntry:
+        """Take a waiting entry off the waitlist."""
+        entry = await self.get_entry(id, session)
+        if entry.status != "waiting":
+            raise ValueError(f"Waitlist entry {id} is already {entry.status}")
+
+        entry.status = "cancelled"
+        try:
+            await session.flush()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error cancelling waitlist entry {id}: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error cancelling waitlist entry {id}: {str(e)}"
+            )
+        return entry
+
+    async def fill_slot(
+        self, table_id: int, start: datetime, end: datetime, session: AsyncSession
+    ) -> list[WaitlistEntry]:
+        """Book waiting entries into the freed window [start, end) of a table.
+
+        Candidates are the waiting entries whose window of starts meets the
+        freed one and that accept the table, taken by priority then age. Each
+        is booked at its earliest start inside the freed window. An entry that
+        still conflicts stays waiting.
+        """
+        start = max(start, datetime.now())
+        if start >= end:
+            return []
+
+        try:
+            result = await session.exec(select(Table.seats).where(Table.id == table_id))
+            seats = result.first()
+            if seats is None:
+                return []
+            result = await session.exec(
+                select(WaitlistEntry)
+                .where(
+                    WaitlistEntry.status == "waiting",
+                    WaitlistEntry.earliest < end,
+                    WaitlistEntry.latest >= start,
+                    or_(
+                        WaitlistEntry.table_id == table_id,
+                        and_(
+                            WaitlistEntry.table_id.is_(None),
+                            WaitlistEntry.min_seats <= seats,
+                        ),
+                    ),
+                )
+                .order_by(WaitlistEntry.priority.desc(), WaitlistEntry.id)
+                .limit(MATCH_BATCH_SIZE)
+                # Another worker's matcher moves on to other entries
+                .with_for_update(skip_locked=True)
+            )
+            candidates = result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error matching the waitlist: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error matching the waitlist: {str(e)}"
+            )
+
+        assigned = [
+            entry
+            for entry in candidates
+            if await self._book(entry, table_id, max(entry.earliest, start), session)
+        ]
+        await self._flush_assignments(session)
+        if assigned:
+            logger.info(
+                f"Assigned {len(assigned)} waitlist entries to table {table_id}"
+            )
+        return assigned
+
+    async def match_entries(self, session: AsyncSession) -> list[WaitlistEntry]:
+        """Book waiting entries into any free slot of their window.
+
+        Catches the slots fill_slot never hears of: freed in other workers,
+        freed while the matcher fell behind, or lost by add_entry to a
+        concurrent booking. Entries are taken by priority then age,
+        MATCH_BATCH_SIZE per pass.
+        """
+        try:
+            result = await session.exec(
+                select(WaitlistEntry)
+                .where(
+                    WaitlistEntry.status == "waiting",
+                    WaitlistEntry.latest >= datetime.now(),
+                )
+                .order_by(WaitlistEntry.priority.desc(), WaitlistEntry.id)
+                .limit(MATCH_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            candidates = result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error matching the waitlist: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error matching the waitlist: {str(e)}"
+            )
+
+        assigned = [entry for entry in candidates if await self._assign(entry, session)]
+        await self._flush_assignments(session)
+        if assigned:
+            logger.info(f"Assigned {len(assigned)} waitlist entries to free slots")
+        return assigned
+
+    async def expire_entries(self, session: AsyncSession) -> int:
+        """Mark waiting entries whose last accepted start has passed as expired."""
+        try:
+            result = await session.exec(
+                update(WaitlistEntry)
+                .where(
+                    WaitlistEntry.status == "waiting",
+                    WaitlistEntry.latest < datetime.now(),
+                )
+                .values(status="expired")
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Database error expiring waitlist entries: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error expiring waitlist entries: {str(e)}"
+            )
+        return result.rowcount
+
+    async def _assign(self, entry: WaitlistEntry, session: AsyncSession) -> bool:
+        """Book entry at the earliest free start of its window, on any table.
+
+        Tables are the entry's own, or the ones with enough seats smallest
+        first. Returns whether the entry was booked.
+        """
+        start = max(entry.earliest, datetime.now())
+        if start > entry.latest:
+            return False
+        duration = timedelta(minutes=entry.duration_minutes)
+
+        try:
+            if entry.table_id is not None:
+                table_ids = [entry.table_id]
+            else:
+                result = await session.exec(
+                    select(Table.id)
+                    .where(Table.seats >= entry.min_seats)
+                    .order_by(Table.seats, Table.id)
+                    .limit(MATCH_BATCH_SIZE)
+                )
+                table_ids = result.all()
+            if not table_ids:
+                return False
+            result = await session.exec(
+                select(
+                    Reservation.table_id,
+                    Reservation.reservation_time,
+                    Reservation.end_time,
+                )
+                .where(
+                    Reservation.table_id.in_(table_ids),
+                    reservation_overlaps(
+                        start, entry.latest + duration, is_postgres(session)
+                    ),
+                )
+                .order_by(Reservation.reservation_time)
+            )
+            rows = result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error matching waitlist entry {entry.id}: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error matching waitlist entry {entry.id}: {str(e)}"
+            )
+
+        busy = {table_id: [] for table_id in table_ids}
+        for table_id, reservation_time, end_time in rows:
+            busy[table_id].append((reservation_time, end_time))
+        for table_id in table_ids:
+            reservation_time = earliest_free_start(busy[table_id], start, duration)
+            if reservation_time <= entry.latest and await self._book(
+                entry, table_id, reservation_time, session
+            ):
+                return True
+        return False
+
+    async def _book(
+        self,
+        entry: WaitlistEntry,
+        table_id: int,
+        reservation_time: datetime,
+        session: AsyncSession,
+    ) -> bool:
+        """Book entry on a table, returns False if the slot is taken meanwhile."""
+        # Built without validation, the entry was validated when added and
+        # the booking window of ReservationCreate only bounds new requests
+        reservation_data = ReservationCreate.model_construct(
+            customer_name=entry.customer_name,
+            table_id=table_id,
+            reservation_time=reservation_time,
+            duration_minutes=entry.duration_minutes,
+        )
+        try:
+            # PostgreSQL reports conflicts from the exclusion constraint,
+            # which aborts the transaction unless the attempt has a
+            # savepoint. Elsewhere they are found before anything is written.
+            attempt = session.begin_nested() if is_postgres(session) else nullcontext()
+            async with attempt:
+                reservation = await self.reservations.create_reservation(
+                    reservation_data, session
+                )
+        except (ValueError, TableDoesntExistException) as e:
+            logger.info(f"Waitlist entry {entry.id} stays waiting: {str(e)}")
+            return False
+        entry.status = "assigned"
+        entry.reservation_id = reservation.id
+        return True
+
+    async def _flush_assignments(self, session: AsyncSession):
+        try:
+            await session.flush()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error assigning waitlist entries: {str(e)}")
+            raise DatabaseOperationException(
+                f"Database error assigning waitlist entries: {str(e)}"
+            )
+
+
+class WaitlistMatcher:
+    """Background task filling slots freed by deleted reservations.
+
+    Follows the change feed and handles the deletions made in this worker,
+    every worker runs its own matcher. Whatever the traffic, it expires
+    entries every WAITLIST_EXPIRE_INTERVAL seconds and then matches the
+    waiting ones against every free slot, which covers deletions in other
+    workers and events missed. Stopping waits for the work in progress, so
+    a session is never cancelled halfway through.
+    """
+
+    def __init__(
+        self,
+        service: WaitlistService | None = None,
+        feed: ChangeFeed | None = None,
+        sessions=get_session,
+        expire_interval: float | None = None,
+    ):
+        self.service = service or WaitlistService()
+        self.feed = change_feed if feed is None else feed
+        self.sessions = sessions
+        self.expire_interval = expire_interval or Config.WAITLIST_EXPIRE_INTERVAL
+        self._task: asyncio.Task | None = None
+        self._working = asyncio.Lock()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            async with self._working:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        subscription = self.feed.subscribe()
+        # Kept apart from the events, a steady stream of them must not
+        # postpone the expiry
+        expire_at = time.monotonic() + self.expire_interval
+        try:
+            while True:
+                if time.monotonic() >= expire_at:
+                    await self._in_session(self.service.expire_entries)
+                    await self._in_session(self.service.match_entries)
+                    expire_at = time.monotonic() + self.expire_interval
+                try:
+                    event = await subscription.get(max(expire_at - time.monotonic(), 0))
+                except TimeoutError:
+                    continue
+                if event is None:
+                    logger.warning("Waitlist matcher fell behind, freed slots missed")
+                    subscription = self.feed.subscribe()
+                    continue
+                if event.type == "reservation.deleted" and event.local:
+                    payload = json.loads(event.data)
+                    start = datetime.fromisoformat(payload["start"])
+                    end = datetime.fromisoformat(payload["end"])
+                    await self._in_session(
+                        lambda session: self.service.fill_slot(
+                            event.table_id, start, end, session
+                        )
+                    )
+        finally:
+            self.feed.unsubscribe(subscription)
+
+    async def _in_session(self, work):
+        """Run work in a session of its own, committed unless it fails."""
+        try:
+            async with self._working, aclosing(self.sessions()) as sessions:
+                async for session in sessions:
+                    await work(session)
+        except (DatabaseOperationException, SQLAlchemyError) as e:
+            logger.error(f"Waitlist matcher failed: {str(e)}")
+
+
+waitlist_matcher = WaitlistMatcher()
@@ -1,4 +1,5 @@
 import os
+from collections import namedtuple
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, Mock
 
@@ -11,11 +12,13 @@ from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession  # Use this AsyncSession
 
+from app.core.cache import InMemoryCache
 from app.core.database import get_session  # Import the database dependency
+from app.core.instrumentation import request_metrics
 from app.main import app
 from app.models.models import Reservation, Table
 from app.schemas.reservation import ReservationCreate
-from app.schemas.table import TableCreate
+from app.schemas.table import TABLE_COLUMNS, TableCreate
 from app.services.reservation_service import ReservationService
 from app.services.table_service import TableService
 
@@ -29,6 +32,9 @@ os.environ["DATABASE_URL"] = TEST_DATABASE_URL
 @pytest.fixture
 def mock_session():
     session = AsyncMock()
+    session.sync_session = Mock(info={})
+    # No transaction events fire on the mock, table locks are released at once
+    session.in_transaction = Mock(return_value=False)
     mock_result = Mock()
     session.exec.return_value = mock_result
     return session, mock_result
@@ -36,7 +42,7 @@ def mock_session():
 
 @pytest.fixture
 def table_service():
-    return TableService()
+    return TableService(cache=InMemoryCache())
 
 
 @pytest.fixture
@@ -58,6 +64,16 @@ def mock_tables():
     ]
 
 
+@pytest.fixture
+def mock_table_rows(mock_tables):
+    """mock_tables as the rows a column-only select returns."""
+    TableRow = namedtuple("TableRow", TABLE_COLUMNS)
+    return [
+        TableRow(**table.model_dump(include=set(TABLE_COLUMNS)))
+        for table in mock_tables
+    ]
+
+
 @pytest.fixture
 def table_create_data():
     return TableCreate(name="New Table", seats=4, location="Main Hall")
@@ -65,12 +81,14 @@ def table_create_data():
 
 @pytest.fixture
 def mock_reservation():
+    reservation_time = datetime.now() + timedelta(days=1)
     return Reservation(
         id=1,
         table_id=1,
         customer_name="John Doe",
-        reservation_time=datetime.now() + timedelta(days=1),
+        reservation_time=reservation_time,
         duration_minutes=60,
+        end_time=reservation_time + timedelta(minutes=60),
     )
 
 
@@ -92,6 +110,7 @@ async def test_engine():
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    request_metrics.instrument(engine)
 
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.drop_all)
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config as AlembicConfig
+
+MIGRATIONS = Path(__file__).parents[3] / "migrations"
+
+
+@pytest.fixture(scope="session")
+def migrate():
+    """Upgrade the database at a URL to the latest Alembic migration."""
+
+    def upgrade(url: str):
+        config = AlembicConfig()
+        config.set_main_option("script_location", str(MIGRATIONS))
+        config.attributes["database_url"] = url
+        command.upgrade(config, "head")
+
+    return upgrade
@@ -0,0 +1,173 @@
+"""Book the same slots from hundreds of concurrent sessions.
+
+Every booking runs in its own session and transaction, like a request does.
+Each slot is requested several times at once, so exactly one booking per slot
+may succeed. Runs on a temporary SQLite file by default. Set
+STRESS_TEST_DATABASE_URL to an empty PostgreSQL database to run against the
+schema built by the Alembic migrations, where the advisory locks are used.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import and_, func, insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import aliased, sessionmaker
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.locks import TableLocks
+from app.core.occupancy import OccupancyStore
+from app.models.models import Reservation, Table
+from app.schemas.reservation import ReservationCreate
+from app.services.reservation_service import ReservationService
+
+STRESS_TEST_DATABASE_URL = os.environ.get("STRESS_TEST_DATABASE_URL")
+
+TABLES = 10
+SLOTS_PER_TABLE = 5
+ATTEMPTS_PER_SLOT = 6
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def stress_engine(tmp_path_factory, migrate):
+    if STRESS_TEST_DATABASE_URL:
+        await asyncio.to_thread(migrate, STRESS_TEST_DATABASE_URL)
+        engine = create_async_engine(
+            STRESS_TEST_DATABASE_URL, pool_size=20, max_overflow=0
+        )
+    else:
+        path = tmp_path_factory.mktemp("stress") / "stress.db"
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 30}
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(Table),
+            [
+                {"id": id, "name": f"S{id}", "seats": 4, "location": "Stress"}
+                for id in range(1, TABLES + 1)
+            ],
+        )
+
+    yield engine
+
+    if STRESS_TEST_DATABASE_URL:
+        async with engine.begin() as conn:
+            await conn.execute(text("TRUNCATE reservations, tables CASCADE"))
+    await engine.dispose()
+
+
+async def count_double_bookings(engine) -> int:
+    other = aliased(Reservation)
+    statement = (
+        select(func.count())
+        .select_from(Reservation)
+        .join(
+            other,
+            and_(
+                other.table_id == Reservation.table_id,
+                other.id > Reservation.id,
+                other.reservation_time < Reservation.end_time,
+                Reservation.reservation_time < other.end_time,
+            ),
+        )
+    )
+    async with engine.connect() as conn:
+        return (await conn.execute(statement)).scalar_one()
+
+
+async def test_concurrent_bookings_never_overlap(stress_engine):
+    service = ReservationService(
+        occupancy=OccupancyStore(),
+        locks=TableLocks(),
+    )
+    async_session = sessionmaker(
+        stress_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    first_slot = datetime.now().replace(
+        hour=12, minute=0, second=0, microsecond=0
+    ) + timedelta(days=3)
+
+    async def book(table_id: int, slot: int, attempt: int) -> bool:
+        reservation = ReservationCreate(
+            table_id=table_id,
+            customer_name=f"Guest {slot}-{attempt}",
+            # Attempts of a slot start at different minutes but all overlap
+            reservation_time=first_slot + timedelta(hours=2 * slot, minutes=attempt),
+            duration_minutes=90,
+        )
+        async with async_session() as session:
+            try:
+                await service.create_reservation(reservation, session)
+                await session.commit()
+                return True
+            except ValueError:
+                await session.rollback()
+                return False
+
+    bookings = [
+        book(table_id, slot, attempt)
+        for attempt in range(ATTEMPTS_PER_SLOT)
+        for slot in range(SLOTS_PER_TABLE)
+        for table_id in range(1, TABLES + 1)
+    ]
+    started = time.perf_counter()
+    results = await asyncio.gather(*bookings)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"\n{len(bookings)} concurrent bookings on {stress_engine.dialect.name} "
+        f"in {elapsed:.2f}s ({len(bookings) / elapsed:.0f} bookings/s)"
+    )
+    assert sum(results) == TABLES * SLOTS_PER_TABLE
+    assert await count_double_bookings(stress_engine) == 0
+
+
+async def test_booking_waits_for_the_overlapping_one_to_commit(stress_engine):
+    service = ReservationService(
+        occupancy=OccupancyStore(),
+        locks=TableLocks(),
+    )
+    async_session = sessionmaker(
+        stress_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    # A day the stress test leaves free
+    start = datetime.now().replace(
+        hour=12, minute=0, second=0, microsecond=0
+    ) + timedelta(days=10)
+    booked = asyncio.Event()
+
+    def reservation(customer_name: str, minutes: int) -> ReservationCreate:
+        return ReservationCreate(
+            table_id=1,
+            customer_name=customer_name,
+            reservation_time=start + timedelta(minutes=minutes),
+            duration_minutes=90,
+        )
+
+    async def first():
+        async with async_session() as session:
+            await service.create_reservation(reservation("First", 0), session)
+            booked.set()
+            # The booking is flushed but not committed yet
+            await asyncio.sleep(0.5)
+            await session.commit()
+
+    async def second():
+        await booked.wait()
+        async with async_session() as session:
+            with pytest.raises(ValueError):
+                await service.create_reservation(reservation("Second", 30), session)
+            await session.rollback()
+
+    await asyncio.gather(first(), second())
+    assert await count_double_bookings(stress_engine) == 0
@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.mark.asyncio
+class TestMetricsRouter:
+    async def test_get_db_metrics(self, async_client):
+        response = await async_client.get("/metrics/db")
+        assert response.status_code == 200
+        metrics = response.json()
+        for key in (
+            "checkedout",
+            "overflow",
+            "acquire_seconds_total",
+            "acquire_seconds_max",
+            "connections_opened_total",
+            "connections_closed_total",
+        ):
+            assert key in metrics
+
+    async def test_get_metrics(self, async_client):
+        response = await async_client.get("/tables/?limit=5")
+        assert response.status_code == 200
+        assert "db;dur=" in response.headers["server-timing"]
+
+        response = await async_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/tables/",'
+            'status="200"}' in response.text
+        )
+        assert (
+            'http_request_queries_bucket{method="GET",route="/tables/",le="0"} 0'
+            in (response.text)
+        )
+        assert "db_pool_checkouts_total" in response.text
+        assert 'app_startup_seconds{milestone="first_request"}' in response.text
@@ -0,0 +1,263 @@
+"""EXPLAIN the statements the hot service paths run and reject full scans.
+
+Seeds a realistic number of reservations, captures the SQL each service call
+emits and checks the plan of every SELECT that reads reservations. Runs on
+in-memory SQLite with the schema from the models by default. Set
+PLAN_TEST_DATABASE_URL to an empty PostgreSQL database to run against the
+schema built by the Alembic migrations instead.
+"""
+
+import asyncio
+import json
+import os
+import re
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import InMemoryCache
+from app.core.occupancy import OccupancyStore
+from app.models.models import Reservation, Table
+from app.schemas.reservation import ReservationCreate
+from app.services.reservation_service import ReservationService
+from app.services.table_service import TableService
+
+PLAN_TEST_DATABASE_URL = os.environ.get("PLAN_TEST_DATABASE_URL")
+
+TABLES = 200
+RESERVATIONS_PER_TABLE = 250
+TABLE_ID = 42
+
+# Range seek on a table's reservations, PostgreSQL may use the GiST index of
+# the reservations_no_overlap exclusion constraint instead
+TABLE_TIME_INDEXES = (
+    "ix_reservations_table_id_reservation_time_end_time",
+    "reservations_no_overlap",
+)
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+async def seed(engine):
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    first_day = now - timedelta(days=90)
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(Table),
+            [
+                {"id": id, "name": f"T{id}", "seats": 2 + id % 6, "location": "Hall"}
+                for id in range(1, TABLES + 1)
+            ],
+        )
+        # One reservation every ~12 hours per table, from 90 days ago onwards
+        await conn.execute(
+            insert(Reservation),
+            [
+                {
+                    "table_id": table_id,
+                    "customer_name": f"Guest {table_id}-{i}",
+                    "reservation_time": first_day
+                    + timedelta(hours=12 * i + table_id % 12),
+                    "duration_minutes": 90,
+                }
+                for table_id in range(1, TABLES + 1)
+                for i in range(RESERVATIONS_PER_TABLE)
+            ],
+        )
+        await conn.execute(text("ANALYZE"))
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def plan_engine(migrate):
+    if PLAN_TEST_DATABASE_URL:
+        await asyncio.to_thread(migrate, PLAN_TEST_DATABASE_URL)
+        engine = create_async_engine(PLAN_TEST_DATABASE_URL, poolclass=NullPool)
+    else:
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    await seed(engine)
+
+    yield engine
+
+    if PLAN_TEST_DATABASE_URL:
+        async with engine.begin() as conn:
+            await conn.execute(text("TRUNCATE reservations, tables CASCADE"))
+    await engine.dispose()
+
+
+async def captured_plans(engine, call) -> list[str]:
+    """Run call(session) and EXPLAIN each SELECT it issued on reservations."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and (
+            "reservations" in statement
+        ):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async_session = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with async_session() as session:
+            await call(session)
+            await session.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert statements, "the call did not query reservations"
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            if engine.dialect.name == "postgresql":
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plans.append(json.dumps(result.scalar()))
+            else:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+                plans.append("\n".join(row[-1] for row in result))
+    return plans
+
+
+def assert_no_full_scan(plan: str):
+    """Fail on plans that read every row of reservations."""
+    if plan.startswith("["):
+        nodes = []
+
+        def walk(node):
+            nodes.append(node)
+            for child in node.get("Plans", []):
+                walk(child)
+
+        walk(json.loads(plan)[0]["Plan"])
+        for node in nodes:
+            assert not (
+                node["Node Type"] == "Seq Scan"
+                and node.get("Relation Name") == "reservations"
+            ), plan
+    else:
+        assert not re.search(r"^SCAN reservations\b", plan, re.MULTILINE), plan
+
+
+def assert_uses_index(plans: list[str], *names: str):
+    """Fail unless one of the plans reads through one of the named indexes."""
+    assert any(name in plan for plan in plans for name in names), plans
+
+
+def reservation_service():
+    return ReservationService(occupancy=OccupancyStore())
+
+
+def table_service():
+    return TableService(occupancy=OccupancyStore(), cache=InMemoryCache())
+
+
+def tomorrow_evening():
+    return datetime.now().replace(
+        hour=19, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+
+
+class TestQueryPlans:
+    async def test_conflict_check(self, plan_engine):
+        reservation = ReservationCreate(
+            table_id=TABLE_ID,
+            customer_name="Plan Check",
+            reservation_time=tomorrow_evening() + timedelta(minutes=7),
+            duration_minutes=60,
+        )
+
+        async def call(session):
+            try:
+                await reservation_service().create_reservation(reservation, session)
+            except ValueError:
+                pass
+
+        if plan_engine.dialect.name == "postgresql":
+            pytest.skip("the exclusion constraint checks conflicts on PostgreSQL")
+        plans = await captured_plans(plan_engine, call)
+        for plan in plans:
+            assert_no_full_scan(plan)
+        assert_uses_index(plans, *TABLE_TIME_INDEXES)
+
+    async def test_bulk_conflict_check(self, plan_engine):
+        reservations = [
+            ReservationCreate(
+                table_id=table_id,
+                customer_name="Plan Check",
+                reservation_time=tomorrow_evening() + timedelta(minutes=7),
+                duration_minutes=60,
+            )
+            for table_id in (TABLE_ID, TABLE_ID + 1)
+        ]
+
+        async def call(session):
+            await reservation_service().create_reservations(reservations, session)
+
+        plans = await captured_plans(plan_engine, call)
+        for plan in plans:
+            assert_no_full_scan(plan)
+        assert_uses_index(plans, *TABLE_TIME_INDEXES)
+
+    async def test_listing_by_table(self, plan_engine):
+        async def call(session):
+            await reservation_service().get_reservation_rows(
+                session, after_id=0, limit=100, table_id=TABLE_ID
+            )
+
+        for plan in await captured_plans(plan_engine, call):
+            assert_no_full_scan(plan)
+
+    async def test_listing_by_time_range(self, plan_engine):
+        start = tomorrow_evening()
+
+        async def call(session):
+            await reservation_service().get_reservation_rows(
+                session,
+                limit=100,
+                starts_from=start,
+                starts_before=start + timedelta(hours=2),
+            )
+
+        for plan in await captured_plans(plan_engine, call):
+            assert_no_full_scan(plan)
+
+    async def test_availability(self, plan_engine):
+        async def call(session):
+            await table_service().get_available_tables(
+                session, tomorrow_evening(), 90, min_seats=2
+            )
+
+        plans = await captured_plans(plan_engine, call)
+        for plan in plans:
+            assert_no_full_scan(plan)
+        assert_uses_index(plans, *TABLE_TIME_INDEXES)
+
+    async def test_occupancy(self, plan_engine):
+        first_day = tomorrow_evening().date()
+
+        async def call(session):
+            await table_service().get_table_occupancy(
+                TABLE_ID, first_day, first_day + timedelta(days=6), session
+            )
+
+        plans = await captured_plans(plan_engine, call)
+        for plan in plans:
+            assert_no_full_scan(plan)
+        assert_uses_index(plans, *TABLE_TIME_INDEXES)
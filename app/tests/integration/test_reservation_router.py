@@ -1,6 +1,17 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
 import pytest
 
+from app.core.database import get_session
+from app.core.events import change_feed
+from app.main import app
+from app.models.models import Reservation
 from app.schemas.reservation import ReservationRead
+from app.services.archive_service import ArchiveService, ReservationArchiver
 
 
 @pytest.mark.asyncio
@@ -93,3 +104,411 @@ class TestReservationRouter:
         )
         assert response.status_code == 409
         assert "already reserved" in response.json()["detail"].lower()
+
+    async def test_get_reservations_pages(self, async_client):
+        start = (datetime.now() + timedelta(days=3)).replace(microsecond=0)
+        for hour in range(3):
+            await async_client.post(
+                "/reservations/",
+                json={
+                    "table_id": 1,
+                    "customer_name": f"Paged Guest {hour}",
+                    "reservation_time": (start + timedelta(hours=hour)).isoformat(),
+                    "duration_minutes": 30,
+                },
+            )
+
+        params = {"customer_name": "Paged", "limit": 2}
+        first_page = await async_client.get("/reservations/", params=params)
+        assert first_page.status_code == 200
+        assert len(first_page.json()) == 2
+        cursor = first_page.headers["x-next-cursor"]
+
+        second_page = await async_client.get(
+            "/reservations/", params={**params, "cursor": cursor}
+        )
+        assert [r["customer_name"] for r in second_page.json()] == ["Paged Guest 2"]
+        assert "x-next-cursor" not in second_page.headers
+
+        filtered = await async_client.get(
+            "/reservations/",
+            params={"from": (start + timedelta(hours=1)).isoformat(), "table_id": 1},
+        )
+        assert all(r["customer_name"] != "Paged Guest 0" for r in filtered.json())
+
+    async def test_get_reservations_invalid_cursor(self, async_client):
+        response = await async_client.get("/reservations/", params={"cursor": "x"})
+        assert response.status_code == 422
+
+    async def test_export_reservations(self, async_client):
+        await async_client.post(
+            "/reservations/",
+            json={
+                "table_id": 1,
+                "customer_name": "Export, Guest",
+                "reservation_time": (datetime.now() + timedelta(days=4)).isoformat(),
+                "duration_minutes": 30,
+            },
+        )
+
+        ndjson = await async_client.get("/reservations/export")
+        assert ndjson.status_code == 200
+        assert ndjson.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in ndjson.text.splitlines()]
+        assert len(rows) == len((await async_client.get("/reservations/")).json())
+        assert "Export, Guest" in [row["customer_name"] for row in rows]
+
+        exported_csv = await async_client.get(
+            "/reservations/export", params={"format": "csv"}
+        )
+        assert exported_csv.headers["content-type"].startswith("text/csv")
+        records = list(csv.DictReader(io.StringIO(exported_csv.text)))
+        assert [record["id"] for record in records] == [str(row["id"]) for row in rows]
+        assert "Export, Guest" in [record["customer_name"] for record in records]
+
+    async def test_create_reservations_bulk(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Bulk Table", "seats": 4, "location": "Hall"}
+        )
+        table_id = table.json()["id"]
+        start = (datetime.now() + timedelta(days=5)).replace(microsecond=0)
+        await async_client.post(
+            "/reservations/",
+            json={
+                "table_id": table_id,
+                "customer_name": "Existing Guest",
+                "reservation_time": start.isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+        def item(offset_minutes, table=table_id):
+            return {
+                "table_id": table,
+                "customer_name": "Bulk Guest",
+                "reservation_time": (
+                    start + timedelta(minutes=offset_minutes)
+                ).isoformat(),
+                "duration_minutes": 60,
+            }
+
+        response = await async_client.post(
+            "/reservations/bulk",
+            json=[item(30), item(60), item(90), item(120), item(0, table=9999)],
+        )
+        assert response.status_code == 200
+        results = response.json()
+        assert [result["status"] for result in results] == [
+            "conflict",
+            "created",
+            "conflict",
+            "created",
+            "table_not_found",
+        ]
+        assert results[1]["reservation"]["table_id"] == table_id
+        assert results[3]["reservation"]["id"] > results[1]["reservation"]["id"]
+        assert results[1]["reservation"]["end_time"] == item(120)["reservation_time"]
+
+        # Batch items are visible to later single bookings
+        conflict = await async_client.post("/reservations/", json=item(150))
+        assert conflict.status_code == 409
+
+    async def test_create_reservations_bulk_empty(self, async_client):
+        response = await async_client.post("/reservations/bulk", json=[])
+        assert response.status_code == 422
+
+    async def test_create_series(self, async_client):
+        tables = [
+            (
+                await async_client.post(
+                    "/tables/",
+                    json={"name": f"Series {n}", "seats": 4, "location": "Hall"},
+                )
+            ).json()["id"]
+            for n in range(2)
+        ]
+        start = (datetime.now() + timedelta(days=3)).replace(microsecond=0)
+        series = {
+            "customer_name": "Book Club",
+            "table_ids": tables,
+            "reservation_time": start.isoformat(),
+            "duration_minutes": 90,
+            "recurrence": {"frequency": "weekly", "count": 3},
+        }
+
+        response = await async_client.post("/reservations/series", json=series)
+        assert response.status_code == 200
+        body = response.json()
+        reservations = body["reservations"]
+        assert len(reservations) == 6
+        assert {reservation["series_id"] for reservation in reservations} == {
+            body["series_id"]
+        }
+        assert [reservation["reservation_time"] for reservation in reservations][
+            ::2
+        ] == [(start + timedelta(weeks=n)).isoformat() for n in range(3)]
+
+        # The third day overlaps the first weekly occurrence, the whole series
+        # is rejected
+        conflicting = {
+            **series,
+            "table_ids": [tables[1]],
+            "reservation_time": (start - timedelta(days=2, minutes=-30)).isoformat(),
+            "recurrence": {"frequency": "daily", "count": 5},
+        }
+        conflict = await async_client.post("/reservations/series", json=conflicting)
+        assert conflict.status_code == 409
+        assert str(tables[1]) in conflict.json()["detail"]
+        listed = await async_client.get(
+            "/reservations/", params={"table_id": tables[1]}
+        )
+        assert len(listed.json()) == 3
+
+    async def test_create_series_validation(self, async_client):
+        start = (datetime.now() + timedelta(days=3)).replace(microsecond=0)
+        series = {
+            "customer_name": "Book Club",
+            "table_ids": [1],
+            "reservation_time": start.isoformat(),
+            "duration_minutes": 90,
+        }
+
+        for invalid in (
+            {"table_ids": [1, 1]},
+            {"recurrence": {"frequency": "weekly"}},
+            {"recurrence": {"count": 53}},
+            {"recurrence": {"until": (start + timedelta(weeks=60)).isoformat()}},
+            {"recurrence": {"until": (start - timedelta(days=1)).isoformat()}},
+            {"reservation_time": (start - timedelta(days=4)).isoformat()},
+            {"reservation_time": (start + timedelta(days=28)).isoformat()},
+        ):
+            response = await async_client.post(
+                "/reservations/series", json={**series, **invalid}
+            )
+            assert response.status_code == 422, invalid
+
+        missing = await async_client.post(
+            "/reservations/series", json={**series, "table_ids": [9999]}
+        )
+        assert missing.status_code == 409
+
+    async def test_create_reservation_auto(self, async_client):
+        tables = {
+            seats: (
+                await async_client.post(
+                    "/tables/",
+                    json={
+                        "name": f"Party {seats}",
+                        "seats": seats,
+                        "location": location,
+                    },
+                )
+            ).json()["id"]
+            for seats, location in ((22, "Banquet"), (30, "Banquet"), (20, "Terrace"))
+        }
+        start = (datetime.now() + timedelta(days=5)).replace(microsecond=0)
+
+        async def book(**fields):
+            return await async_client.post(
+                "/reservations/auto",
+                json={
+                    "customer_name": "Large Party",
+                    "party_size": 18,
+                    "reservation_time": start.isoformat(),
+                    "duration_minutes": 120,
+                    **fields,
+                },
+            )
+
+        # The preferred location wins over the smaller table elsewhere
+        response = await book(location="Banquet")
+        assert response.status_code == 200
+        assert response.json()["table_id"] == tables[22]
+        # Without a preference the smallest free table fits
+        response = await book()
+        assert response.json()["table_id"] == tables[20]
+        response = await book(location="Banquet")
+        assert response.json()["table_id"] == tables[30]
+
+        assert (await book()).status_code == 409
+        assert (await book(party_size=1000)).status_code == 409
+        assert (await book(party_size=0)).status_code == 422
+        past = (start - timedelta(days=6)).isoformat()
+        assert (await book(reservation_time=past)).status_code == 422
+
+    async def test_changes_are_published(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Feed Table", "seats": 2, "location": "Bar"}
+        )
+        table_id = table.json()["id"]
+        start = (datetime.now() + timedelta(days=4)).replace(microsecond=0)
+        subscription = change_feed.subscribe({table_id})
+        try:
+            created = await async_client.post(
+                "/reservations/",
+                json={
+                    "table_id": table_id,
+                    "customer_name": "Feed Guest",
+                    "reservation_time": start.isoformat(),
+                    "duration_minutes": 60,
+                },
+            )
+            await async_client.delete(f"/reservations/{created.json()['id']}")
+
+            event = await subscription.get(1)
+            assert event.type == "reservation.created"
+            payload = json.loads(event.data)
+            assert payload["reservation"] == created.json()
+            assert payload["start"] == start.isoformat()
+            assert payload["end"] == (start + timedelta(minutes=60)).isoformat()
+            assert payload["available"] is False
+            event = await subscription.get(1)
+            assert event.type == "reservation.deleted"
+            assert json.loads(event.data)["available"] is True
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    async def test_create_reservation_idempotent(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Retry Table", "seats": 2, "location": "Hall"}
+        )
+        table_id = table.json()["id"]
+        payload = {
+            "table_id": table_id,
+            "customer_name": "Retrying Guest",
+            "reservation_time": (datetime.now() + timedelta(days=6))
+            .replace(microsecond=0)
+            .isoformat(),
+            "duration_minutes": 60,
+        }
+        headers = {"Idempotency-Key": "reservation-retry-1"}
+
+        # Concurrent duplicates wait for the first request instead of conflicting
+        responses = await asyncio.gather(
+            *(
+                async_client.post("/reservations/", json=payload, headers=headers)
+                for _ in range(3)
+            )
+        )
+        assert [response.status_code for response in responses] == [200] * 3
+        assert len({response.json()["id"] for response in responses}) == 1
+        assert (
+            sum("idempotent-replayed" in response.headers for response in responses)
+            == 2
+        )
+
+        replay = await async_client.post(
+            "/reservations/", json=payload, headers=headers
+        )
+        assert replay.status_code == 200
+        assert replay.json() == responses[0].json()
+        assert replay.headers["idempotent-replayed"] == "true"
+
+        listing = await async_client.get(
+            "/reservations/", params={"table_id": table_id}
+        )
+        assert len(listing.json()) == 1
+
+        # Without the key the same payload is a new request and conflicts
+        conflict = await async_client.post("/reservations/", json=payload)
+        assert conflict.status_code == 409
+
+    async def test_idempotency_key_reused_with_other_payload(self, async_client):
+        headers = {"Idempotency-Key": "reservation-retry-2"}
+        payload = {
+            "table_id": 9999,
+            "customer_name": "Nobody",
+            "reservation_time": (datetime.now() + timedelta(days=6)).isoformat(),
+            "duration_minutes": 60,
+        }
+        await async_client.post("/reservations/", json=payload, headers=headers)
+
+        payload["customer_name"] = "Somebody"
+        response = await async_client.post(
+            "/reservations/", json=payload, headers=headers
+        )
+        assert response.status_code == 422
+
+        response = await async_client.post(
+            "/reservations/", json=payload, headers={"Idempotency-Key": "x" * 256}
+        )
+        assert response.status_code == 400
+
+    async def test_past_reservations_move_to_history(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Archive Table", "seats": 2, "location": "Hall"}
+        )
+        table_id = table.json()["id"]
+        now = datetime.now().replace(microsecond=0)
+        async for session in app.dependency_overrides[get_session]():
+            session.add_all(
+                Reservation(
+                    customer_name=f"Archived Guest {days}",
+                    table_id=table_id,
+                    reservation_time=now - timedelta(days=days),
+                    duration_minutes=60,
+                )
+                for days in (40, 45, 1)
+            )
+
+        archiver = ReservationArchiver(
+            ArchiveService(batch_size=1),
+            sessions=app.dependency_overrides[get_session],
+            after_days=30,
+        )
+        assert await archiver.archive() >= 2
+
+        live = await async_client.get("/reservations/", params={"table_id": table_id})
+        assert [r["customer_name"] for r in live.json()] == ["Archived Guest 1"]
+
+        params = {"table_id": table_id, "limit": 1}
+        first_page = await async_client.get("/reservations/history", params=params)
+        assert first_page.status_code == 200
+        second_page = await async_client.get(
+            "/reservations/history",
+            params={**params, "cursor": first_page.headers["x-next-cursor"]},
+        )
+        assert [r["customer_name"] for r in first_page.json() + second_page.json()] == [
+            "Archived Guest 40",
+            "Archived Guest 45",
+        ]
+
+        filtered = await async_client.get(
+            "/reservations/history",
+            params={
+                "table_id": table_id,
+                "from": (now - timedelta(days=42)).isoformat(),
+            },
+        )
+        assert [r["customer_name"] for r in filtered.json()] == ["Archived Guest 40"]
+
+    async def test_cached_list_is_invalidated_by_writes(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Cached", "seats": 2, "location": "Bar"}
+        )
+        table_id = table.json()["id"]
+        url = f"/reservations/?table_id={table_id}"
+        assert (await async_client.get(url)).json() == []
+        assert (await async_client.get(url)).json() == []
+        metrics = await async_client.get("/metrics")
+        assert (
+            'cache_requests_total{cache="response:/reservations/",result="hit"}'
+            in metrics.text
+        )
+
+        when = datetime.now().replace(microsecond=0) + timedelta(days=3)
+        created = await async_client.post(
+            "/reservations/",
+            json={
+                "table_id": table_id,
+                "customer_name": "Cache Guest",
+                "reservation_time": when.isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+        assert created.status_code == 200
+        listed = (await async_client.get(url)).json()
+        assert [reservation["id"] for reservation in listed] == [created.json()["id"]]
+
+        await async_client.delete(f"/reservations/{created.json()['id']}")
+        assert (await async_client.get(url)).json() == []
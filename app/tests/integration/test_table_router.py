@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 import pytest
 
 from app.schemas.table import TableRead
@@ -52,3 +54,139 @@ class TestTableRouter:
             json={"name": "Invalid Table", "seats": -1, "location": "Main Hall"},
         )
         assert response.status_code == 422
+
+    async def test_get_available_tables(self, async_client):
+        create_response = await async_client.post(
+            "/tables/", json={"name": "Booth", "seats": 6, "location": "Gallery"}
+        )
+        table = TableRead.model_validate(create_response.json())
+        start = (datetime.now() + timedelta(days=1)).replace(microsecond=0)
+        await async_client.post(
+            "/reservations/",
+            json={
+                "table_id": table.id,
+                "customer_name": "Availability Test",
+                "reservation_time": start.isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+        async def available(offset_minutes, **params):
+            response = await async_client.get(
+                "/tables/available",
+                params={
+                    "start": (start + timedelta(minutes=offset_minutes)).isoformat(),
+                    "duration_minutes": 60,
+                    "location": "Gallery",
+                    **params,
+                },
+            )
+            assert response.status_code == 200
+            return [table["id"] for table in response.json()]
+
+        assert table.id not in await available(30)
+        assert table.id not in await available(-30)
+        assert table.id in await available(60)
+        assert table.id in await available(-60)
+        assert table.id not in await available(120, min_seats=8)
+
+    async def test_get_table_occupancy(self, async_client):
+        create_response = await async_client.post(
+            "/tables/", json={"name": "Bar Seat", "seats": 2, "location": "Bar"}
+        )
+        table = TableRead.model_validate(create_response.json())
+        day = (datetime.now() + timedelta(days=2)).date()
+        params = {"from": day.isoformat(), "to": day.isoformat()}
+
+        empty = await async_client.get(f"/tables/{table.id}/occupancy", params=params)
+        assert empty.status_code == 200
+        assert empty.json()["days"] == [{"date": day.isoformat(), "busy": []}]
+
+        created = await async_client.post(
+            "/reservations/",
+            json={
+                "table_id": table.id,
+                "customer_name": "Occupancy Test",
+                "reservation_time": f"{day.isoformat()}T19:00:00",
+                "duration_minutes": 90,
+            },
+        )
+        response = await async_client.get(
+            f"/tables/{table.id}/occupancy", params=params
+        )
+        assert response.json()["days"][0]["busy"] == [[76, 6]]
+
+        packed = await async_client.get(
+            f"/tables/{table.id}/occupancy", params={**params, "format": "bytes"}
+        )
+        assert int.from_bytes(packed.content, "little") == 0b111111 << 76
+
+        await async_client.delete(f"/reservations/{created.json()['id']}")
+        response = await async_client.get(
+            f"/tables/{table.id}/occupancy", params=params
+        )
+        assert response.json()["days"][0]["busy"] == []
+
+    async def test_get_table_occupancy_not_found(self, async_client):
+        response = await async_client.get(
+            "/tables/9999/occupancy", params={"from": "2030-01-01", "to": "2030-01-02"}
+        )
+        assert response.status_code == 404
+
+    async def test_get_tables_pages(self, async_client):
+        for name in ("Page A", "Page B"):
+            await async_client.post(
+                "/tables/", json={"name": name, "seats": 2, "location": "Patio"}
+            )
+
+        first_page = await async_client.get("/tables/", params={"limit": 1})
+        assert len(first_page.json()) == 1
+
+        second_page = await async_client.get(
+            "/tables/",
+            params={"limit": 1, "cursor": first_page.headers["x-next-cursor"]},
+        )
+        assert second_page.json()[0]["id"] > first_page.json()[0]["id"]
+
+    async def test_create_tables_bulk(self, async_client):
+        response = await async_client.post(
+            "/tables/bulk",
+            json=[
+                {"name": f"Floor {i}", "seats": 2 + i, "location": "Floor Plan"}
+                for i in range(3)
+            ],
+        )
+        assert response.status_code == 200
+        tables = [TableRead.model_validate(table) for table in response.json()]
+        assert [table.name for table in tables] == ["Floor 0", "Floor 1", "Floor 2"]
+        assert len({table.id for table in tables}) == 3
+
+    async def test_get_tables_not_modified(self, async_client):
+        response = await async_client.get("/tables/")
+        etag = response.headers["etag"]
+
+        response = await async_client.get("/tables/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+        await async_client.post(
+            "/tables/", json={"name": "ETag Table", "seats": 2, "location": "Bar"}
+        )
+        response = await async_client.get("/tables/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert "ETag Table" in [table["name"] for table in response.json()]
+
+    async def test_create_table_idempotent(self, async_client):
+        payload = {"name": "Retry Table", "seats": 4, "location": "Terrace"}
+        headers = {"Idempotency-Key": "table-retry-1"}
+
+        first = await async_client.post("/tables/", json=payload, headers=headers)
+        replay = await async_client.post("/tables/", json=payload, headers=headers)
+        assert replay.json() == first.json()
+        assert replay.headers["idempotent-replayed"] == "true"
+
+        # Keys are scoped to the route
+        bulk = await async_client.post("/tables/bulk", json=[payload], headers=headers)
+        assert bulk.status_code == 200
+        assert bulk.json()[0]["id"] != first.json()["id"]
@@ -0,0 +1,224 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import get_session
+from app.core.events import change_feed
+from app.main import app
+from app.models.models import WaitlistEntry
+from app.services.waitlist_service import WaitlistMatcher, WaitlistService
+
+
+@pytest.mark.asyncio
+class TestWaitlistRouter:
+    async def test_waitlist_entry_lifecycle(self, async_client):
+        start = (datetime.now() + timedelta(days=6)).replace(microsecond=0)
+        entry = {
+            "customer_name": "Waiting Guest",
+            # No table is that large, the entry keeps waiting
+            "min_seats": 1000,
+            "earliest": start.isoformat(),
+            "latest": (start + timedelta(hours=2)).isoformat(),
+            "duration_minutes": 60,
+        }
+
+        invalid = await async_client.post(
+            "/waitlist/",
+            json={**entry, "latest": (start - timedelta(hours=1)).isoformat()},
+        )
+        assert invalid.status_code == 422
+        past = await async_client.post(
+            "/waitlist/",
+            json={**entry, "earliest": (start - timedelta(days=7)).isoformat()},
+        )
+        assert past.status_code == 422
+
+        created = await async_client.post("/waitlist/", json=entry)
+        assert created.status_code == 200
+        assert created.json()["status"] == "waiting"
+        fetched = await async_client.get(f"/waitlist/{created.json()['id']}")
+        assert fetched.json() == created.json()
+
+        cancelled = await async_client.delete(f"/waitlist/{created.json()['id']}")
+        assert cancelled.json()["status"] == "cancelled"
+        again = await async_client.delete(f"/waitlist/{created.json()['id']}")
+        assert again.status_code == 409
+        missing = await async_client.get("/waitlist/999999")
+        assert missing.status_code == 404
+
+    async def test_freed_slot_is_assigned_by_priority(self, async_client):
+        # Larger than every other table, entries for any table land here
+        table = await async_client.post(
+            "/tables/", json={"name": "Waitlist Table", "seats": 80, "location": "Hall"}
+        )
+        table_id = table.json()["id"]
+        start = (datetime.now() + timedelta(days=8)).replace(microsecond=0)
+        reservation, later = [
+            await async_client.post(
+                "/reservations/",
+                json={
+                    "table_id": table_id,
+                    "customer_name": "First Guest",
+                    "reservation_time": (start + offset).isoformat(),
+                    "duration_minutes": 120,
+                },
+            )
+            for offset in (timedelta(0), timedelta(hours=3))
+        ]
+
+        def entry(**fields):
+            return {
+                "customer_name": "Waiting Guest",
+                "earliest": start.isoformat(),
+                "latest": (start + timedelta(minutes=30)).isoformat(),
+                "duration_minutes": 90,
+                **fields,
+            }
+
+        requests = [
+            entry(table_id=table_id),
+            entry(min_seats=60, priority=5),
+            entry(min_seats=100, priority=9),  # table too small
+            entry(
+                table_id=table_id,
+                earliest=(start + timedelta(hours=3)).isoformat(),
+                latest=(start + timedelta(hours=4)).isoformat(),
+            ),  # window after the freed slot, booked as well
+        ]
+        ids = [
+            (await async_client.post("/waitlist/", json=request)).json()["id"]
+            for request in requests
+        ]
+
+        # The matcher's booking is published once its transaction commits
+        subscription = change_feed.subscribe({table_id})
+        matcher = WaitlistMatcher(sessions=app.dependency_overrides[get_session])
+        matcher.start()
+        try:
+            await asyncio.sleep(0)
+            await async_client.delete(f"/reservations/{reservation.json()['id']}")
+            assert (await subscription.get(10)).type == "reservation.deleted"
+            assert (await subscription.get(10)).type == "reservation.created"
+        finally:
+            await matcher.stop()
+            change_feed.unsubscribe(subscription)
+
+        entries = [(await async_client.get(f"/waitlist/{id}")).json() for id in ids]
+        assert [entry["status"] for entry in entries] == [
+            "waiting",
+            "assigned",
+            "waiting",
+            "waiting",
+        ]
+        booked = await async_client.get("/reservations/", params={"table_id": table_id})
+        assert {
+            reservation["id"]: reservation["reservation_time"]
+            for reservation in booked.json()
+        } == {
+            entries[1]["reservation_id"]: start.isoformat(),
+            later.json()["id"]: (start + timedelta(hours=3)).isoformat(),
+        }
+
+    async def test_expire_entries(self):
+        past = datetime.now() - timedelta(hours=1)
+        async for session in app.dependency_overrides[get_session]():
+            session.add(
+                WaitlistEntry(
+                    customer_name="Late Guest",
+                    earliest=past - timedelta(hours=1),
+                    latest=past,
+                    duration_minutes=60,
+                )
+            )
+            await session.flush()
+
+            assert await WaitlistService().expire_entries(session) >= 1
+
+    async def test_slot_beyond_the_booking_window_is_assigned(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Far Table", "seats": 4, "location": "Hall"}
+        )
+        table_id = table.json()["id"]
+        # Accepted once, the entry outlives the window of new bookings
+        start = (datetime.now() + timedelta(days=45)).replace(microsecond=0)
+        async for session in app.dependency_overrides[get_session]():
+            entry = WaitlistEntry(
+                customer_name="Patient Guest",
+                table_id=table_id,
+                earliest=start,
+                latest=start + timedelta(hours=1),
+                duration_minutes=60,
+            )
+            session.add(entry)
+            await session.flush()
+
+            assigned = await WaitlistService().fill_slot(
+                table_id, start, start + timedelta(hours=2), session
+            )
+
+            assert assigned == [entry]
+            assert entry.status == "assigned"
+            assert entry.reservation_id is not None
+
+    async def test_entry_for_a_free_slot_is_assigned_when_added(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Open Table", "seats": 4, "location": "Hall"}
+        )
+        table_id = table.json()["id"]
+        start = (datetime.now() + timedelta(days=9)).replace(microsecond=0)
+        first = await async_client.post(
+            "/reservations/",
+            json={
+                "table_id": table_id,
+                "customer_name": "First Guest",
+                "reservation_time": start.isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+        created = await async_client.post(
+            "/waitlist/",
+            json={
+                "customer_name": "Lucky Guest",
+                "table_id": table_id,
+                "earliest": start.isoformat(),
+                "latest": (start + timedelta(hours=2)).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+        assert created.json()["status"] == "assigned"
+        booked = await async_client.get("/reservations/", params={"table_id": table_id})
+        # At the earliest free start of the window
+        assert {
+            reservation["id"]: reservation["reservation_time"]
+            for reservation in booked.json()
+        } == {
+            first.json()["id"]: start.isoformat(),
+            created.json()["reservation_id"]: (start + timedelta(hours=1)).isoformat(),
+        }
+
+    async def test_match_entries_fills_free_slots(self, async_client):
+        table = await async_client.post(
+            "/tables/", json={"name": "Freed Table", "seats": 4, "location": "Hall"}
+        )
+        table_id = table.json()["id"]
+        start = (datetime.now() + timedelta(days=10)).replace(microsecond=0)
+        async for session in app.dependency_overrides[get_session]():
+            # Left waiting while the slot was taken, freed in another worker
+            entry = WaitlistEntry(
+                customer_name="Patient Guest",
+                table_id=table_id,
+                earliest=start,
+                latest=start + timedelta(hours=1),
+                duration_minutes=60,
+            )
+            session.add(entry)
+            await session.flush()
+
+            assigned = await WaitlistService().match_entries(session)
+
+            assert entry in assigned
+            assert entry.status == "assigned"
+            assert entry.reservation_id is not None
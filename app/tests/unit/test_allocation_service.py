@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.interval_index import ReservationIntervalIndex
+from app.core.seat_index import SeatIndex
+from app.services.allocation_service import AllocationService
+from app.services.reservation_service import ReservationService
+
+BASE = datetime(2030, 1, 1, 18, 0)
+
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+
+@pytest.fixture
+def index():
+    index = ReservationIntervalIndex()
+    index.load([])
+    return index
+
+
+@pytest.fixture
+def allocation_service():
+    seats = SeatIndex(ttl=60)
+    seats.load(
+        [
+            (1, 2, "Window"),
+            (2, 4, "Hall"),
+            (3, 4, "Hall"),
+            (4, 4, "Hall"),
+            (5, 6, "Terrace"),
+            (6, 4, "Hall"),
+        ]
+    )
+    return AllocationService(ReservationService(), seats=seats)
+
+
+class TestAllocationService:
+    def test_smallest_fitting_tables_first(self, allocation_service, index):
+        rank = allocation_service.rank_tables
+
+        assert rank(index, 3, at(0), at(90)) == [2, 3, 4, 6, 5]
+        assert rank(index, 5, at(0), at(90)) == [5]
+        assert rank(index, 7, at(0), at(90)) == []
+
+    def test_least_fragmentation_wins_among_equal_tables(
+        self, allocation_service, index
+    ):
+        # Ends right where the new booking starts
+        index.add(2, 10, at(-120), at(0))
+        # Leaves a 30 minute gap nobody is likely to book
+        index.add(3, 11, at(-120), at(-30))
+        # Overlaps the new booking
+        index.add(4, 12, at(60), at(120))
+
+        assert allocation_service.rank_tables(index, 3, at(0), at(90)) == [2, 6, 3, 5]
+
+    def test_preferred_location_first(self, allocation_service, index):
+        ranked = allocation_service.rank_tables(
+            index, 2, at(0), at(90), location="Terrace"
+        )
+
+        assert ranked[0] == 5
+        assert ranked[1:] == [1, 2, 3, 4]
+
+    def test_walk_stops_after_enough_tables(self, allocation_service, index):
+        assert allocation_service.rank_tables(index, 1, at(0), at(90), limit=1) == [1]
+
+    @pytest.mark.asyncio
+    async def test_ranks_on_reservations_read_from_the_database(
+        self, allocation_service, mock_session
+    ):
+        session, result = mock_session
+        result.all.return_value = [(10, 2, at(0), at(60)), (11, 5, at(-60), at(30))]
+
+        index = await allocation_service._load_intervals(3, at(0), at(90), session)
+
+        assert allocation_service.rank_tables(index, 3, at(0), at(90)) == [3, 4, 6]
+        session.exec.assert_called_once()
@@ -0,0 +1,17 @@
+from datetime import date, datetime
+
+from app.services.archive_service import PARTITION_NAME, partition_name, shift_months
+
+
+class TestPartitions:
+    def test_shift_months(self):
+        assert shift_months(datetime(2030, 1, 31, 23, 0), 0) == date(2030, 1, 1)
+        assert shift_months(date(2030, 12, 15), 1) == date(2031, 1, 1)
+        assert shift_months(date(2030, 1, 15), -13) == date(2028, 12, 1)
+
+    def test_partition_name_round_trips(self):
+        name = partition_name(date(2030, 3, 1))
+
+        assert name == "reservations_history_y2030m03"
+        assert PARTITION_NAME.fullmatch(name).groups() == ("2030", "03")
+        assert PARTITION_NAME.fullmatch(f"{name}_pkey") is None
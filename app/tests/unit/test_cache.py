@@ -0,0 +1,57 @@
+import pytest
+
+from app.core.cache import InMemoryCache, etag_matches, make_etag
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+class TestInMemoryCache:
+    async def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = InMemoryCache(clock=clock)
+        await cache.set("key", {"id": 1}, ttl=10)
+
+        clock.now = 9.9
+        assert await cache.get("key") == {"id": 1}
+        clock.now = 10
+        assert await cache.get("key") is None
+
+    async def test_oldest_entry_is_evicted(self):
+        cache = InMemoryCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key, ttl=10)
+
+        assert await cache.get("a") is None
+        assert await cache.get("c") == "c"
+
+    async def test_delete_and_incr(self):
+        cache = InMemoryCache()
+        await cache.set("a", 1, ttl=10)
+        await cache.delete("a", "missing")
+
+        assert await cache.get("a") is None
+        assert await cache.incr("version") == 1
+        assert await cache.incr("version") == 2
+        assert await cache.get("version") == 2
+
+
+class TestEtag:
+    def test_etag_depends_on_content(self):
+        assert make_etag([{"id": 1}]) == make_etag([{"id": 1}])
+        assert make_etag([{"id": 1}]) != make_etag([{"id": 2}])
+
+    def test_etag_matches(self):
+        etag = make_etag([])
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
@@ -0,0 +1,168 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core import events
+from app.core.events import (
+    MAX_NOTIFY_PAYLOAD,
+    ChangeFeed,
+    FeedEvent,
+    PostgresNotifyBridge,
+    sse_stream,
+)
+
+
+@pytest.mark.asyncio
+class TestChangeFeed:
+    async def test_subscribers_get_their_tables(self):
+        feed = ChangeFeed(max_pending=10)
+        everything = feed.subscribe()
+        table_2 = feed.subscribe({2})
+
+        feed.publish("reservation.created", 1, {"id": 1})
+        feed.publish("reservation.created", 2, {"id": 2})
+
+        assert (await everything.get(1)).data == '{"id": 1}'
+        assert (await everything.get(1)).table_id == 2
+        assert await table_2.get(1) == FeedEvent("reservation.created", 2, '{"id": 2}')
+
+    async def test_slow_subscriber_is_dropped(self):
+        feed = ChangeFeed(max_pending=2)
+        slow = feed.subscribe()
+        fast = feed.subscribe()
+
+        for id in range(3):
+            feed.publish("reservation.created", 1, {"id": id})
+            if id < 2:
+                await fast.get(1)
+
+        assert slow.dropped
+        assert len(feed) == 1
+        assert [await slow.get(1) for _ in range(3)][2] is None
+        assert (await fast.get(1)).data == '{"id": 2}'
+
+    async def test_sse_stream(self):
+        feed = ChangeFeed(max_pending=1)
+        stream = sse_stream(feed, heartbeat=0.01)
+
+        assert await anext(stream) == b": subscribed\n\n"
+        assert await anext(stream) == b": keep-alive\n\n"
+        feed.publish("reservation.deleted", 3, {"id": 7})
+        assert await anext(stream) == b'event: reservation.deleted\ndata: {"id": 7}\n\n'
+        feed.publish("reservation.created", 3, {"id": 8})
+        feed.publish("reservation.created", 3, {"id": 9})
+        await anext(stream)
+        assert await anext(stream) == b"event: overflow\ndata: {}\n\n"
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        assert len(feed) == 0
+
+    async def test_inactive_without_subscribers_or_bridge(self):
+        feed = ChangeFeed()
+        assert not feed.active
+        subscription = feed.subscribe()
+        assert feed.active
+        feed.unsubscribe(subscription)
+        feed.bridge = Mock()
+        assert feed.active
+
+
+class FakeDriverConnection:
+    def __init__(self):
+        self.closed = False
+        self.on_terminate = []
+        self.add_listener = AsyncMock()
+        self.remove_listener = AsyncMock()
+        self.execute = AsyncMock()
+
+    def add_termination_listener(self, callback):
+        self.on_terminate.append(callback)
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+        for callback in self.on_terminate:
+            callback(self)
+
+
+def fake_engine():
+    """Engine whose connect() hands out a new fake connection on every call."""
+    drivers = []
+
+    async def connect():
+        drivers.append(FakeDriverConnection())
+        raw_connection = Mock(driver_connection=drivers[-1])
+        return Mock(
+            get_raw_connection=AsyncMock(return_value=raw_connection),
+            invalidate=AsyncMock(),
+            close=AsyncMock(),
+        )
+
+    return Mock(connect=connect), drivers
+
+
+class TestPostgresNotifyBridge:
+    def test_payloads_fit_notify_limit(self):
+        bridge = PostgresNotifyBridge(ChangeFeed(), Mock())
+        events = [
+            FeedEvent("reservation.created", id, json.dumps({"name": "x" * 500}))
+            for id in range(40)
+        ]
+
+        payloads = list(bridge.payloads(events))
+
+        assert len(payloads) > 1
+        assert all(len(payload) <= MAX_NOTIFY_PAYLOAD for payload in payloads)
+        decoded = [event for p in payloads for event in json.loads(p)["events"]]
+        assert [FeedEvent(*event) for event in decoded] == events
+
+    def test_delivers_other_workers_events(self):
+        feed = ChangeFeed(max_pending=10)
+        subscription = feed.subscribe()
+        sender = PostgresNotifyBridge(ChangeFeed(), Mock())
+        receiver = PostgresNotifyBridge(feed, Mock())
+        event = FeedEvent("reservation.created", 1, "{}")
+
+        (payload,) = sender.payloads([event])
+        receiver._on_notify(None, 1, "reservation_events", payload)
+        (own_payload,) = receiver.payloads([event])
+        receiver._on_notify(None, 1, "reservation_events", own_payload)
+
+        assert subscription._queue.qsize() == 1
+        assert subscription._queue.get_nowait() == FeedEvent(
+            "reservation.created", 1, "{}", local=False
+        )
+
+    def test_malformed_notifications_are_skipped(self):
+        feed = ChangeFeed(max_pending=10)
+        subscription = feed.subscribe()
+        receiver = PostgresNotifyBridge(feed, Mock())
+
+        for payload in ("not json", "{}", '{"origin": "x", "events": [[1]]}'):
+            receiver._on_notify(None, 1, "reservation_events", payload)
+
+        assert subscription._queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_lost_connection_is_reestablished(self, monkeypatch):
+        monkeypatch.setattr(events, "RECONNECT_MIN_DELAY", 0)
+        engine, drivers = fake_engine()
+        bridge = PostgresNotifyBridge(ChangeFeed(), engine)
+        await bridge.start()
+
+        drivers[0].terminate()
+        await asyncio.sleep(0.01)
+        bridge.send(FeedEvent("reservation.created", 1, "{}"))
+        await asyncio.sleep(0.01)
+        await bridge.stop()
+
+        assert len(drivers) == 2
+        drivers[0].execute.assert_not_awaited()
+        drivers[1].add_listener.assert_awaited_once()
+        drivers[1].execute.assert_awaited_once()
+        drivers[1].remove_listener.assert_awaited_once()
+        assert bridge._task is None
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.core.idempotency import (
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    IdempotencyStore,
+    StoredResponse,
+    request_fingerprint,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def stored(fingerprint="body", status_code=200):
+    return StoredResponse(
+        status_code=status_code, body=b"{}", headers=[], fingerprint=fingerprint
+    )
+
+
+@pytest.mark.asyncio
+class TestIdempotencyStore:
+    async def test_completed_response_is_replayed_until_ttl(self):
+        clock = FakeClock()
+        store = IdempotencyStore(ttl=10, clock=clock)
+        assert await store.begin("key", "body") is None
+        store.complete("key", stored())
+
+        clock.now = 9.9
+        assert (await store.begin("key", "body")).status_code == 200
+        clock.now = 10
+        assert await store.begin("key", "body") is None
+
+    async def test_other_payload_is_rejected(self):
+        store = IdempotencyStore()
+        await store.begin("key", "body")
+
+        with pytest.raises(IdempotencyKeyReused):
+            await store.begin("key", "other body")
+        store.complete("key", stored())
+        with pytest.raises(IdempotencyKeyReused):
+            await store.begin("key", "other body")
+
+    async def test_duplicate_waits_for_in_flight_request(self):
+        store = IdempotencyStore()
+        await store.begin("key", "body")
+        duplicate = asyncio.create_task(store.begin("key", "body"))
+        await asyncio.sleep(0)
+        assert not duplicate.done()
+
+        store.complete("key", stored(status_code=201))
+        assert (await duplicate).status_code == 201
+
+    async def test_duplicate_takes_over_released_key(self):
+        store = IdempotencyStore()
+        await store.begin("key", "body")
+        duplicate = asyncio.create_task(store.begin("key", "body"))
+        await asyncio.sleep(0)
+
+        store.release("key")
+        assert await duplicate is None
+        duplicate_waiter = asyncio.create_task(store.begin("key", "body"))
+        await asyncio.sleep(0)
+        assert not duplicate_waiter.done()
+        duplicate_waiter.cancel()
+
+    async def test_duplicate_gives_up_on_a_hung_request(self):
+        store = IdempotencyStore(wait_timeout=0.01)
+        await store.begin("key", "body")
+
+        with pytest.raises(IdempotencyKeyInProgress):
+            await store.begin("key", "body")
+        store.complete("key", stored(status_code=201))
+        assert (await store.begin("key", "body")).status_code == 201
+
+    async def test_oldest_response_is_evicted(self):
+        store = IdempotencyStore(max_entries=2)
+        for key in ("a", "b", "c"):
+            await store.begin(key, "body")
+            store.complete(key, stored())
+
+        assert await store.begin("a", "body") is None
+        assert await store.begin("c", "body") is not None
+
+
+def test_fingerprint_covers_route_and_body():
+    assert request_fingerprint("POST", "/tables/", b"{}") == request_fingerprint(
+        "POST", "/tables/", b"{}"
+    )
+    assert request_fingerprint("POST", "/tables/", b"{}") != request_fingerprint(
+        "POST", "/tables/bulk", b"{}"
+    )
@@ -0,0 +1,84 @@
+from app.core.instrumentation import (
+    N_PLUS_ONE_THRESHOLD,
+    Histogram,
+    RequestMetrics,
+    RequestStats,
+    StartupMetrics,
+)
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("latency", "Latency.", ("route",), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(("/a",), value)
+
+        lines = histogram.render()
+
+        assert 'latency_bucket{route="/a",le="0.1"} 2' in lines
+        assert 'latency_bucket{route="/a",le="1.0"} 3' in lines
+        assert 'latency_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'latency_sum{route="/a"} 2.65' in lines
+        assert 'latency_count{route="/a"} 4' in lines
+
+    def test_label_values_are_escaped(self):
+        histogram = Histogram("latency", "Latency.", ("route",), (1.0,))
+        histogram.observe(('/"quoted"',), 0.5)
+
+        assert 'latency_count{route="/\\"quoted\\""} 1' in histogram.render()
+
+
+class TestRequestMetrics:
+    def test_repeated_statement_is_flagged(self):
+        metrics = RequestMetrics()
+        stats = RequestStats()
+        stats.statements["SELECT * FROM tables WHERE id = ?"] = N_PLUS_ONE_THRESHOLD
+        stats.statements["SELECT * FROM reservations"] = 1
+
+        metrics.finish_request("GET", "/tables/", 200, stats)
+
+        rendered = metrics.render()
+        assert 'http_request_n_plus_one_total{method="GET",route="/tables/"} 1' in (
+            rendered
+        )
+        assert (
+            'http_request_queries_bucket{method="GET",route="/tables/",le="5"} 0'
+            in rendered
+        )
+        assert (
+            'http_request_queries_bucket{method="GET",route="/tables/",le="10"} 1'
+            in rendered
+        )
+
+    def test_distinct_statements_are_not_flagged(self):
+        metrics = RequestMetrics()
+        stats = RequestStats()
+        stats.statements["SELECT 1"] = N_PLUS_ONE_THRESHOLD - 1
+
+        metrics.finish_request("GET", "/tables/", 200, stats)
+
+        assert "http_request_n_plus_one_total{" not in metrics.render()
+
+    def test_server_timing(self):
+        stats = RequestStats()
+        stats.db_seconds = 0.004
+        stats.statements["SELECT 1"] = 2
+
+        assert stats.server_timing(0.01) == (
+            'pool;dur=0.00, db;dur=4.00;desc="2 queries", app;dur=6.00'
+        )
+
+
+class TestStartupMetrics:
+    def test_milestones_are_recorded_once(self):
+        now = [10.0]
+        metrics = StartupMetrics(started=9.5, clock=lambda: now[0])
+
+        assert metrics.mark("ready") == 0.5
+        now[0] = 12.0
+        assert metrics.mark("ready") == 0.5
+        assert metrics.mark("first_request") == 2.5
+
+        rendered = metrics.render()
+        assert 'app_startup_seconds{milestone="ready"} 0.5' in rendered
+        assert 'app_startup_seconds{milestone="first_request"} 2.5' in rendered
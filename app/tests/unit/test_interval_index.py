@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from app.core.interval_index import ReservationIntervalIndex, TableIntervals
+
+BASE = datetime(2030, 1, 1, 12, 0)
+
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+
+class TestTableIntervals:
+    def test_find_overlap(self):
+        intervals = TableIntervals()
+        intervals.add(1, at(0), at(60))
+        intervals.add(2, at(120), at(180))
+
+        assert intervals.find_overlap(at(30), at(90)) == (at(0), at(60))
+        assert intervals.find_overlap(at(100), at(130)) == (at(120), at(180))
+        assert intervals.find_overlap(at(-30), at(240)) is not None
+
+    def test_adjacent_intervals_do_not_overlap(self):
+        intervals = TableIntervals()
+        intervals.add(1, at(0), at(60))
+
+        assert intervals.find_overlap(at(60), at(120)) is None
+        assert intervals.find_overlap(at(-60), at(0)) is None
+
+    def test_long_earlier_interval_is_found(self):
+        intervals = TableIntervals()
+        intervals.add(1, at(0), at(240))
+        intervals.add(2, at(30), at(45))
+        intervals.add(3, at(60), at(75))
+
+        assert intervals.find_overlap(at(200), at(210)) == (at(0), at(240))
+
+    def test_remove(self):
+        intervals = TableIntervals()
+        intervals.add(1, at(0), at(240))
+        intervals.add(2, at(60), at(75))
+
+        assert intervals.remove(1, at(0))
+        assert not intervals.remove(1, at(0))
+        assert intervals.find_overlap(at(200), at(210)) is None
+        assert intervals.find_overlap(at(70), at(80)) == (at(60), at(75))
+        assert len(intervals) == 1
+
+    def test_neighbours(self):
+        intervals = TableIntervals()
+        intervals.add(1, at(0), at(240))
+        intervals.add(2, at(30), at(45))
+        intervals.add(3, at(300), at(360))
+
+        assert intervals.neighbours(at(250), at(280)) == (at(240), at(300))
+        assert intervals.neighbours(at(240), at(300)) == (at(240), at(300))
+        assert intervals.neighbours(at(-60), at(-30)) == (None, at(0))
+        assert intervals.neighbours(at(360), at(400)) == (at(360), None)
+
+
+class TestReservationIntervalIndex:
+    def test_lazy_loading(self):
+        index = ReservationIntervalIndex()
+        index.load([(1, 1, at(0), at(60))], table_ids=[1, 2])
+
+        assert index.is_loaded(1)
+        assert index.is_loaded(2)
+        assert not index.is_loaded(3)
+        assert index.find_overlap(1, at(30), at(90)) == (at(0), at(60))
+        assert index.find_overlap(2, at(30), at(90)) is None
+
+    def test_full_load_covers_every_table(self):
+        index = ReservationIntervalIndex()
+        index.load([(1, 1, at(0), at(60))])
+
+        assert index.is_loaded(42)
+        index.add(42, 2, at(0), at(60))
+        assert index.find_overlap(42, at(30), at(90)) == (at(0), at(60))
+
+    def test_add_to_unloaded_table_is_ignored(self):
+        index = ReservationIntervalIndex()
+        index.add(1, 1, at(0), at(60))
+
+        assert not index.is_loaded(1)
+        assert index.find_overlap(1, at(30), at(90)) is None
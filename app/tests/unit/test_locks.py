@@ -0,0 +1,113 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.locks import TABLE_LOCK_NAMESPACE, TableLocks
+
+
+@pytest_asyncio.fixture
+async def sqlite_sessions():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=NullPool)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def postgres_session():
+    session = AsyncMock()
+    session.bind = Mock()
+    session.bind.dialect.name = "postgresql"
+    return session
+
+
+async def write(session: AsyncSession):
+    await session.exec(text("SELECT 1"))
+
+
+@pytest.mark.asyncio
+class TestTableLocks:
+    async def test_same_table_waits_for_the_transaction_to_end(self, sqlite_sessions):
+        locks = TableLocks()
+        entered = asyncio.Event()
+
+        async def second():
+            async with sqlite_sessions() as session:
+                async with locks.hold(session, [1]):
+                    entered.set()
+
+        async with sqlite_sessions() as session:
+            async with locks.hold(session, [1]):
+                await write(session)
+            task = asyncio.create_task(second())
+            await asyncio.sleep(0.01)
+            assert not entered.is_set()
+            await session.commit()
+        await task
+        assert entered.is_set()
+
+    async def test_rollback_releases(self, sqlite_sessions):
+        locks = TableLocks()
+
+        async with sqlite_sessions() as session:
+            async with locks.hold(session, [1]):
+                await write(session)
+            await session.rollback()
+
+        assert len(locks) == 0
+
+    async def test_session_takes_its_tables_again(self, sqlite_sessions):
+        locks = TableLocks()
+
+        async with sqlite_sessions() as session:
+            async with asyncio.timeout(1):
+                async with locks.hold(session, [1]):
+                    await write(session)
+                async with locks.hold(session, [1, 2]):
+                    assert len(locks) == 2
+            await session.commit()
+
+        assert len(locks) == 0
+
+    async def test_other_tables_do_not_wait(self, sqlite_sessions):
+        locks = TableLocks()
+
+        async with sqlite_sessions() as first, sqlite_sessions() as second:
+            async with locks.hold(first, [1]):
+                await write(first)
+                async with asyncio.timeout(1):
+                    async with locks.hold(second, [2, 3]):
+                        assert len(locks) == 3
+
+    async def test_released_without_a_transaction(self, sqlite_sessions):
+        locks = TableLocks()
+
+        async with sqlite_sessions() as session:
+            async with locks.hold(session, [1, 2]):
+                pass
+            with pytest.raises(RuntimeError):
+                async with locks.hold(session, [1]):
+                    raise RuntimeError()
+
+        assert len(locks) == 0
+
+    async def test_postgres_takes_advisory_locks_in_order(self):
+        locks = TableLocks()
+        session = postgres_session()
+
+        async with locks.hold(session, [5, 2, 5]):
+            pass
+
+        for call in session.exec.call_args_list:
+            assert "pg_advisory_xact_lock" in str(call.args[0])
+        params = [
+            list(call.args[0].compile().params.values())
+            for call in session.exec.call_args_list
+        ]
+        assert params == [[TABLE_LOCK_NAMESPACE, 2], [TABLE_LOCK_NAMESPACE, 5]]
+        assert len(locks) == 0
@@ -0,0 +1,74 @@
+import json
+import logging
+import queue
+import sys
+
+from app.core.logger import (
+    JsonFormatter,
+    SamplingFilter,
+    StructuredQueueHandler,
+    parse_levels,
+)
+
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.makeLogRecord(
+        {"name": "app.test", "levelno": level, "msg": msg, "args": args}
+    )
+    record.levelname = logging.getLevelName(level)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    def test_extra_fields_are_included(self):
+        entry = json.loads(JsonFormatter().format(make_record(status=200, path="/")))
+
+        assert entry["message"] == "hello world"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "app.test"
+        assert entry["status"] == 200
+        assert entry["path"] == "/"
+        assert entry["timestamp"].endswith("Z")
+
+    def test_exception_is_rendered(self):
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = make_record(level=logging.ERROR)
+            record.exc_info = sys.exc_info()
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert "RuntimeError: boom" in entry["exception"]
+
+
+class TestStructuredQueueHandler:
+    def test_record_keeps_extra_fields(self):
+        log_queue = queue.SimpleQueue()
+        StructuredQueueHandler(log_queue).handle(make_record(duration_ms=1.5))
+
+        record = log_queue.get_nowait()
+
+        assert record.msg == "hello world"
+        assert record.args is None
+        assert record.duration_ms == 1.5
+
+
+class TestSamplingFilter:
+    def test_rate_zero_drops_info_but_keeps_errors(self):
+        sampling = SamplingFilter(0)
+
+        assert not sampling.filter(make_record(level=logging.INFO))
+        assert sampling.filter(make_record(level=logging.ERROR))
+
+    def test_rate_one_keeps_everything(self):
+        assert SamplingFilter(1).filter(make_record(level=logging.INFO))
+
+
+def test_parse_levels():
+    assert parse_levels("") == {}
+    assert parse_levels("sqlalchemy.engine=info, app.access=WARNING,") == {
+        "sqlalchemy.engine": "INFO",
+        "app.access": "WARNING",
+    }
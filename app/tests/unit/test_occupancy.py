@@ -0,0 +1,71 @@
+from datetime import date, datetime
+
+from app.core.occupancy import OccupancyStore, busy_runs, pack, slot_masks
+
+DAY = date(2030, 1, 1)
+
+
+class TestSlotMasks:
+    def test_partial_slots_are_occupied(self):
+        masks = slot_masks(datetime(2030, 1, 1, 0, 10), datetime(2030, 1, 1, 0, 40))
+
+        assert masks == {DAY: 0b111}
+
+    def test_reservation_across_midnight(self):
+        masks = slot_masks(datetime(2030, 1, 1, 23, 30), datetime(2030, 1, 2, 0, 30))
+
+        assert masks[DAY] == 0b11 << 94
+        assert masks[date(2030, 1, 2)] == 0b11
+
+    def test_busy_runs(self):
+        assert busy_runs(0) == []
+        assert busy_runs(0b1110011) == [(0, 2), (4, 3)]
+        assert busy_runs(1 << 95) == [(95, 1)]
+
+    def test_pack(self):
+        assert pack(0b1) == b"\x01" + bytes(11)
+        assert len(pack(1 << 95)) == 12
+
+
+class TestOccupancyStore:
+    def test_mark_only_updates_loaded_days(self):
+        store = OccupancyStore()
+        store.set(1, DAY, 0)
+
+        store.mark(1, datetime(2030, 1, 1, 23, 30), datetime(2030, 1, 2, 0, 30))
+
+        assert store.get(1, DAY) == 0b11 << 94
+        assert store.get(1, date(2030, 1, 2)) is None
+
+    def test_invalidate_and_eviction(self):
+        store = OccupancyStore(max_days=1)
+        store.set(1, DAY, 1)
+        store.set(2, DAY, 1)
+
+        assert store.get(1, DAY) is None
+        store.invalidate(2, datetime(2030, 1, 1, 12), datetime(2030, 1, 1, 13))
+        assert store.get(2, DAY) is None
+
+    def test_stale_generation_is_not_stored(self):
+        store = OccupancyStore()
+        generation = store.generation(1, DAY)
+
+        store.mark(1, datetime(2030, 1, 1, 12), datetime(2030, 1, 1, 13))
+        store.set(1, DAY, 0, generation)
+        assert store.get(1, DAY) is None
+
+        store.set(1, DAY, 0, store.generation(1, DAY))
+        assert store.get(1, DAY) == 0
+
+    def test_days_expire_after_ttl(self):
+        now = [0.0]
+        store = OccupancyStore(ttl=30, clock=lambda: now[0])
+        store.set(1, DAY, 1)
+
+        now[0] = 29
+        store.mark(1, datetime(2030, 1, 1, 12), datetime(2030, 1, 1, 12, 15))
+        assert store.get(1, DAY) == 1 | 1 << 48
+
+        # Marking does not extend the lifetime of a day
+        now[0] = 30
+        assert store.get(1, DAY) is None
@@ -0,0 +1,40 @@
+import json
+
+from fastapi import FastAPI
+
+from app.core.openapi import export_openapi, serve_openapi_file
+
+
+def make_app() -> FastAPI:
+    app = FastAPI(title="Schema")
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+class TestOpenAPIFile:
+    def test_exported_schema_is_served(self, tmp_path):
+        path = tmp_path / "openapi.json"
+        export_openapi(make_app(), path)
+        app = make_app()
+        serve_openapi_file(app, path)
+
+        assert app.openapi() == json.loads(path.read_text())
+        assert "/items/{item_id}" in app.openapi()["paths"]
+
+    def test_schema_is_read_from_the_file(self, tmp_path):
+        path = tmp_path / "openapi.json"
+        path.write_text(json.dumps({"openapi": "3.1.0", "paths": {}}))
+        app = make_app()
+        serve_openapi_file(app, path)
+
+        assert app.openapi()["paths"] == {}
+
+    def test_missing_file_generates_the_schema(self, tmp_path):
+        app = make_app()
+        serve_openapi_file(app, tmp_path / "missing.json")
+
+        assert "/items/{item_id}" in app.openapi()["paths"]
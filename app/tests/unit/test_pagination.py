@@ -0,0 +1,14 @@
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor:
+    def test_round_trip(self):
+        assert decode_cursor(encode_cursor(0)) == 0
+        assert decode_cursor(encode_cursor(123456)) == 123456
+
+    @pytest.mark.parametrize("cursor", ["", "not a cursor", "aWQ6eA", "Zm9vOjE"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
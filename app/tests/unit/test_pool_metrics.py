@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.instrumentation import request_metrics
+from app.core.pool_metrics import TimedQueuePool, pool_metrics
+
+
+@pytest.mark.asyncio
+class TestTimedQueuePool:
+    async def test_checkouts_are_timed_on_first_use(self):
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=TimedQueuePool)
+        sessions = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        acquired = pool_metrics.acquire_count
+        stats = request_metrics.start_request()
+        try:
+            async with sessions() as session:
+                assert pool_metrics.acquire_count == acquired
+                await session.exec(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+
+        assert pool_metrics.acquire_count == acquired + 1
+        assert stats.pool_wait_seconds > 0
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from app.core.recurrence import find_conflict, occurrence_count, occurrences
+
+BASE = datetime(2030, 1, 1, 12, 0)
+WEEK = timedelta(weeks=1)
+HOUR = timedelta(hours=1)
+
+
+class TestRecurrence:
+    def test_occurrence_count(self):
+        assert occurrence_count(BASE, WEEK, 4, None) == 4
+        assert occurrence_count(BASE, WEEK, None, BASE + 3 * WEEK) == 4
+        assert occurrence_count(BASE, WEEK, None, BASE + 3 * WEEK - HOUR) == 3
+        assert occurrence_count(BASE, WEEK, 2, BASE + 3 * WEEK) == 2
+        assert occurrence_count(BASE, WEEK, None, BASE - HOUR) == 0
+
+    def test_occurrences_are_lazy(self):
+        starts = occurrences(BASE, WEEK, 3)
+
+        assert next(starts) == BASE
+        assert list(starts) == [BASE + WEEK, BASE + 2 * WEEK]
+
+    def test_find_conflict(self):
+        existing = [
+            (BASE - HOUR, BASE),  # ends as the first occurrence starts
+            (BASE + WEEK + 2 * HOUR, BASE + WEEK + 3 * HOUR),
+            (BASE + 2 * WEEK + HOUR // 2, BASE + 2 * WEEK + 2 * HOUR),
+        ]
+
+        conflict = find_conflict(existing, occurrences(BASE, WEEK, 4), HOUR)
+
+        assert conflict == (BASE + 2 * WEEK, *existing[2])
+
+    def test_find_conflict_without_overlap(self):
+        existing = [(BASE + HOUR, BASE + 2 * HOUR), (BASE + WEEK - HOUR, BASE + WEEK)]
+
+        assert find_conflict(existing, occurrences(BASE, WEEK, 2), HOUR) is None
+        assert find_conflict([], occurrences(BASE, WEEK, 2), HOUR) is None
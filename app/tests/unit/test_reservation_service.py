@@ -1,6 +1,11 @@
+from unittest.mock import Mock
+
 import pytest
+from sqlalchemy.exc import IntegrityError
 
 from app.core.exceptions import ReservationNotFoundException
+from app.schemas.reservation import ReservationRead
+from app.services.reservation_service import EXCLUSION_VIOLATION
 
 
 @pytest.mark.asyncio
@@ -66,6 +71,21 @@ class TestReservationService:
         assert "table is already reserved" in str(exc_info.value).lower()
         session.add.assert_not_called()
 
+    async def test_postgres_leaves_conflicts_to_the_constraint(
+        self, reservation_service, sample_reservation_data, mock_session
+    ):
+        session, _ = mock_session
+        session.bind.dialect.name = "postgresql"
+        session.refresh.side_effect = lambda x: setattr(x, "id", 2)
+
+        reservation = await reservation_service.create_reservation(
+            sample_reservation_data, session
+        )
+
+        assert reservation.id == 2
+        # Only the table lock, the exclusion constraint checks conflicts
+        session.exec.assert_called_once()
+
     async def test_get_all_reservations_success(
         self, reservation_service, mock_reservation, mock_session
     ):
@@ -100,3 +120,55 @@ class TestReservationService:
             await reservation_service.delete_reservation(1, session)
 
         session.delete.assert_not_called()
+
+    async def test_create_reservation_exclusion_violation(
+        self, reservation_service, sample_reservation_data, mock_session
+    ):
+        session, _ = mock_session
+        session.bind.dialect.name = "postgresql"
+        session.flush.side_effect = IntegrityError(
+            "INSERT", {}, Mock(pgcode=EXCLUSION_VIOLATION)
+        )
+
+        with pytest.raises(ValueError) as exc_info:
+            await reservation_service.create_reservation(
+                sample_reservation_data, session
+            )
+
+        assert "table is already reserved" in str(exc_info.value).lower()
+        # Only the table lock is taken, the exclusion constraint checks conflicts
+        session.exec.assert_called_once()
+        assert "pg_advisory_xact_lock" in str(session.exec.call_args.args[0])
+
+    async def test_get_all_reservations_page(
+        self, reservation_service, mock_reservation, mock_session
+    ):
+        session, result = mock_session
+        result.all.return_value = [mock_reservation]
+
+        result = await reservation_service.get_all_reservations(
+            session, after_id=10, limit=1, table_id=1, customer_name="Jo"
+        )
+
+        assert result == [mock_reservation]
+        statement = str(session.exec.call_args.args[0])
+        assert "reservations.id >" in statement
+        assert "LIMIT" in statement
+
+    async def test_get_reservation_rows_selects_read_columns(
+        self, reservation_service, mock_reservation, mock_session
+    ):
+        session, result = mock_session
+        row = mock_reservation.model_dump(include=set(ReservationRead.model_fields))
+        result.all.return_value = [Mock(_asdict=lambda: row)]
+
+        rows = await reservation_service.get_reservation_rows(
+            session, after_id=10, limit=1
+        )
+
+        assert rows == [row]
+        statement = session.exec.call_args.args[0]
+        assert [column.name for column in statement.selected_columns] == list(
+            ReservationRead.model_fields
+        )
+        assert "reservations.id >" in str(statement)
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from app.core.response_cache import CachedRoute, ResponseCache, table_tag
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(cache: ResponseCache, calls: list, gate: asyncio.Event | None = None):
+    router = APIRouter(route_class=CachedRoute)
+
+    @router.get("/items")
+    @cache.cached(tags=lambda request: (table_tag(request.query_params["table"]),))
+    async def get_items(table: int, size: int = 1, fail: bool = False):
+        calls.append(table)
+        if gate is not None:
+            await gate.wait()
+        if fail:
+            raise HTTPException(status_code=409, detail="conflict")
+        return {"table": table, "calls": len(calls), "padding": "x" * size}
+
+    @router.get("/live")
+    async def get_live():
+        calls.append(None)
+        return {"calls": len(calls)}
+
+    app = FastAPI()
+    app.include_router(router)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+class TestResponseCache:
+    async def test_hit_skips_the_endpoint(self):
+        calls = []
+        async with make_client(
+            ResponseCache(ttl=60, max_bytes=10_000), calls
+        ) as client:
+            first = await client.get("/items?table=1&size=2")
+            second = await client.get("/items?size=2&table=1")
+
+        assert (
+            second.json() == first.json() == {"table": 1, "calls": 1, "padding": "xx"}
+        )
+        assert second.headers["content-type"] == "application/json"
+        assert calls == [1]
+
+    async def test_unmarked_routes_are_not_cached(self):
+        calls = []
+        async with make_client(
+            ResponseCache(ttl=60, max_bytes=10_000), calls
+        ) as client:
+            await client.get("/live")
+            await client.get("/live")
+
+        assert calls == [None, None]
+
+    async def test_expires_after_ttl(self):
+        clock = FakeClock()
+        calls = []
+        cache = ResponseCache(ttl=5, max_bytes=10_000, clock=clock)
+        async with make_client(cache, calls) as client:
+            await client.get("/items?table=1")
+            clock.now = 5
+            response = await client.get("/items?table=1")
+
+        assert response.json()["calls"] == 2
+
+    async def test_least_recently_used_is_evicted_over_the_cap(self):
+        calls = []
+        cache = ResponseCache(ttl=60, max_bytes=1_000)
+        async with make_client(cache, calls) as client:
+            await client.get("/items?table=1&size=300")
+            await client.get("/items?table=2&size=300")
+            await client.get("/items?table=1&size=300")
+            await client.get("/items?table=3&size=300")
+            await client.get("/items?table=1&size=300")
+            await client.get("/items?table=2&size=300")
+            await client.get("/items?table=4&size=2000")
+
+        assert calls == [1, 2, 3, 2, 4]
+        assert cache.size <= cache.max_bytes
+
+    async def test_invalidate_drops_tagged_responses(self):
+        calls = []
+        cache = ResponseCache(ttl=60, max_bytes=10_000)
+        async with make_client(cache, calls) as client:
+            await client.get("/items?table=1")
+            await client.get("/items?table=2")
+            cache.invalidate(table_tag(1))
+            await client.get("/items?table=1")
+            await client.get("/items?table=2")
+
+        assert calls == [1, 2, 1]
+
+    async def test_concurrent_misses_run_the_endpoint_once(self):
+        calls = []
+        gate = asyncio.Event()
+        cache = ResponseCache(ttl=60, max_bytes=10_000)
+        async with make_client(cache, calls, gate) as client:
+            requests = [
+                asyncio.create_task(client.get("/items?table=1")) for _ in range(5)
+            ]
+            await asyncio.sleep(0.01)
+            gate.set()
+            responses = await asyncio.gather(*requests)
+
+        assert calls == [1]
+        assert {response.json()["calls"] for response in responses} == {1}
+
+    async def test_response_loaded_across_an_invalidation_is_not_stored(self):
+        calls = []
+        gate = asyncio.Event()
+        cache = ResponseCache(ttl=60, max_bytes=10_000)
+        async with make_client(cache, calls, gate) as client:
+            request = asyncio.create_task(client.get("/items?table=1"))
+            await asyncio.sleep(0.01)
+            cache.invalidate(table_tag(1))
+            gate.set()
+            await request
+            await client.get("/items?table=1")
+
+        assert calls == [1, 1]
+
+    async def test_errors_are_not_cached(self):
+        calls = []
+        cache = ResponseCache(ttl=60, max_bytes=10_000)
+        async with make_client(cache, calls) as client:
+            first = await client.get("/items?table=1&fail=true")
+            second = await client.get("/items?table=1&fail=true")
+
+        assert first.status_code == second.status_code == 409
+        assert calls == [1, 1]
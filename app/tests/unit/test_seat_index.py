@@ -0,0 +1,40 @@
+from app.core.seat_index import SeatIndex
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSeatIndex:
+    def test_buckets_from_smallest_fitting(self):
+        index = SeatIndex(ttl=60)
+        index.load([(3, 4, "Hall"), (1, 2, "Bar"), (2, 4, "Patio"), (4, 8, "Hall")])
+
+        assert list(index.buckets(3)) == [
+            (4, [(2, "Patio"), (3, "Hall")]),
+            (8, [(4, "Hall")]),
+        ]
+        assert list(index.buckets(9)) == []
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        index = SeatIndex(ttl=60, clock=clock)
+        assert not index.is_loaded()
+
+        index.load([(1, 2, "Bar")])
+        assert index.is_loaded()
+        clock.now = 60
+        assert not index.is_loaded()
+
+    def test_clear(self):
+        index = SeatIndex(ttl=60)
+        index.load([(1, 2, "Bar")])
+
+        index.clear()
+
+        assert not index.is_loaded()
+        assert list(index.buckets(1)) == []
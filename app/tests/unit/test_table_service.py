@@ -1,6 +1,11 @@
+from datetime import date, datetime
+
 import pytest
 
+from app.core.cache import InMemoryCache
 from app.core.exceptions import TableNotFoundException
+from app.core.occupancy import OccupancyStore
+from app.services.table_service import TableService
 
 
 @pytest.mark.asyncio
@@ -28,10 +33,10 @@ class TestTableService:
         session.exec.assert_called_once()
 
     async def test_get_all_tables_success(
-        self, table_service, mock_tables, mock_session
+        self, table_service, mock_tables, mock_table_rows, mock_session
     ):
         session, result = mock_session
-        result.all.return_value = mock_tables
+        result.all.return_value = mock_table_rows
 
         result = await table_service.get_all_tables(session)
 
@@ -41,6 +46,35 @@ class TestTableService:
         assert result[2].location == mock_tables[2].location
         session.exec.assert_called_once()
 
+    async def test_get_table_is_cached(self, table_service, mock_table, mock_session):
+        session, result = mock_session
+        result.first.return_value = mock_table
+
+        await table_service.get_table(1, session)
+        cached = await table_service.get_table(1, session)
+
+        assert cached.name == mock_table.name
+        session.exec.assert_called_once()
+
+    async def test_create_table_invalidates_table_pages(
+        self, table_service, mock_table_rows, table_create_data, mock_session
+    ):
+        session, result = mock_session
+        result.all.return_value = mock_table_rows
+        session.refresh.side_effect = lambda x: setattr(x, "id", 4)
+
+        _, etag = await table_service.get_tables_page(session)
+        await table_service.get_tables_page(session)
+        assert session.exec.call_count == 1
+
+        await table_service.create_table(table_create_data, session)
+        result.all.return_value = mock_table_rows[:2]
+        tables, new_etag = await table_service.get_tables_page(session)
+
+        assert session.exec.call_count == 2
+        assert len(tables) == 2
+        assert new_etag != etag
+
     async def test_create_table_success(
         self, table_service, table_create_data, mock_session
     ):
@@ -65,3 +99,60 @@ class TestTableService:
 
         session.delete.assert_called_once_with(mock_table)
         session.flush.assert_called_once()
+
+    async def test_get_available_tables_success(
+        self, table_service, mock_tables, mock_session
+    ):
+        session, result = mock_session
+        result.all.return_value = mock_tables[1:]
+
+        result = await table_service.get_available_tables(
+            session, datetime(2030, 1, 1, 19, 30), 90, min_seats=2
+        )
+
+        assert [table.id for table in result] == [2, 3]
+        session.exec.assert_called_once()
+
+    async def test_occupancy_read_across_a_booking_is_not_stored(
+        self, mock_table, mock_session
+    ):
+        session, result = mock_session
+        store = OccupancyStore()
+        table_service = TableService(cache=InMemoryCache(), occupancy=store)
+        result.first.return_value = mock_table
+
+        def book_while_loading():
+            # Committed after the bitsets were read, before they are stored
+            store.mark(1, datetime(2030, 1, 1, 19), datetime(2030, 1, 1, 20))
+            return []
+
+        result.all.side_effect = book_while_loading
+
+        days = await table_service.get_table_occupancy(
+            1, date(2030, 1, 1), date(2030, 1, 2), session
+        )
+
+        assert days == [(date(2030, 1, 1), 0), (date(2030, 1, 2), 0)]
+        assert store.get(1, date(2030, 1, 1)) is None
+        assert store.get(1, date(2030, 1, 2)) == 0
+
+    async def test_expired_occupancy_is_read_again(self, mock_table, mock_session):
+        session, result = mock_session
+        now = [0.0]
+        store = OccupancyStore(ttl=30, clock=lambda: now[0])
+        table_service = TableService(cache=InMemoryCache(), occupancy=store)
+        result.first.return_value = mock_table
+        # Booked, then removed by another worker
+        result.all.side_effect = [
+            [(datetime(2030, 1, 1, 19), datetime(2030, 1, 1, 20))],
+            [],
+        ]
+        day = date(2030, 1, 1)
+
+        assert await table_service.get_table_occupancy(1, day, day, session) == [
+            (day, 0b1111 << 76)
+        ]
+        now[0] = 30
+        assert await table_service.get_table_occupancy(1, day, day, session) == [
+            (day, 0)
+        ]
@@ -0,0 +1,100 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core.events import ChangeFeed, FeedEvent
+from app.services.waitlist_service import WaitlistMatcher, earliest_free_start
+
+START = datetime(2030, 1, 1, 19, 0)
+
+
+def deleted(table_id, local=True):
+    data = json.dumps(
+        {
+            "start": START.isoformat(),
+            "end": (START + timedelta(hours=1)).isoformat(),
+        }
+    )
+    return FeedEvent("reservation.deleted", table_id, data, local=local)
+
+
+@pytest.mark.asyncio
+class TestWaitlistMatcher:
+    async def run_matcher(self, events, expire_interval=60):
+        feed = ChangeFeed(max_pending=10)
+        service = Mock(
+            fill_slot=AsyncMock(), expire_entries=AsyncMock(), match_entries=AsyncMock()
+        )
+        session = Mock()
+
+        async def sessions():
+            yield session
+
+        matcher = WaitlistMatcher(service, feed, sessions, expire_interval)
+        matcher.start()
+        await asyncio.sleep(0)
+        for event in events:
+            feed.deliver(event)
+        await asyncio.sleep(0.05)
+        await matcher.stop()
+        assert len(feed) == 0
+        return service, session
+
+    async def test_fills_slots_freed_in_this_worker(self):
+        service, session = await self.run_matcher(
+            [
+                deleted(1),
+                deleted(2, local=False),
+                FeedEvent("reservation.created", 3, "{}"),
+            ]
+        )
+
+        service.fill_slot.assert_awaited_once_with(
+            1, START, START + timedelta(hours=1), session
+        )
+
+    async def test_expires_and_matches_entries_when_idle(self):
+        service, session = await self.run_matcher([], expire_interval=0.01)
+
+        service.expire_entries.assert_awaited_with(session)
+        # Picks up the slots freed in other workers
+        service.match_entries.assert_awaited_with(session)
+
+    async def test_expires_entries_under_steady_traffic(self):
+        feed = ChangeFeed(max_pending=10)
+        service = Mock(
+            fill_slot=AsyncMock(), expire_entries=AsyncMock(), match_entries=AsyncMock()
+        )
+
+        async def sessions():
+            yield Mock()
+
+        matcher = WaitlistMatcher(service, feed, sessions, expire_interval=0.03)
+        matcher.start()
+        # Each event arrives before a full interval without one has passed
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            feed.deliver(FeedEvent("reservation.created", 1, "{}"))
+        await matcher.stop()
+
+        service.expire_entries.assert_awaited()
+
+
+def at(minutes):
+    return START + timedelta(minutes=minutes)
+
+
+class TestEarliestFreeStart:
+    def test_free_start_is_kept(self):
+        busy = [(at(-60), at(0)), (at(60), at(120))]
+
+        assert earliest_free_start(busy, at(0), timedelta(minutes=60)) == at(0)
+
+    def test_moves_past_busy_intervals_until_the_gap_fits(self):
+        # The 30 minute gap at 60 is too short, the nested interval ends first
+        busy = [(at(0), at(60)), (at(90), at(180)), (at(100), at(120))]
+
+        assert earliest_free_start(busy, at(10), timedelta(minutes=60)) == at(180)
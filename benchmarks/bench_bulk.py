@@ -0,0 +1,128 @@
+"""Compare bulk creation endpoints with looping over the single-item ones.
+
+Drives the application in-process through httpx's ASGITransport against an
+in-memory SQLite database, or against --database-url (an already migrated
+database, rows are added to it).
+
+    poetry run python -m benchmarks.bench_bulk --items 2000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.main import app
+from app.schemas.reservation import MAX_BULK_SIZE
+
+TABLES = 100
+
+
+def use_engine(engine):
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_session():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_session] = _get_session
+
+
+def reservations(table_ids, count: int, start: datetime):
+    for i in range(count):
+        yield {
+            "table_id": table_ids[i % len(table_ids)],
+            "customer_name": f"Guest {i}",
+            "reservation_time": (
+                start + timedelta(hours=2 * (i // len(table_ids)))
+            ).isoformat(),
+            "duration_minutes": 90,
+        }
+
+
+async def timed(coroutine):
+    began = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - began
+
+
+async def run(client: AsyncClient, items: int):
+    tables = [
+        {"name": f"Table {i}", "seats": 2 + i % 6, "location": "Hall"}
+        for i in range(items)
+    ]
+
+    async def single_tables():
+        for table in tables:
+            assert (await client.post("/tables/", json=table)).status_code == 200
+
+    async def bulk_tables():
+        for offset in range(0, items, MAX_BULK_SIZE):
+            batch = tables[offset : offset + MAX_BULK_SIZE]
+            assert (await client.post("/tables/bulk", json=batch)).status_code == 200
+
+    single_table_time = await timed(single_tables())
+    bulk_table_time = await timed(bulk_tables())
+
+    response = await client.post("/tables/bulk", json=tables[: TABLES * 2])
+    table_ids = [table["id"] for table in response.json()]
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    single_items = list(
+        reservations(table_ids[:TABLES], items, now + timedelta(days=1))
+    )
+    bulk_items = list(reservations(table_ids[TABLES:], items, now + timedelta(days=1)))
+
+    async def single_reservations():
+        for item in single_items:
+            response = await client.post("/reservations/", json=item)
+            assert response.status_code == 200, response.text
+
+    async def bulk_reservations():
+        for offset in range(0, items, MAX_BULK_SIZE):
+            batch = bulk_items[offset : offset + MAX_BULK_SIZE]
+            response = await client.post("/reservations/bulk", json=batch)
+            assert all(result["status"] == "created" for result in response.json())
+
+    single_reservation_time = await timed(single_reservations())
+    bulk_reservation_time = await timed(bulk_reservations())
+    return [
+        ("tables", single_table_time, bulk_table_time),
+        ("reservations", single_reservation_time, bulk_reservation_time),
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url or "sqlite+aiosqlite:///:memory:")
+    if args.database_url is None:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    use_engine(engine)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = await run(client, args.items)
+    await engine.dispose()
+
+    print(f"{'endpoint':>12} {'single/s':>10} {'bulk/s':>10} {'speedup':>8}")
+    for name, single_time, bulk_time in results:
+        print(
+            f"{name:>12} {args.items / single_time:>10.0f} "
+            f"{args.items / bulk_time:>10.0f} {single_time / bulk_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""Compare the interval index with the query-and-scan and overlap queries.
+
+Seeds a single table with N reservations (half in the past, half upcoming)
+and times overlap checks for random upcoming slots through the old
+query-and-scan, the sargable overlap query on (reservation_time, end_time)
+and the interval index. The overlap query is the conflict check of the
+booking path, the interval index answers the repeated checks of allocation
+ranking once loaded.
+
+    poetry run python -m benchmarks.bench_interval_index --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.interval_index import ReservationIntervalIndex
+from app.core.queries import select_columns
+from app.models.models import Reservation, Table, reservation_overlaps
+from app.services.reservation_service import INDEX_COLUMNS
+
+STEP = timedelta(hours=2)
+DURATION_MINUTES = 60
+BATCH_SIZE = 10_000
+
+
+async def seed(session: AsyncSession, size: int, now: datetime):
+    await session.exec(insert(Table).values(id=1, name="T1", seats=4, location="Hall"))
+    first = now - STEP * (size // 2)
+    for offset in range(0, size, BATCH_SIZE):
+        rows = [
+            {
+                "customer_name": f"Guest {i}",
+                "table_id": 1,
+                "reservation_time": first + STEP * i,
+                "duration_minutes": DURATION_MINUTES,
+            }
+            for i in range(offset, min(offset + BATCH_SIZE, size))
+        ]
+        await session.exec(insert(Reservation), params=rows)
+    await session.commit()
+
+
+async def query_and_scan(session: AsyncSession, start: datetime, end: datetime):
+    """The conflict check as it was before the interval index."""
+    statement = select(Reservation).where(
+        Reservation.table_id == 1, Reservation.reservation_time < end
+    )
+    result = await session.exec(statement)
+    for reservation in result.all():
+        existing_start = reservation.reservation_time
+        existing_end = existing_start + timedelta(minutes=reservation.duration_minutes)
+        if start < existing_end and end > existing_start:
+            return existing_start, existing_end
+    return None
+
+
+async def query_overlap(session: AsyncSession, start: datetime, end: datetime):
+    """Both overlap bounds in SQL, only conflicting rows come back."""
+    statement = (
+        select(Reservation.reservation_time, Reservation.end_time)
+        .where(Reservation.table_id == 1, reservation_overlaps(start, end, False))
+        .limit(1)
+    )
+    result = await session.exec(statement)
+    return result.first()
+
+
+def probes(now: datetime, size: int, count: int):
+    upcoming = max(size // 2 - 1, 1)
+    for _ in range(count):
+        start = now + STEP * random.randrange(upcoming)
+        start += timedelta(minutes=random.choice((30, 75)))
+        yield start, start + timedelta(minutes=DURATION_MINUTES)
+
+
+async def run(size: int, checks: int, scan_checks: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    now = datetime.now().replace(microsecond=0)
+
+    async with session_factory() as session:
+        await seed(session, size, now)
+
+        scan_times = []
+        for start, end in probes(now, size, scan_checks):
+            began = time.perf_counter()
+            await query_and_scan(session, start, end)
+            scan_times.append(time.perf_counter() - began)
+            session.expunge_all()
+
+        overlap_times = []
+        for start, end in probes(now, size, checks):
+            began = time.perf_counter()
+            await query_overlap(session, start, end)
+            overlap_times.append(time.perf_counter() - began)
+
+        index = ReservationIntervalIndex()
+        began = time.perf_counter()
+        result = await session.exec(select_columns(Reservation, INDEX_COLUMNS))
+        index.load(result.all())
+        load_time = time.perf_counter() - began
+
+        index_times = []
+        for start, end in probes(now, size, checks):
+            began = time.perf_counter()
+            index.find_overlap(1, start, end)
+            index_times.append(time.perf_counter() - began)
+
+    await engine.dispose()
+    return {
+        "size": size,
+        "scan_ms": statistics.median(scan_times) * 1000,
+        "overlap_ms": statistics.median(overlap_times) * 1000,
+        "index_us": statistics.median(index_times) * 1_000_000,
+        "load_s": load_time,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--checks", type=int, default=10_000)
+    parser.add_argument("--scan-checks", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'reservations':>12} {'scan (ms)':>12} {'overlap (ms)':>12} "
+        f"{'index (us)':>12} {'speedup':>10} {'load (s)':>10}"
+    )
+    for size in args.sizes:
+        result = await run(size, args.checks, args.scan_checks)
+        speedup = result["scan_ms"] * 1000 / result["index_us"]
+        print(
+            f"{result['size']:>12} {result['scan_ms']:>12.2f} {result['overlap_ms']:>12.3f} "
+            f"{result['index_us']:>12.2f} {speedup:>9.0f}x {result['load_s']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
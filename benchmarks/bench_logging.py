@@ -0,0 +1,114 @@
+"""Measure request latency with logging off, synchronous and queued.
+
+Drives the application in-process through httpx's ASGITransport with
+concurrent clients against an in-memory SQLite database. Log records are
+written as JSON to a file in a temporary directory, put it on the disk
+the service logs to with --log-dir:
+
+    off     logging disabled
+    sync    file handler called on the event loop (the previous setup)
+    queue   QueueHandler with the file handler on the listener thread
+
+    poetry run python -m benchmarks.bench_logging --requests 20000 --log-dir /var/tmp
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.core.logger import JsonFormatter, setup_logger, stop_logging
+from app.main import app
+from benchmarks.bench_bulk import use_engine
+
+TABLES = 50
+MODES = ("off", "sync", "queue")
+
+
+def configure(mode: str, path: Path | None):
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    logging.disable(logging.CRITICAL if mode == "off" else logging.NOTSET)
+
+    if mode == "off":
+        return
+    file_handler = logging.FileHandler(path, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    if mode == "queue":
+        setup_logger([file_handler])
+    else:
+        root.addHandler(file_handler)
+        root.setLevel(logging.INFO)
+
+
+async def load(client: AsyncClient, requests: int, concurrency: int):
+    latencies = []
+    urls = [f"/tables/?after_id={i % TABLES}&limit=10" for i in range(requests)]
+
+    async def worker(offset: int):
+        for url in urls[offset::concurrency]:
+            began = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - began)
+            assert response.status_code == 200, response.text
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies, time.perf_counter() - began
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--log-dir", help="defaults to a temporary directory")
+    args = parser.parse_args()
+    configure("off", None)
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    use_engine(engine)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        tables = [
+            {"name": f"Table {i}", "seats": 4, "location": "Hall"}
+            for i in range(TABLES)
+        ]
+        assert (await client.post("/tables/bulk", json=tables)).status_code == 200
+
+        print(f"{'mode':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        with tempfile.TemporaryDirectory(dir=args.log_dir) as directory:
+            for mode in MODES:
+                configure(mode, Path(directory) / f"{mode}.log")
+                await load(client, args.concurrency * 10, args.concurrency)
+                latencies, elapsed = await load(client, args.requests, args.concurrency)
+                stop_logging()
+                quantiles = statistics.quantiles(latencies, n=100)
+                print(
+                    f"{mode:>6} {args.requests / elapsed:>8.0f} "
+                    f"{quantiles[49] * 1000:>8.2f} {quantiles[94] * 1000:>8.2f} "
+                    f"{quantiles[98] * 1000:>8.2f}"
+                )
+    logging.disable(logging.NOTSET)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
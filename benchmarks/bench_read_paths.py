@@ -0,0 +1,155 @@
+"""Compare read paths loading ORM entities with the column-only row queries.
+
+Seeds an in-memory SQLite database (or --database-url) through benchmarks.seed
+and runs each read query of the API both ways, one new session per request:
+
+    index         upcoming reservations of one table for the conflict check
+    reservations  a page of GET /reservations/
+    available     the GET /tables/available search
+    tables        a page of GET /tables/
+
+    entity  select(Model), rows become identity-mapped, change-tracked objects
+    rows    select_columns(Model, ...), plain Row tuples of the same columns
+
+Reports the mean latency per request and the peak memory allocated by one
+request, measured with tracemalloc in a separate run.
+
+    poetry run python -m benchmarks.bench_read_paths --requests 500 --page-size 1000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import is_postgres
+from app.core.queries import select_columns
+from app.models.models import Reservation, Table, reservation_overlaps
+from app.schemas.reservation import RESERVATION_COLUMNS
+from app.schemas.table import TABLE_COLUMNS
+from app.services.reservation_service import INDEX_COLUMNS, ReservationService
+from benchmarks.seed import DURATION_MINUTES, seed
+
+
+def statements(dataset, page_size: int, rng: random.Random):
+    """Map each query name to its (entity, rows) statement builders for one request."""
+    table_id = rng.choice(dataset.table_ids)
+    start = dataset.slot_time(rng.randrange(dataset.slots))
+
+    def index(columns):
+        return columns.where(
+            Reservation.table_id == table_id,
+            Reservation.reservation_time >= datetime.now(),
+        )
+
+    def reservations(columns):
+        return ReservationService._filter_reservations(
+            columns, None, page_size, None, None, None, None
+        )
+
+    def available(columns, postgres):
+        end = start + timedelta(minutes=DURATION_MINUTES)
+        occupied = select(Reservation.id).where(
+            Reservation.table_id == Table.id,
+            reservation_overlaps(start, end, postgres),
+        )
+        return columns.where(Table.seats >= 2, ~occupied.exists()).order_by(
+            Table.seats, Table.id
+        )
+
+    def tables(columns):
+        return columns.order_by(Table.id).limit(page_size)
+
+    return {
+        "index": (
+            lambda _: index(select(Reservation)),
+            lambda _: index(select_columns(Reservation, INDEX_COLUMNS)),
+        ),
+        "reservations": (
+            lambda _: reservations(select(Reservation)),
+            lambda _: reservations(select_columns(Reservation, RESERVATION_COLUMNS)),
+        ),
+        "available": (
+            lambda postgres: available(select(Table), postgres),
+            lambda postgres: available(select_columns(Table, TABLE_COLUMNS), postgres),
+        ),
+        "tables": (
+            lambda _: tables(select(Table)),
+            lambda _: tables(select_columns(Table, TABLE_COLUMNS)),
+        ),
+    }
+
+
+async def request(session_factory, build) -> int:
+    async with session_factory() as session:
+        result = await session.exec(build(is_postgres(session)))
+        return len(result.all())
+
+
+async def peak_memory(session_factory, build) -> int:
+    tracemalloc.start()
+    try:
+        await request(session_factory, build)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--reservations", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.database_url:
+        engine = create_async_engine(args.database_url)
+    else:
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    dataset = await seed(engine, args.tables, args.reservations)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(
+        f"{'query':>12} {'path':>6} {'rows':>6} {'us/req':>9} {'peak KiB':>9} "
+        f"{'speedup':>8}"
+    )
+    for name in ("index", "reservations", "available", "tables"):
+        rng = random.Random(0)
+        requests = [
+            statements(dataset, args.page_size, rng)[name] for _ in range(args.requests)
+        ]
+        elapsed = {}
+        for path, position in (("entity", 0), ("rows", 1)):
+            rows = 0
+            started = time.perf_counter()
+            for builds in requests:
+                rows += await request(session_factory, builds[position])
+            elapsed[path] = (time.perf_counter() - started) / len(requests)
+            peak = await peak_memory(session_factory, requests[0][position])
+            speedup = elapsed["entity"] / elapsed[path]
+            print(
+                f"{name:>12} {path:>6} {rows // len(requests):>6} "
+                f"{elapsed[path] * 1e6:>9.0f} {peak / 2**10:>9.0f} {speedup:>7.2f}x"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Compare list response serialization through response_model with the fast path.
+
+Seeds an in-memory SQLite database with N reservations and builds the body of
+one list response holding all of them, the way each path does it:
+
+    model   select(Reservation) ORM objects, validated against
+            List[ReservationRead] and rendered by FastAPI's JSONResponse
+    fast    the ReservationRead columns as rows, encoded to bytes by the
+            reservation_rows TypeAdapter into a JSONBytesResponse
+
+Reports the best time of --repeat runs and the peak memory allocated while
+building the response, measured with tracemalloc in a separate run.
+
+    poetry run python -m benchmarks.bench_serialization --rows 10000 --rows 100000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.responses import JSONBytesResponse
+from app.models.models import Reservation, Table
+from app.schemas.reservation import ReservationRead, reservation_rows
+from app.services.reservation_service import ReservationService
+
+BATCH_SIZE = 10_000
+TABLES = 100
+
+response_field = create_model_field("Response", List[ReservationRead])
+
+
+async def seed(engine, rows: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(
+            insert(Table),
+            [
+                {"id": id, "name": f"T{id}", "seats": 4, "location": "Hall"}
+                for id in range(1, TABLES + 1)
+            ],
+        )
+        start = datetime.now() + timedelta(days=1)
+        for offset in range(0, rows, BATCH_SIZE):
+            await conn.execute(
+                insert(Reservation),
+                [
+                    {
+                        "customer_name": f"Guest {i}",
+                        "table_id": 1 + i % TABLES,
+                        "reservation_time": start + timedelta(hours=2 * (i // TABLES)),
+                        "duration_minutes": 90,
+                    }
+                    for i in range(offset, min(offset + BATCH_SIZE, rows))
+                ],
+            )
+
+
+async def model_path(session: AsyncSession) -> bytes:
+    reservations = await ReservationService().get_all_reservations(session)
+    content = await serialize_response(
+        field=response_field, response_content=reservations
+    )
+    return JSONResponse(content).body
+
+
+async def fast_path(session: AsyncSession) -> bytes:
+    reservations = await ReservationService().get_reservation_rows(session)
+    return JSONBytesResponse(reservation_rows.dump_json(reservations)).body
+
+
+async def timed(session_factory, path) -> tuple[bytes, float]:
+    async with session_factory() as session:
+        began = time.perf_counter()
+        body = await path(session)
+        return body, time.perf_counter() - began
+
+
+async def peak_memory(session_factory, path) -> int:
+    """Peak traced memory while building the response, the body included."""
+    async with session_factory() as session:
+        tracemalloc.start()
+        try:
+            await path(session)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, action="append")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"{'rows':>8} {'path':>6} {'ms':>9} {'rows/s':>10} {'peak MiB':>9}")
+    for rows in args.rows or [10_000, 100_000]:
+        await seed(engine, rows)
+        bodies = {}
+        for name, path in (("model", model_path), ("fast", fast_path)):
+            runs = [await timed(session_factory, path) for _ in range(args.repeat)]
+            bodies[name], elapsed = min(runs, key=lambda run: run[1])
+            peak = await peak_memory(session_factory, path)
+            print(
+                f"{rows:>8} {name:>6} {elapsed * 1000:>9.1f} {rows / elapsed:>10.0f} "
+                f"{peak / 2**20:>9.1f}"
+            )
+        assert bodies["model"] == bodies["fast"], "the paths encode different JSON"
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""Measure import time and cold start to first request of the service.
+
+Each run starts a fresh interpreter, the way a new pod or worker does:
+
+    import          `python -X importtime -c "import app.main"`, the
+                    cumulative import time of app.main and the modules
+                    spending the most time importing themselves
+    first request   uvicorn is started on a free port and --path polled
+                    until it answers, timed from spawning the process;
+                    the app's own app_startup_seconds milestones are read
+                    from /metrics afterwards
+
+The server connects to the database configured for the app (POSTGRES_*
+or .env), start one first, e.g. `docker compose up -d db`. --skip-server
+only measures imports. Medians over --runs are printed, the script exits
+with status 1 when one exceeds --import-budget or --first-request-budget
+(milliseconds), so it can gate a CI job:
+
+    poetry run python -m benchmarks.bench_startup --import-budget 800
+    poetry run python -m benchmarks.bench_startup --runs 10 --first-request-budget 2500
+"""
+
+import argparse
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| *(\S+)")
+STARTUP_LINE = re.compile(r'app_startup_seconds\{milestone="(\w+)"\} (\S+)')
+
+# Seconds to wait for the server to answer its first request
+START_TIMEOUT = 60
+
+
+def measure_imports() -> tuple[float, dict[str, float]]:
+    """Cumulative import ms of app.main and self import ms per module."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = None
+    own = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, module = match.groups()
+        own[module] = int(self_us) / 1000
+        if module == "app.main":
+            total = int(cumulative_us) / 1000
+    return total, own
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(path: str) -> tuple[float, dict[str, float]]:
+    """Ms from spawning uvicorn to the first answer, and the app milestones."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    began = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+    )
+    try:
+        with httpx.Client(base_url=base_url) as client:
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"Server exited with status {server.returncode}")
+                if time.perf_counter() - began > START_TIMEOUT:
+                    raise RuntimeError(f"No answer within {START_TIMEOUT}s")
+                try:
+                    response = client.get(path)
+                except httpx.TransportError:
+                    time.sleep(0.005)
+                    continue
+                elapsed = (time.perf_counter() - began) * 1000
+                response.raise_for_status()
+                break
+            metrics = client.get("/metrics").text
+    finally:
+        server.terminate()
+        server.wait()
+
+    milestones = {
+        milestone: float(seconds) * 1000
+        for milestone, seconds in STARTUP_LINE.findall(metrics)
+    }
+    return elapsed, milestones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--path", default="/tables/?limit=1")
+    parser.add_argument("--skip-server", action="store_true")
+    parser.add_argument("--import-budget", type=float, help="ms")
+    parser.add_argument("--first-request-budget", type=float, help="ms")
+    args = parser.parse_args()
+
+    totals = []
+    own = defaultdict(list)
+    for _ in range(args.runs):
+        total, modules = measure_imports()
+        totals.append(total)
+        for module, ms in modules.items():
+            own[module].append(ms)
+    import_ms = statistics.median(totals)
+
+    print(f"import app.main {import_ms:>10.1f} ms")
+    slowest = sorted(own.items(), key=lambda item: -statistics.median(item[1]))
+    for module, times in slowest[: args.top]:
+        print(f"  {module:<40} {statistics.median(times):>8.1f} ms")
+
+    first_request_ms = None
+    if not args.skip_server:
+        firsts = []
+        milestones = defaultdict(list)
+        for _ in range(args.runs):
+            elapsed, reached = measure_first_request(args.path)
+            firsts.append(elapsed)
+            for milestone, ms in reached.items():
+                milestones[milestone].append(ms)
+        first_request_ms = statistics.median(firsts)
+
+        print(f"first request   {first_request_ms:>10.1f} ms after spawn")
+        for milestone, times in milestones.items():
+            print(
+                f"  {milestone:<40} {statistics.median(times):>8.1f} ms from first import"
+            )
+
+    over = []
+    if args.import_budget is not None and import_ms > args.import_budget:
+        over.append(f"import {import_ms:.1f} ms > {args.import_budget:.1f} ms")
+    if (
+        args.first_request_budget is not None
+        and first_request_ms is not None
+        and first_request_ms > args.first_request_budget
+    ):
+        over.append(
+            f"first request {first_request_ms:.1f} ms "
+            f"> {args.first_request_budget:.1f} ms"
+        )
+    if over:
+        print("Over budget: " + ", ".join(over))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
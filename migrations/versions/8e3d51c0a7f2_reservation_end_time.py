@@ -0,0 +1,45 @@
+"""reservation end time
+
+Revision ID: 8e3d51c0a7f2
+Revises: 2cf1b03b8649
+Create Date: 2026-10-18 19:21:05.114982
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3d51c0a7f2'
+down_revision: Union[str, None] = '2cf1b03b8649'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reservations', sa.Column('end_time', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE reservations "
+        "SET end_time = reservation_time + duration_minutes * interval '1 minute'"
+    )
+    op.alter_column('reservations', 'end_time', nullable=False)
+    # end_time is written by the application, keep it from drifting
+    op.create_check_constraint(
+        'reservations_end_time_matches_duration',
+        'reservations',
+        "end_time = reservation_time + duration_minutes * interval '1 minute'",
+    )
+    op.drop_index('ix_reservations_table_id_reservation_time', table_name='reservations')
+    op.create_index('ix_reservations_table_id_reservation_time_end_time', 'reservations', ['table_id', 'reservation_time', 'end_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reservations_table_id_reservation_time_end_time', table_name='reservations')
+    op.create_index('ix_reservations_table_id_reservation_time', 'reservations', ['table_id', 'reservation_time'], unique=False)
+    op.drop_constraint('reservations_end_time_matches_duration', 'reservations', type_='check')
+    op.drop_column('reservations', 'end_time')
@@ -0,0 +1,49 @@
+"""reservation no overlap
+
+Revision ID: c0faaf901c17
+Revises: d4cf9e066f9c
+Create Date: 2026-10-18 10:12:41.305127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0faaf901c17'
+down_revision: Union[str, None] = 'd4cf9e066f9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist provides the GiST operator class for the table_id equality
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('reservations', sa.Column(
+        'period',
+        postgresql.TSRANGE(),
+        sa.Computed(
+            "tsrange(reservation_time, "
+            "reservation_time + duration_minutes * interval '1 minute', '[)')",
+            persisted=True,
+        ),
+        nullable=False,
+    ))
+    op.create_exclude_constraint(
+        'reservations_no_overlap',
+        'reservations',
+        ('table_id', '='),
+        ('period', '&&'),
+        using='gist',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('reservations_no_overlap', 'reservations', type_='exclude')
+    op.drop_column('reservations', 'period')
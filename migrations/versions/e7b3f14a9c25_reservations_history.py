@@ -0,0 +1,52 @@
+"""reservations history
+
+Revision ID: e7b3f14a9c25
+Revises: 9d41b6e0c8a2
+Create Date: 2026-10-18 23:41:27.518306
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b3f14a9c25"
+down_revision: Union[str, None] = "9d41b6e0c8a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Range partitioned by month of reservation_time on PostgreSQL. The
+    # archiver creates the monthly partitions as it moves rows into them.
+    op.create_table(
+        "reservations_history",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("customer_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.Column("reservation_time", sa.DateTime(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=False),
+        sa.Column("series_id", sa.Uuid(), nullable=True),
+        sa.PrimaryKeyConstraint("id", "reservation_time"),
+        postgresql_partition_by="RANGE (reservation_time)",
+    )
+    op.create_index(
+        "ix_reservations_history_table_id_id",
+        "reservations_history",
+        ["table_id", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Partitions still attached are dropped with the parent table
+    op.drop_index(
+        "ix_reservations_history_table_id_id", table_name="reservations_history"
+    )
+    op.drop_table("reservations_history")